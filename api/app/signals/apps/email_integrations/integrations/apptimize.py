@@ -5,9 +5,18 @@ import json
 
 from django.conf import settings
 from django.core.mail import send_mail as django_send_mail
-from django.db.models import Q
 
-from signals.apps.signals.models import Signal, SubCategory
+from signals.apps.signals.models import Signal
+from signals.apps.signals.taxonomy import get_taxonomy
+
+ELIGIBLE_MAIN_CATEGORY_SLUGS = (
+    'openbaar-groen-en-water',
+    'wegen-verkeer-straatmeubilair',
+)
+ELIGIBLE_SUB_CATEGORY_SLUGS = (
+    ('afval', 'prullenbak-is-vol'),
+    ('afval', 'veeg-zwerfvuil'),
+)
 
 
 def send_mail(signal: Signal) -> int:
@@ -47,15 +56,13 @@ def is_signal_applicable(signal: Signal) -> bool:
     :param signal: Signal object
     :returns: bool
     """
-    # TODO: move this query to object manager.
-    eligible_sub_categories = SubCategory.objects.filter(
-        Q(main_category__slug='openbaar-groen-en-water') |
-        Q(main_category__slug='wegen-verkeer-straatmeubilair') |
-        Q(main_category__slug='afval', slug='prullenbak-is-vol') |
-        Q(main_category__slug='afval', slug='veeg-zwerfvuil'))
-
-    is_applicable_for_apptimize = (
-            settings.EMAIL_APPTIMIZE_INTEGRATION_ADDRESS is not None
-            and signal.category_assignment.sub_category in eligible_sub_categories)
-
-    return is_applicable_for_apptimize
+    if settings.EMAIL_APPTIMIZE_INTEGRATION_ADDRESS is None:
+        return False
+
+    sub_category = get_taxonomy().get_sub_category(signal.category_assignment.sub_category_id)
+    if sub_category is None:
+        return False
+
+    main_slug = sub_category.main_category.slug
+    return (main_slug in ELIGIBLE_MAIN_CATEGORY_SLUGS or
+            (main_slug, sub_category.slug) in ELIGIBLE_SUB_CATEGORY_SLUGS)
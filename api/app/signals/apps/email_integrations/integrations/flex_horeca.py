@@ -8,7 +8,8 @@ from django.core.mail import send_mail as django_send_mail
 from django.utils import timezone
 
 from signals.apps.email_integrations.utils import create_default_notification_message
-from signals.apps.signals.models import Signal, SubCategory
+from signals.apps.signals.models import Signal
+from signals.apps.signals.taxonomy import get_taxonomy
 
 
 def send_mail(signal: Signal) -> int:
@@ -55,8 +56,6 @@ def is_signal_applicable(signal: Signal) -> bool:
     if is_today_last_applicable_weekday and is_now_gt_end_time:
         return False
 
-    # TODO: move this query to object manager.
-    eligible_sub_categories = SubCategory.objects.filter(
-        main_category__slug='overlast-bedrijven-en-horeca')
-
-    return signal.category_assignment.sub_category in eligible_sub_categories
+    sub_category = get_taxonomy().get_sub_category(signal.category_assignment.sub_category_id)
+    return (sub_category is not None and
+            sub_category.main_category.slug == 'overlast-bedrijven-en-horeca')
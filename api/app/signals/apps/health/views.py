@@ -9,6 +9,7 @@ from django.db import Error, connection
 from django.http import HttpResponse
 
 from signals.apps.signals.models import MainCategory, SubCategory
+from signals.apps.signals.taxonomy import get_taxonomy
 
 logger = logging.getLogger(__name__)
 
@@ -62,31 +63,32 @@ def _get_model(health_model):
     return health_check_model
 
 
-def _count_categories(health_model, minimum_count=1):
+def _count_categories(objects, minimum_count=1):
     """
-    Simple count to check if there are at least 'minimum_count' of objects in the table
+    Simple count to check if there are at least 'minimum_count' of (cached) objects
 
-    :param health_model:
+    :param objects:
     :param minimum_count:
     :return:
     """
-    if health_model.objects.count() < minimum_count:
+    if len(objects) < minimum_count:
         error_msg = 'Too few items in the database'
         logger.error(error_msg)
         raise Exception(error_msg)
 
 
-def _check_fixture_exists_in_db(health_model, data_to_check):
+def _check_fixture_exists_in_db(health_model, objects, data_to_check):
     """
-    Will check if the data_to_check exists in the database using the health_model
+    Will check if the data_to_check exists in the (cached) objects of the health_model
 
     :param health_model:
+    :param objects:
     :param data_to_check:
     :return:
     """
-    try:
-        health_model.objects.get(**data_to_check)
-    except health_model.DoesNotExist:
+    attnames = {key: health_model._meta.get_field(key).attname for key in data_to_check}
+    if not any(all(getattr(obj, attnames[key]) == value for key, value in data_to_check.items())
+               for obj in objects):
         error_msg = '{} data does not match fixture data'.format(health_model.__class__)
         logger.error(error_msg)
         raise Exception(error_msg)
@@ -136,16 +138,17 @@ def check_categories(request):
     :return HttpResponse:
     """
 
+    taxonomy = get_taxonomy()
     models = {
-        'signals.subcategory': SubCategory,
-        'signals.maincategory': MainCategory,
+        'signals.subcategory': (SubCategory, taxonomy.sub_categories),
+        'signals.maincategory': (MainCategory, taxonomy.main_categories),
     }
 
     try:
-        _count_categories(SubCategory,
+        _count_categories(taxonomy.sub_categories,
                           minimum_count=settings.HEALTH_DATA_SUB_CATEGORY_MINIMUM_COUNT)
 
-        _count_categories(MainCategory,
+        _count_categories(taxonomy.main_categories,
                           minimum_count=settings.HEALTH_DATA_MAIN_CATEGORY_MINIMUM_COUNT)
 
         fixture_file = os.path.join(
@@ -159,9 +162,9 @@ def check_categories(request):
         for fixture in fixture_data:
             model_str = fixture['model']
             if model_str in models:
-                model = models[model_str]
+                model, objects = models[model_str]
                 data_to_check = _prepare_data_to_check(data_to_check=fixture)
-                _check_fixture_exists_in_db(model, data_to_check)
+                _check_fixture_exists_in_db(model, objects, data_to_check)
 
     except Exception as e:
         return HttpResponse(e, content_type='text/plain', status=500)
@@ -0,0 +1,133 @@
+"""
+Benchmark the generation and parsing of StUF messages exchanged with Sigmax/CityControl.
+
+Usage:
+
+    python manage.py benchmark_stuf
+    python manage.py benchmark_stuf --size 4194304 --repeat 10
+
+No database or connection to Sigmax is needed, the messages are rendered from the templates with
+generated data.
+"""
+import time
+from io import BytesIO
+from types import SimpleNamespace
+
+from django.template.loader import render_to_string
+from lxml import etree
+
+from signals.apps.sigmax import stuf
+from signals.apps.sigmax.stuf import StreamingStufMessage
+
+# Size (in bytes) of the padding of the large incoming message and of the attachment of the
+# outgoing message.
+DEFAULT_SIZE = 1024 * 1024
+
+ACTUALISEER_ZAAK_STATUS_CONTEXT = {
+    'signal': SimpleNamespace(sia_id='SIA-1234567890'),
+    'tijdstipbericht': '20180927100000',
+    'resultaat_omschrijving': 'Er is gehandhaafd',
+    'resultaat_toelichting': 'Benchmark',
+    'resultaat_datum': '2018101111485276',
+}
+
+
+def get_actualiseerZaakstatus_Lk01(size=0):
+    """
+    Render an actualiseerZaakstatus_Lk01 message, padded with extra elements before the fields.
+
+    :param size: approximate number of bytes of padding
+    :returns: message (bytes)
+    """
+    xml = render_to_string('sigmax/actualiseerZaakstatus_Lk01.xml',
+                           ACTUALISEER_ZAAK_STATUS_CONTEXT)
+    if size:
+        element = '<extraElement>{}</extraElement>'.format('x' * 1000)
+        padding = '<extraElementen>{}</extraElementen>'.format(
+            element * max(size // len(element), 1))
+        xml = xml.replace('<object ', padding + '<object ', 1)
+    return xml.encode('utf-8')
+
+
+def get_bv03():
+    """
+    Render a Bv03 message, as received in response to the messages sent to Sigmax.
+
+    :returns: message (str)
+    """
+    return render_to_string('sigmax/actualiseerZaakstatus_Bv03.xml', {
+        'signal': ACTUALISEER_ZAAK_STATUS_CONTEXT['signal']})
+
+
+def get_voegZaakdocumentToe_Lk01(size=DEFAULT_SIZE):
+    """
+    Render a (streaming) voegZaakdocumentToe_Lk01 message with an attachment of given size.
+
+    :param size: number of bytes of the attachment
+    :returns: StreamingStufMessage object
+    """
+    return StreamingStufMessage.render('sigmax/voegZaakdocumentToe_Lk01.xml', context={
+        'signal': ACTUALISEER_ZAAK_STATUS_CONTEXT['signal'],
+        'DOC_UUID': '00000000-0000-0000-0000-000000000000',
+        'DOC_TYPE': 'PDF',
+        'FILE_NAME': 'SIA-1234567890.pdf',
+    }, attachment_key='DATA', attachment=b'%PDF' + b'\x00' * max(size - 4, 0))
+
+
+def _parse_unhardened(xml):
+    # Baseline: default parser and XPath expressions compiled on every call.
+    tree = etree.fromstring(xml)
+    return {name: tree.xpath('//' + '/'.join(tags), namespaces=stuf.NAMESPACES)
+            for name, tags in stuf.ACTUALISEER_ZAAK_STATUS_FIELDS.items()}
+
+
+def _iterextract(xml):
+    return stuf.iterextract(BytesIO(xml), stuf.ACTUALISEER_ZAAK_STATUS_FIELDS)
+
+
+def _tree_extract(xml):
+    tree = etree.fromstring(xml, parser=stuf.get_parser())
+    return {name: xpath(tree) for name, xpath in stuf.ACTUALISEER_ZAAK_STATUS_XPATHS.items()}
+
+
+def _consume(message):
+    for _ in message:
+        pass
+
+
+def benchmark_stuf(size=DEFAULT_SIZE, repeat=5):
+    """
+    Benchmark parsing incoming and generating outgoing StUF messages.
+
+    :param size: size (in bytes) of the padding of the large incoming message and the attachment
+        of the outgoing message
+    :param repeat: number of times each benchmark is executed, the best time is reported
+    :returns: list of dicts with the name and timing (in milliseconds) per benchmark
+    """
+    small = get_actualiseerZaakstatus_Lk01()
+    large = get_actualiseerZaakstatus_Lk01(size)
+    bv03 = get_bv03()
+    message = get_voegZaakdocumentToe_Lk01(size)
+
+    benchmarks = [
+        ('Lk01 in small, unhardened', lambda: _parse_unhardened(small)),
+        ('Lk01 in small, tree', lambda: _tree_extract(small)),
+        ('Lk01 in small, iterparse', lambda: _iterextract(small)),
+        ('Lk01 in large, unhardened', lambda: _parse_unhardened(large)),
+        ('Lk01 in large, tree', lambda: _tree_extract(large)),
+        ('Lk01 in large, iterparse', lambda: _iterextract(large)),
+        ('Bv03 berichtcode', lambda: stuf.get_berichtcode(bv03)),
+        ('Lk01 out, render', lambda: get_voegZaakdocumentToe_Lk01(size)),
+        ('Lk01 out, stream', lambda: _consume(message)),
+        ('Lk01 out, str', lambda: str(message)),
+    ]
+    return [{'name': name, 'ms': _best_of(repeat, func)} for name, func in benchmarks]
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+
+from signals.apps.sigmax.benchmark import DEFAULT_SIZE, benchmark_stuf
+
+
+class Command(BaseCommand):
+    help = 'Benchmark generating and parsing the StUF messages exchanged with Sigmax.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=DEFAULT_SIZE,
+                            help='Size (in bytes) of the large messages and attachments')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of times each benchmark is executed')
+
+    def handle(self, *args, **options):
+        for result in benchmark_stuf(size=options['size'], repeat=options['repeat']):
+            self.stdout.write('{name:<30} {ms:>10.2f} ms'.format(**result))
@@ -5,6 +5,7 @@ Retry logic ao are handled by Celery.
 import logging
 import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 
 import requests
@@ -12,7 +13,9 @@ from django.conf import settings
 from django.template.loader import render_to_string
 from lxml import etree
 
-from signals.apps.sigmax.pdf import _generate_pdf
+from signals.apps.sigmax import session
+from signals.apps.sigmax.pdf import _get_pdf
+from signals.apps.sigmax.stuf import StreamingStufMessage, StufMessageTooLarge, get_berichtcode
 from signals.apps.signals.models import (
     STADSDEEL_CENTRUM,
     STADSDEEL_NIEUWWEST,
@@ -140,47 +143,38 @@ def _generate_voegZaakdocumentToe_Lk01(signal):
     Generate XML for Sigmax voegZaakdocumentToe_Lk01 (for the PDF case)
     """
     # TODO: generalize, so that either PDF or JPG can be sent.
-    encoded_pdf = _generate_pdf(signal)
+    # The (large) PDF is base64 encoded in chunks while the message is sent.
+    pdf = _get_pdf(signal)
 
-    return render_to_string('sigmax/voegZaakdocumentToe_Lk01.xml', context={
+    return StreamingStufMessage.render('sigmax/voegZaakdocumentToe_Lk01.xml', context={
         'signal': signal,
         'DOC_UUID': str(uuid.uuid4()),
-        'DATA': encoded_pdf.decode('utf-8'),
         'DOC_TYPE': 'PDF',
         'FILE_NAME': f'{signal.sia_id}.pdf'
-    })
+    }, attachment_key='DATA', attachment=pdf)
 
 
 def _stuf_response_ok(response):
     """
     Checks that a response is a Bv03 message.
     """
-    namespaces = {
-        'soap': 'http://schemas.xmlsoap.org/soap/envelope/',
-        'stuf': 'http://www.egem.nl/StUF/StUF0301',
-    }
-
     try:
-        tree = etree.fromstring(response.text)  # raises if not XML
-    except etree.XMLSyntaxError:
+        berichtcode = get_berichtcode(response.text)  # raises if not XML
+    except (etree.XMLSyntaxError, StufMessageTooLarge):
         return False
 
-    found = tree.xpath('//stuf:stuurgegevens/stuf:berichtcode', namespaces=namespaces)
-
-    if len(found) != 1 or found[0].text != 'Bv03':
-        return False
-    return True
+    return berichtcode == 'Bv03'
 
 
-def _send_stuf_message(stuf_msg: str, soap_action: str):
+def _send_stuf_message(stuf_msg, soap_action: str):
     """
-    Send a STUF message to the server that is configured.
+    Send a STUF message (str or StreamingStufMessage) to the server that is configured.
     """
     if not settings.SIGMAX_AUTH_TOKEN or not settings.SIGMAX_SERVER:
         raise SigmaxException('SIGMAX_AUTH_TOKEN or SIGMAX_SERVER not configured.')
 
     # Prepare our request to Sigmax
-    encoded = stuf_msg.encode('utf-8')
+    encoded = stuf_msg.encode('utf-8') if isinstance(stuf_msg, str) else stuf_msg
 
     headers = {
         'SOAPAction': soap_action,
@@ -192,8 +186,9 @@ def _send_stuf_message(stuf_msg: str, soap_action: str):
     # Send our message to Sigmax. Network problems, and HTTP status codes
     # are all raised as errors.
     try:
-        response = requests.post(
+        response = session.post(
             url=settings.SIGMAX_SERVER,
+            soap_action=soap_action,
             headers=headers,
             data=encoded,
             verify=False
@@ -236,7 +231,22 @@ def send_voegZaakdocumentToe_Lk01(signal):
 def handle(signal: Signal) -> None:
     """
     Create a case (zaak) in Sigmax/CityControl, attach extra info in PDF
+
+    The PDF is generated while CityControl handles the CreeerZaak message, the
+    VoegZaakdocumentToe message is only sent after the case was created.
     """
     # Note: functions below may raise, exceptions are handled at Celery level.
-    send_creeerZaak_Lk01(signal)
-    send_voegZaakdocumentToe_Lk01(signal)
+    creeer_zaak_msg = _generate_creeerZaak_Lk01(signal)
+
+    # Only the network call runs in the other thread, the database is only used in this one.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        creeer_zaak = executor.submit(
+            _send_stuf_message, creeer_zaak_msg, CREEER_ZAAK_SOAPACTION)
+        voeg_zaakdocument_toe_msg = _generate_voegZaakdocumentToe_Lk01(signal)
+        response = creeer_zaak.result()
+    logger.info('Sent %s', CREEER_ZAAK_SOAPACTION)
+    logger.info('Received:\n%s', response.text)
+
+    response = _send_stuf_message(voeg_zaakdocument_toe_msg, VOEG_ZAAKDOCUMENT_TOE_SOAPACTION)
+    logger.info('Sent %s', VOEG_ZAAKDOCUMENT_TOE_SOAPACTION)
+    logger.info('Received:\n%s', response.text)
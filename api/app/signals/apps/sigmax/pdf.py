@@ -8,6 +8,7 @@ import weasyprint
 from django.template.loader import render_to_string
 
 from signals.apps.signals.models import Signal
+from signals.apps.signals.pdf.cache import get_or_render_pdf, get_signal_pdf_version
 
 # Because weasyprint can produce a lot of warnings (unsupported
 # CSS etc.) we ignore them.
@@ -27,13 +28,21 @@ def _render_html(signal: Signal):
     return render_to_string('sigmax/pdf_template.html', context=context)
 
 
+def _get_pdf(signal: Signal):
+    """Get the PDF to send to VoegZaakdocumentToe_Lk01 (rendered or from the PDF cache).
+
+    :param signal: Signal object
+    :returns: PDF (bytes)
+    """
+    parts = ('sigmax', ) + get_signal_pdf_version(signal)
+    return get_or_render_pdf(
+        parts, lambda: weasyprint.HTML(string=_render_html(signal)).write_pdf())
+
+
 def _generate_pdf(signal: Signal):
     """Generate PDF to send to VoegZaakdocumentToe_Lk01.
 
     :param signal: Signal object
     :returns: base64 encoded data
     """
-    html = _render_html(signal)
-    pdf = weasyprint.HTML(string=html).write_pdf()
-
-    return base64.b64encode(pdf)
+    return base64.b64encode(_get_pdf(signal))
@@ -0,0 +1,93 @@
+"""
+HTTP session used to send StUF messages to Sigmax/CityControl.
+
+Each process (Celery worker) uses one `requests.Session` with a bounded connection pool, so
+subsequent messages reuse the (keep-alive) connection instead of paying for a new TCP and TLS
+handshake every time.
+"""
+import logging
+import os
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+
+def create_session():
+    """Create a HTTP session for Sigmax/CityControl.
+
+    StUF messages are not idempotent (CityControl would create the same case twice), so only
+    requests that certainly didn't reach CityControl are retried: connection errors and `503
+    Service Unavailable` responses.
+
+    :returns: requests.Session object
+    """
+    retry = Retry(
+        total=settings.SIGMAX_MAX_RETRIES,
+        connect=settings.SIGMAX_MAX_RETRIES,
+        read=0,
+        status=settings.SIGMAX_MAX_RETRIES,
+        status_forcelist=(503, ),
+        method_whitelist=False,  # Retry POST requests as well.
+        backoff_factor=settings.SIGMAX_RETRY_BACKOFF_FACTOR,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=settings.SIGMAX_POOL_MAXSIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Get the HTTP session for Sigmax/CityControl of the current process.
+
+    A new session is created after a fork, connections can't be shared between processes.
+
+    :returns: requests.Session object
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = create_session()
+                _session_pid = pid
+    return _session
+
+
+def post(url, soap_action, **kwargs):
+    """Send a POST request to Sigmax/CityControl and log its latency.
+
+    :param url: url
+    :param soap_action: SOAP action of the message (used for logging)
+    :param kwargs: keyword arguments for `requests.Session.post`
+    :returns: requests.Response object
+    """
+    kwargs.setdefault(
+        'timeout', (settings.SIGMAX_CONNECT_TIMEOUT, settings.SIGMAX_READ_TIMEOUT))
+
+    start = time.perf_counter()
+    status_code = None
+    try:
+        response = get_session().post(url, **kwargs)
+        status_code = response.status_code
+        return response
+    finally:
+        duration = (time.perf_counter() - start) * 1000
+        logger.info('Sigmax %s took %.0f ms (status %s)', soap_action, duration, status_code,
+                    extra={'soap_action': soap_action,
+                           'duration_ms': duration,
+                           'status_code': status_code})
@@ -6,5 +6,7 @@ from signals.apps.signals.managers import update_status
 
 @receiver(update_status, dispatch_uid='sigmax_update_status')
 def update_status_handler(sender, signal_obj, status, prev_status, **kwargs):
-    # call via Celery signal sending code
-    tasks.push_to_sigmax.delay(pk=signal_obj.id)
+    # Only signals that are to be sent to Sigmax are pushed (this excludes the status updates made
+    # by the push itself). A push that finds the signal already pushed does nothing.
+    if tasks.is_status_applicable(status):
+        tasks.push_to_sigmax.delay(pk=signal_obj.id)
@@ -0,0 +1,215 @@
+"""
+Generation and parsing of StUF messages.
+
+- Outgoing messages with (large) base64 encoded attachments are generated while they are sent,
+  see `StreamingStufMessage`.
+- Incoming messages are parsed with a hardened parser (no network access, no entity resolution,
+  limited size) and precompiled XPath expressions. Large messages are parsed incrementally.
+"""
+import base64
+import threading
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from lxml import etree
+
+NAMESPACES = {
+    'soap': 'http://schemas.xmlsoap.org/soap/envelope/',
+    'zaak': 'http://www.egem.nl/StUF/sector/zkn/0310',
+    'stuf': 'http://www.egem.nl/StUF/StUF0301',
+}
+
+# Number of attachment bytes base64 encoded at once, a multiple of 3 so the encoded chunks can
+# be concatenated (64KiB when encoded).
+ATTACHMENT_CHUNK_SIZE = 3 * 16384
+
+
+class StreamingStufMessage:
+    """StUF message with a base64 encoded attachment, encoded while the message is sent.
+
+    Instead of rendering the whole (encoded) attachment into the message, the template is rendered
+    around a placeholder and the attachment is base64 encoded in chunks when the message is
+    iterated. The length of the message is known in advance, so it can be used as request body
+    with a `Content-Length` (`requests` sends iterables with a length as-is). The message can be
+    iterated more than once (e.g. when a request is retried).
+    """
+
+    def __init__(self, prefix, attachment, suffix, chunk_size=ATTACHMENT_CHUNK_SIZE):
+        self.prefix = prefix.encode('utf-8')
+        self.attachment = attachment
+        self.suffix = suffix.encode('utf-8')
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def render(cls, template_name, context, attachment_key, attachment):
+        """Render given template with the base64 encoded attachment as variable `attachment_key`.
+
+        :param template_name: name of the XML template
+        :param context: template context (dict)
+        :param attachment_key: name of the template variable of the attachment
+        :param attachment: attachment (bytes)
+        :returns: StreamingStufMessage object
+        """
+        placeholder = uuid.uuid4().hex
+        context = dict(context, **{attachment_key: placeholder})
+        prefix, suffix = render_to_string(template_name, context=context).split(placeholder)
+        return cls(prefix, attachment, suffix)
+
+    def __len__(self):
+        encoded_length = 4 * ((len(self.attachment) + 2) // 3)
+        return len(self.prefix) + encoded_length + len(self.suffix)
+
+    def __iter__(self):
+        yield self.prefix
+
+        attachment = memoryview(self.attachment)
+        for start in range(0, len(attachment), self.chunk_size):
+            yield base64.b64encode(attachment[start:start + self.chunk_size])
+
+        yield self.suffix
+
+    def __str__(self):
+        return b''.join(self).decode('utf-8')
+
+
+class StufMessageTooLarge(ValueError):
+    pass
+
+
+# Options of the parser for incoming messages: no network access, no DTDs, no entity resolution
+# (XXE, billion laughs) and libxml2's default limits on the depth and size of text nodes.
+PARSER_OPTIONS = {
+    'resolve_entities': False,
+    'no_network': True,
+    'load_dtd': False,
+    'huge_tree': False,
+}
+
+_local = threading.local()
+
+
+def get_parser():
+    """Get the hardened XML parser of the current thread (parsers are not thread-safe).
+
+    :returns: lxml.etree.XMLParser object
+    """
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = etree.XMLParser(**PARSER_OPTIONS)
+    return parser
+
+
+def _check_size(xml):
+    if len(xml) > settings.SIGMAX_STUF_MAX_SIZE:
+        raise StufMessageTooLarge(
+            'StUF message larger than {} bytes'.format(settings.SIGMAX_STUF_MAX_SIZE))
+
+
+def parse(xml):
+    """Parse a StUF message with the hardened parser.
+
+    :param xml: message (bytes or str)
+    :raises: StufMessageTooLarge, lxml.etree.XMLSyntaxError
+    :returns: root Element
+    """
+    _check_size(xml)
+    return etree.fromstring(xml, parser=get_parser())
+
+
+def _xpath(tags):
+    return etree.XPath('//' + '/'.join(tags), namespaces=NAMESPACES)
+
+
+def _clark(tag):
+    prefix, name = tag.split(':')
+    return '{{{}}}{}'.format(NAMESPACES[prefix], name)
+
+
+BERICHTCODE_XPATH = _xpath(('stuf:stuurgegevens', 'stuf:berichtcode'))
+
+# Fields of an actualiseerZaakstatus_Lk01 message, as paths of tags anywhere in the message
+ACTUALISEER_ZAAK_STATUS_FIELDS = {
+    'sia_id': ('zaak:object', 'zaak:identificatie'),
+    'resultaat_omschrijving': ('zaak:object', 'zaak:resultaat', 'zaak:omschrijving'),
+    'datum_status_gezet': ('zaak:object', 'zaak:heeft', 'zaak:datumStatusGezet'),
+    'einddatum': ('zaak:object', 'zaak:einddatum'),
+    'reden': ('zaak:object', 'zaak:resultaat', 'zaak:toelichting'),
+}
+ACTUALISEER_ZAAK_STATUS_XPATHS = {
+    name: _xpath(tags) for name, tags in ACTUALISEER_ZAAK_STATUS_FIELDS.items()}
+
+
+def get_berichtcode(xml):
+    """Get the `berichtcode` (Bv03, Fo03, ...) of a StUF message.
+
+    :param xml: message (bytes or str)
+    :raises: StufMessageTooLarge, lxml.etree.XMLSyntaxError
+    :returns: berichtcode (str) or None when the message hasn't exactly one
+    """
+    found = BERICHTCODE_XPATH(parse(xml))
+    return found[0].text if len(found) == 1 else None
+
+
+def extract_actualiseerZaakstatus_Lk01(xml):
+    """Extract the fields of an actualiseerZaakstatus_Lk01 message.
+
+    Messages larger than `SIGMAX_STUF_ITERPARSE_THRESHOLD` bytes are parsed incrementally (see
+    `iterextract`) instead of building the whole tree.
+
+    :param xml: message (bytes)
+    :raises: StufMessageTooLarge, lxml.etree.XMLSyntaxError
+    :returns: dict with the texts of the `ACTUALISEER_ZAAK_STATUS_FIELDS` ('' when not found)
+    """
+    if len(xml) > settings.SIGMAX_STUF_ITERPARSE_THRESHOLD:
+        _check_size(xml)
+        return iterextract(BytesIO(xml), ACTUALISEER_ZAAK_STATUS_FIELDS)
+
+    tree = parse(xml)
+    result = {}
+    for name, xpath in ACTUALISEER_ZAAK_STATUS_XPATHS.items():
+        found = xpath(tree)
+        result[name] = found[0].text if found and found[0].text else ''
+    return result
+
+
+def iterextract(source, fields):
+    """Extract the text of the first element matching each of the fields from a StUF message.
+
+    Same result as evaluating `//<path>` for each of the fields, but elements are discarded as
+    soon as they are parsed and parsing stops when all fields are found, so memory use doesn't
+    depend on the size of the message.
+
+    :param source: file-like object with the message (bytes)
+    :param fields: dict with names and paths (tuples of tags) of the fields
+    :raises: lxml.etree.XMLSyntaxError
+    :returns: dict with the texts of the fields ('' when not found)
+    """
+    paths = {name: [_clark(tag) for tag in reversed(tags)] for name, tags in fields.items()}
+    tags = {path[0] for path in paths.values()}
+    result = {}
+
+    for _, element in etree.iterparse(source, events=('end', ), **PARSER_OPTIONS):
+        if element.tag in tags:
+            for name, path in paths.items():
+                if name not in result and _matches(element, path):
+                    result[name] = element.text or ''
+            if len(result) == len(fields):
+                break
+
+        # Discard the element and its preceding siblings, its ancestors are still needed to match
+        # the elements that follow.
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    return {name: result.get(name, '') for name in fields}
+
+
+def _matches(element, path):
+    for tag in path:
+        if element is None or element.tag != tag:
+            return False
+        element = element.getparent()
+    return True
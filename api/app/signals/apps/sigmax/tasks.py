@@ -1,45 +1,72 @@
 import logging
 
+from django.conf import settings
+
 # from signals.apps.sigmax import outgoing as sigmax
 from signals.apps.sigmax import outgoing
 from signals.apps.signals import workflow
 from signals.apps.signals.models import Signal, Status
 from signals.celery import app
+from signals.utils.locks import SIGMAX_PUSH_LOCK, try_advisory_lock
 
 logger = logging.getLogger(__name__)
 
 
+def is_status_applicable(status):
+    """Check that a signal with given status should be sent to Sigmax/CityControl."""
+    return status.state == workflow.TE_VERZENDEN and \
+        status.target_api == Status.TARGET_API_SIGMAX
+
+
 def is_signal_applicable(signal):
     """Check that signal instance should be sent to Sigmax/CityControl."""
-    return signal.status.state == workflow.TE_VERZENDEN and \
-        signal.status.target_api == Status.TARGET_API_SIGMAX
+    return is_status_applicable(signal.status)
 
 
-@app.task
-def push_to_sigmax(pk):
+@app.task(bind=True)
+def push_to_sigmax(self, pk):
     """
     Send signals to Sigmax if applicable
 
+    Routed to the `sigmax` queue (see `CELERY_TASK_ROUTES`), so signals are pushed concurrently
+    by dedicated workers. Pushes of the same signal are never sent at the same time, a push that
+    finds another push of its signal in progress is retried later.
+
     :param pk:
     :return: Nothing
     """
     try:
         signal = Signal.objects.get(pk=pk)
     except Signal.DoesNotExist:
-        logger.exception()
+        logger.exception('Signal %s does not exist, not pushed to Sigmax', pk)
+        return None
+
+    if not is_signal_applicable(signal):
         return None
 
-    if is_signal_applicable(signal):
-        try:
-            outgoing.handle(signal)
-        except outgoing.SigmaxException:
-            Signal.actions.update_status({
-                'state': workflow.VERZENDEN_MISLUKT,
-                'text': 'Verzending van melding naar THOR is mislukt.',
-            }, signal=signal)
-            raise  # Fail task in Celery.
-        else:
-            Signal.actions.update_status({
-                'state': workflow.VERZONDEN,
-                'text': 'Verzending van melding naar THOR is gelukt.',
-            }, signal=signal)
+    # The lock is shared by all worker processes, it's released when the push is done (or the
+    # worker process dies).
+    with try_advisory_lock(SIGMAX_PUSH_LOCK, pk) as acquired:
+        if not acquired:
+            raise self.retry(countdown=settings.SIGMAX_PUSH_RETRY_DELAY, max_retries=None)
+
+        # Another push of this signal may have finished while waiting for the lock.
+        signal = Signal.objects.get(pk=pk)
+        if is_signal_applicable(signal):
+            _push(signal)
+
+
+def _push(signal):
+    try:
+        outgoing.handle(signal)
+    except outgoing.SigmaxException:
+        Signal.actions.update_status({
+            'state': workflow.VERZENDEN_MISLUKT,
+            'text': 'Verzending van melding naar THOR is mislukt.',
+        }, signal=signal)
+        raise  # Fail task in Celery.
+    else:
+        Signal.actions.update_status({
+            'state': workflow.VERZONDEN,
+            'text': 'Verzending van melding naar THOR is gelukt.',
+        }, signal=signal)
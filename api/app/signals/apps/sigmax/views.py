@@ -4,11 +4,12 @@ applies to communication between the SIA system and Sigmax CityControl.
 """
 import logging
 
-from django.core.exceptions import ValidationError
+from django.core.exceptions import RequestDataTooBig, ValidationError
 from django.shortcuts import render
 from lxml import etree
 from rest_framework.views import APIView
 
+from signals.apps.sigmax import stuf
 from signals.apps.signals import workflow
 from signals.apps.signals.models import Signal
 from signals.auth.backend import JWTAuthBackend
@@ -21,34 +22,17 @@ ACTUALISEER_ZAAK_STATUS_SOAPACTION = \
 
 
 def _parse_actualiseerZaakstatus_Lk01(xml):
-    namespaces = {
-        'soap': 'http://schemas.xmlsoap.org/soap/envelope/',
-        'zaak': 'http://www.egem.nl/StUF/sector/zkn/0310',
-        'stuf': 'http://www.egem.nl/StUF/StUF0301',
-    }
-
     # strip the relevant information from the return message
     assert type(xml) == type(b'a')  # noqa: E721
-    tree = etree.fromstring(xml)
-
-    def xpath(expression):
-        found = tree.xpath(expression, namespaces=namespaces)
-        out = found[0].text if found and found[0].text else ''
-        assert isinstance(out, str)
-        return out
 
     # TODO: handle missing data / nice error reporting
-    sia_id = xpath('//zaak:object/zaak:identificatie')
-    resultaat_omschrijving = xpath('//zaak:object/zaak:resultaat/zaak:omschrijving')
-    datum_status_gezet = xpath('//zaak:object/zaak:heeft/zaak:datumStatusGezet')
-    einddatum = xpath('//zaak:object/zaak:einddatum')
-    reden = xpath('//zaak:object/zaak:resultaat/zaak:toelichting')
+    fields = stuf.extract_actualiseerZaakstatus_Lk01(xml)
 
     return {
-        'sia_id': sia_id.strip(),
-        'datum_afgehandeld': datum_status_gezet or einddatum,
-        'resultaat': resultaat_omschrijving,
-        'reden': reden,
+        'sia_id': fields['sia_id'].strip(),
+        'datum_afgehandeld': fields['datum_status_gezet'] or fields['einddatum'],
+        'resultaat': fields['resultaat_omschrijving'],
+        'reden': fields['reden'],
     }
 
 
@@ -74,13 +58,44 @@ def _parse_sia_id(sia_id):
     raise ValueError("Incorrect value for sia_id: '{}'".format(sia_id))
 
 
+def _get_status_text(request_data):
+    """Get the text of the status update from an actualiseerZaakstatus_Lk01 message."""
+    default_text = 'Melding is afgehandeld door THOR.'
+
+    # We strip whitespace
+    if request_data['resultaat'].strip() and request_data['reden'].strip():
+        return '{}: {}'.format(
+            request_data['resultaat'].strip(),
+            request_data['reden'].strip()
+        )
+    elif request_data['resultaat'].strip():  # only resultaat
+        return '{}: Geen reden aangeleverd vanuit THOR'.format(
+            request_data['resultaat'].strip()
+        )
+    elif request_data['reden'].strip():
+        return 'Geen resultaat aangeleverd vanuit THOR: {}'.format(
+            request_data['reden']
+        )
+    return default_text
+
+
 def _handle_actualiseerZaakstatus_Lk01(request):
     """
     Checks that incoming message has required info, updates Signal if ok.
     """
     # TODO: Check that the incoming message matches our expectations, else Fo03
 
-    request_data = _parse_actualiseerZaakstatus_Lk01(request.body)
+    try:
+        request_data = _parse_actualiseerZaakstatus_Lk01(request.body)
+    except (RequestDataTooBig, stuf.StufMessageTooLarge, etree.XMLSyntaxError) as e:
+        error_msg = f'Bericht kan niet worden verwerkt: {e}'
+        logger.warning(error_msg, exc_info=True)
+        return render(
+            request,
+            'sigmax/actualiseerZaakstatus_Fo03.xml',
+            context={'error_msg': error_msg, },
+            content_type='text/xml; charset=utf-8',
+            status=500)
     sia_id = request_data['sia_id']
 
     # Retrieve the relevant Signal, error out if it cannot be found
@@ -98,28 +113,9 @@ def _handle_actualiseerZaakstatus_Lk01(request):
             status=500)
 
     # update Signal status upon receiving message
-    default_text = 'Melding is afgehandeld door THOR.'
-
-    # We strip whitespace
-    if request_data['resultaat'].strip() and request_data['reden'].strip():
-        status_text = '{}: {}'.format(
-            request_data['resultaat'].strip(),
-            request_data['reden'].strip()
-        )
-    elif request_data['resultaat'].strip():  # only resultaat
-        status_text = '{}: Geen reden aangeleverd vanuit THOR'.format(
-            request_data['resultaat'].strip()
-        )
-    elif request_data['reden'].strip():
-        status_text = 'Geen resultaat aangeleverd vanuit THOR: {}'.format(
-            request_data['reden']
-        )
-    else:
-        status_text = default_text
-
     status_data = {
         'state': workflow.AFGEHANDELD_EXTERN,
-        'text': status_text,
+        'text': _get_status_text(request_data),
         'extra_properties': {
             'sigmax_datum_afgehandeld': request_data['datum_afgehandeld'],
             'sigmax_resultaat': request_data['resultaat'],
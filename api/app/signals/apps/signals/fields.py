@@ -4,6 +4,7 @@ from rest_framework import serializers
 from rest_framework.reverse import reverse
 
 from signals.apps.signals.models import SubCategory
+from signals.apps.signals.taxonomy import get_taxonomy
 
 
 class SignalLinksField(serializers.HyperlinkedIdentityField):
@@ -135,9 +136,11 @@ class SubCategoryHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
         return url
 
     def get_object(self, view_name, view_args, view_kwargs):
-        return self.get_queryset().get(
-            main_category__slug=view_kwargs['slug'],
-            slug=view_kwargs['sub_slug'])
+        sub_category = get_taxonomy().get_sub_category_by_slugs(
+            view_kwargs['slug'], view_kwargs['sub_slug'])
+        if sub_category is None:
+            raise SubCategory.DoesNotExist()
+        return sub_category
 
 
 class NoteHyperlinkedIdentityField(serializers.HyperlinkedIdentityField):
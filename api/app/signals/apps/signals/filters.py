@@ -5,16 +5,8 @@ from django_filters.rest_framework import FilterSet, filters
 from rest_framework.filters import OrderingFilter
 from rest_framework.serializers import ValidationError
 
-from signals.apps.signals.models import (
-    STADSDELEN,
-    Buurt,
-    Location,
-    MainCategory,
-    Priority,
-    Signal,
-    Status,
-    SubCategory
-)
+from signals.apps.signals.models import STADSDELEN, Buurt, Location, Priority, Signal, Status
+from signals.apps.signals.taxonomy import get_taxonomy
 from signals.apps.signals.workflow import STATUS_CHOICES
 
 
@@ -54,19 +46,33 @@ def status_choices():
     return [(c, f'{n} ({c})') for c, n in STATUS_CHOICES]
 
 
+def main_category_choices():
+    return [(main.name, main.name) for main in get_taxonomy().main_categories]
+
+
+def sub_category_choices():
+    names = sorted(set(sub.name for sub in get_taxonomy().sub_categories))
+    return [(name, name) for name in names]
+
+
 class SignalFilter(FilterSet):
     id = filters.CharFilter()
     in_bbox = filters.CharFilter(method='in_bbox_filter', label='bbox')
     geo = filters.CharFilter(method="locatie_filter", label='x,y,r')
 
-    location__stadsdeel = filters.MultipleChoiceFilter(choices=STADSDELEN)
-    location__buurt_code = filters.MultipleChoiceFilter(choices=buurt_choices)
-    location__address_text = filters.CharFilter(lookup_expr='icontains')
-
-    created_at = filters.DateFilter(field_name='created_at', lookup_expr='date')
-    created_at__gte = filters.DateFilter(field_name='created_at',
+    # Filtering on the denormalized current state of a `Signal` where possible, avoiding joins with
+    # the `Location`, `Status`, `CategoryAssignment` and `Priority` tables.
+    location__stadsdeel = filters.MultipleChoiceFilter(field_name='current_state__stadsdeel',
+                                                       choices=STADSDELEN)
+    location__buurt_code = filters.MultipleChoiceFilter(field_name='current_state__buurt_code',
+                                                        choices=buurt_choices)
+    location__address_text = filters.CharFilter(field_name='current_state__address_text',
+                                                lookup_expr='icontains')
+
+    created_at = filters.DateFilter(field_name='current_state__created_at', lookup_expr='date')
+    created_at__gte = filters.DateFilter(field_name='current_state__created_at',
                                          lookup_expr='date__gte')
-    created_at__lte = filters.DateFilter(field_name='created_at',
+    created_at__lte = filters.DateFilter(field_name='current_state__created_at',
                                          lookup_expr='date__lte')
 
     updated_at = filters.DateFilter(field_name='updated_at', lookup_expr='date')
@@ -93,16 +99,14 @@ class SignalFilter(FilterSet):
     expire_date__lte = filters.DateFilter(field_name='expire_date',
                                           lookup_expr='date__lte')
 
-    status__state = filters.MultipleChoiceFilter(choices=status_choices)
-    category__main = filters.ModelMultipleChoiceFilter(
-        queryset=MainCategory.objects.all(),
-        to_field_name='name',
-        field_name='category_assignment__sub_category__main_category__name')
-    category__sub = filters.ModelMultipleChoiceFilter(
-        queryset=SubCategory.objects.all(),
-        to_field_name='name',
-        field_name='category_assignment__sub_category__name')
-    priority__priority = filters.MultipleChoiceFilter(choices=Priority.PRIORITY_CHOICES)
+    status__state = filters.MultipleChoiceFilter(field_name='current_state__state',
+                                                 choices=status_choices)
+    category__main = filters.MultipleChoiceFilter(choices=main_category_choices,
+                                                  method='category_main_filter')
+    category__sub = filters.MultipleChoiceFilter(choices=sub_category_choices,
+                                                 method='category_sub_filter')
+    priority__priority = filters.MultipleChoiceFilter(field_name='current_state__priority',
+                                                      choices=Priority.PRIORITY_CHOICES)
 
     class Meta(object):
         model = Signal
@@ -120,6 +124,23 @@ class SignalFilter(FilterSet):
             'geo',
         )
 
+    def category_main_filter(self, qs, name, value):
+        if not value:
+            return qs
+        taxonomy = get_taxonomy()
+        # A category can be renamed after the choices were validated.
+        main_categories = [taxonomy.get_main_category_by_name(main_name) for main_name in value]
+        main_slugs = [main.slug for main in main_categories if main is not None]
+        return qs.filter(current_state__main_slug__in=main_slugs)
+
+    def category_sub_filter(self, qs, name, value):
+        if not value:
+            return qs
+        taxonomy = get_taxonomy()
+        sub_category_ids = [sub.id for sub_name in value
+                            for sub in taxonomy.get_sub_categories_by_name(sub_name)]
+        return qs.filter(current_state__sub_category__in=sub_category_ids)
+
     def in_bbox_filter(self, qs, name, value):
         bbox_values, err = bbox.valid_bbox(value)
         lat1, lon1, lat2, lon2 = bbox_values
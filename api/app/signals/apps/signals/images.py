@@ -0,0 +1,85 @@
+"""
+Image variants of the photo attached to a `Signal`.
+
+The variants (`image_crop`, `image_thumbnail` and `image_stripped`) are `ImageSpecField`s, by
+default imagekit generates them "just in time", i.e. during the request that first needs them.
+Resizing an 8Mb photo takes long enough to show up in the response times of the dashboard and the
+PDF export, that's why the variants are generated by a Celery task as soon as the photo is saved.
+"""
+from django.db import transaction
+
+# Names of the `ImageSpecField`s on the `Signal` model generated in the background.
+IMAGE_VARIANTS = ('image_crop', 'image_thumbnail', 'image_stripped')
+
+
+class GenerateInBackground:
+    """Imagekit cache file strategy generating the image variants with a Celery task.
+
+    - When the photo of a signal is saved, the `generate_image_variants` task is scheduled (once
+      per signal) after the transaction is committed.
+    - Getting the url of a variant never generates it, use `get_image_variant` to fall back to the
+      original photo while the variant doesn't exist yet.
+    - Reading the contents of a variant (e.g. when rendering a PDF) generates it when it doesn't
+      exist yet.
+    """
+
+    def on_source_saved(self, file):
+        instance = file.generator.source.instance
+        if getattr(instance, '_image_variants_scheduled', False):
+            return
+        instance._image_variants_scheduled = True
+
+        pk = instance.pk
+
+        def schedule():
+            # Later changes of the photo of the same instance are scheduled again.
+            instance._image_variants_scheduled = False
+            _schedule(pk)
+
+        transaction.on_commit(schedule)
+
+    def on_content_required(self, file):
+        file.generate()
+
+    def should_verify_existence(self, file):
+        return False
+
+
+def _schedule(pk):
+    from signals.apps.signals import tasks
+
+    tasks.generate_image_variants.delay(pk=pk)
+
+
+def generate_image_variants(signal, force=False):
+    """Generate all image variants of the photo of given signal.
+
+    :param signal: Signal object
+    :param force: regenerate the variants that already exist (Default: False)
+    :returns: list with the names of the generated image variants
+    """
+    if not signal.image:
+        return []
+
+    for name in IMAGE_VARIANTS:
+        getattr(signal, name).generate(force=force)
+    return list(IMAGE_VARIANTS)
+
+
+def get_image_variant(signal, name):
+    """Get given image variant of the photo of a signal, or the photo itself.
+
+    The variants are generated in the background, until then the original photo is returned. The
+    existence of the variant is cached by imagekit's cache file backend.
+
+    :param signal: Signal object
+    :param name: name of the image variant (see `IMAGE_VARIANTS`)
+    :returns: ImageCacheFile or ImageFieldFile object
+    """
+    if not signal.image:
+        return signal.image
+
+    variant = getattr(signal, name)
+    if variant.cachefile_backend.exists(variant):
+        return variant
+    return signal.image
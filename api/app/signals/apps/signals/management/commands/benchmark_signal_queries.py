@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand
+
+from signals.utils.benchmark_queries import benchmark_queries, seed_signals
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the dashboard signal queries, optionally seeding the database first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Number of signals to create before benchmarking')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Number of signals per batch when seeding')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Number of times each query is executed')
+        parser.add_argument('--explain', action='store_true',
+                            help='Show the query plans')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed_signals(options['seed'], batch_size=options['batch_size'])
+
+        for result in benchmark_queries(repeat=options['repeat']):
+            self.stdout.write('{name:<30} page: {page_ms:>10.2f} ms  count: {count_ms:>10.2f} ms'
+                              .format(**result))
+            if options['explain']:
+                self.stdout.write(result['plan'])
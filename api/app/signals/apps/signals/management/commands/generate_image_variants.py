@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+
+from signals.apps.signals.models import Signal
+from signals.apps.signals.tasks import generate_image_variants
+
+
+class Command(BaseCommand):
+    help = 'Schedule the generation of the image variants of all signals with a photo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate the image variants that already exist')
+
+    def handle(self, *args, **options):
+        pks = (Signal.objects.exclude(image__isnull=True).exclude(image='')
+               .values_list('pk', flat=True).iterator())
+        count = 0
+        for pk in pks:
+            generate_image_variants.delay(pk=pk, force=options['force'])
+            count += 1
+        self.stdout.write('Scheduled image variants of {} signals'.format(count))
@@ -1,5 +1,5 @@
 from django.contrib.gis.db import models
-from django.db import transaction
+from django.db import connection, transaction
 from django.dispatch import Signal as DjangoSignal
 
 # Declaring custom Django signals for our `SignalManager`.
@@ -36,32 +36,103 @@ class SignalManager(models.Manager):
         from .models import Location, Status, CategoryAssignment, Reporter, Priority
 
         with transaction.atomic():
-            signal = self.create(**signal_data)
+            # Foreign key constraints are deferred until the end of the transaction, so with a
+            # preallocated id the dependent model instances can be created before the Signal. This
+            # way the Signal row is written once, including its foreign keys.
+            signal_id, = self._allocate_ids(1)
 
             # Set default (empty dict) value for `priority_data` if None is given.
             priority_data = priority_data or {}
 
             # Create dependent model instances with correct foreign keys to Signal
-            location = Location.objects.create(**location_data, _signal_id=signal.pk)
-            status = Status.objects.create(**status_data, _signal_id=signal.pk)
+            location = Location.objects.create(**location_data, _signal_id=signal_id)
+            status = Status.objects.create(**status_data, _signal_id=signal_id)
             category_assignment = CategoryAssignment.objects.create(**category_assignment_data,
-                                                                    _signal_id=signal.pk)
-            reporter = Reporter.objects.create(**reporter_data, _signal_id=signal.pk)
-            priority = Priority.objects.create(**priority_data, _signal_id=signal.pk)
+                                                                    _signal_id=signal_id)
+            reporter = Reporter.objects.create(**reporter_data, _signal_id=signal_id)
+            priority = Priority.objects.create(**priority_data, _signal_id=signal_id)
 
-            # Set Signal to dependent model instance foreign keys
-            signal.location = location
-            signal.status = status
-            signal.category_assignment = category_assignment
-            signal.reporter = reporter
-            signal.priority = priority
-            signal.save()
+            signal = self.create(**signal_data,
+                                 id=signal_id,
+                                 location=location,
+                                 status=status,
+                                 category_assignment=category_assignment,
+                                 reporter=reporter,
+                                 priority=priority)
+
+            self.refresh_current_state(signal)
 
             transaction.on_commit(lambda: create_initial.send(sender=self.__class__,
                                                               signal_obj=signal))
 
         return signal
 
+    def create_initial_bulk(self, signals_data):
+        """Create new `Signal` objects with all related objects in bulk.
+
+        Every table is inserted with a single `bulk_create`, see `create_initial` for why the
+        dependent model instances are created before the `Signal` objects.
+
+        :param signals_data: list of dicts with the arguments of `create_initial` as keys
+        :returns: list of Signal objects
+        """
+        from .models import (Location, Status, CategoryAssignment, Reporter, Priority,
+                             SignalCurrentState)
+
+        if not signals_data:
+            return []
+
+        with transaction.atomic():
+            signal_ids = self._allocate_ids(len(signals_data))
+            signals_kwargs = [dict(data['signal_data'], id=signal_id)
+                              for signal_id, data in zip(signal_ids, signals_data)]
+
+            related_models = (
+                ('location', Location, 'location_data'),
+                ('status', Status, 'status_data'),
+                ('category_assignment', CategoryAssignment, 'category_assignment_data'),
+                ('reporter', Reporter, 'reporter_data'),
+                ('priority', Priority, 'priority_data'),
+            )
+            for field_name, model, data_key in related_models:
+                related_objects = [model(**(data.get(data_key) or {}), _signal_id=signal_id)
+                                   for signal_id, data in zip(signal_ids, signals_data)]
+                if model is Location:
+                    # `bulk_create` doesn't call `Location.save()`, which sets the address text.
+                    for location in related_objects:
+                        location.set_address_text()
+                model.objects.bulk_create(related_objects)
+                for kwargs, related_object in zip(signals_kwargs, related_objects):
+                    kwargs[field_name] = related_object
+
+            signals = self.bulk_create([self.model(**kwargs) for kwargs in signals_kwargs])
+
+            SignalCurrentState.objects.bulk_create([
+                SignalCurrentState(_signal=signal, **SignalCurrentState.get_values(signal))
+                for signal in signals
+            ])
+
+            def send_create_initial():
+                for signal in signals:
+                    create_initial.send(sender=self.__class__, signal_obj=signal)
+
+            transaction.on_commit(send_create_initial)
+
+        return signals
+
+    def _allocate_ids(self, count):
+        """Allocate primary keys for new `Signal` objects from the database sequence.
+
+        :param count: number of primary keys to allocate
+        :returns: list of primary keys
+        """
+        opts = self.model._meta
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(pg_get_serial_sequence(%s, %s)) '
+                           'FROM generate_series(1, %s)',
+                           [opts.db_table, opts.pk.column, count])
+            return [row[0] for row in cursor.fetchall()]
+
     def update_location(self, data, signal):
         """Update (create new) `Location` object for given `Signal` object.
 
@@ -72,11 +143,14 @@ class SignalManager(models.Manager):
         from .models import Location
 
         with transaction.atomic():
+            self._lock(signal)
             prev_location = signal.location
 
             location = Location.objects.create(**data, _signal_id=signal.id)
             signal.location = location
-            signal.save()
+            signal.save(update_fields=['location', 'updated_at'])
+
+            self.refresh_current_state(signal)
 
             transaction.on_commit(lambda: update_location.send(sender=self.__class__,
                                                                signal_obj=signal,
@@ -95,13 +169,17 @@ class SignalManager(models.Manager):
         from .models import Status
 
         with transaction.atomic():
+            self._lock(signal)
+
             status = Status(_signal=signal, **data)
             status.full_clean()
             status.save()
 
             prev_status = signal.status
             signal.status = status
-            signal.save()
+            signal.save(update_fields=['status', 'updated_at'])
+
+            self.refresh_current_state(signal)
 
             transaction.on_commit(lambda: update_status.send(sender=self.__class__,
                                                              signal_obj=signal,
@@ -120,11 +198,14 @@ class SignalManager(models.Manager):
         from .models import CategoryAssignment
 
         with transaction.atomic():
+            self._lock(signal)
             prev_category_assignment = signal.category_assignment
 
             category_assignment = CategoryAssignment.objects.create(**data, _signal_id=signal.id)
             signal.category_assignment = category_assignment
-            signal.save()
+            signal.save(update_fields=['category_assignment', 'updated_at'])
+
+            self.refresh_current_state(signal)
 
             transaction.on_commit(lambda: update_category_assignment.send(
                 sender=self.__class__,
@@ -144,11 +225,12 @@ class SignalManager(models.Manager):
         from .models import Reporter
 
         with transaction.atomic():
+            self._lock(signal)
             prev_reporter = signal.reporter
 
             reporter = Reporter.objects.create(**data, _signal_id=signal.id)
             signal.reporter = reporter
-            signal.save()
+            signal.save(update_fields=['reporter', 'updated_at'])
 
             transaction.on_commit(lambda: update_reporter.send(sender=self.__class__,
                                                                signal_obj=signal,
@@ -167,11 +249,14 @@ class SignalManager(models.Manager):
         from .models import Priority
 
         with transaction.atomic():
+            self._lock(signal)
             prev_priority = signal.priority
 
             priority = Priority.objects.create(**data, _signal_id=signal.id)
             signal.priority = priority
-            signal.save()
+            signal.save(update_fields=['priority', 'updated_at'])
+
+            self.refresh_current_state(signal)
 
             transaction.on_commit(lambda: update_priority.send(sender=self.__class__,
                                                                signal_obj=signal,
@@ -180,6 +265,36 @@ class SignalManager(models.Manager):
 
         return priority
 
+    def _lock(self, signal):
+        """Lock the row of given `Signal` object until the end of the current transaction.
+
+        Concurrent mutators of the same `Signal` are serialized this way. The one-to-one relations
+        are reloaded after locking, because they may have been changed by one of them.
+
+        :param signal: Signal object
+        :returns: None
+        """
+        pointer_fields = ('location', 'status', 'category_assignment', 'reporter', 'priority')
+        locked_signal = (self.get_queryset()
+                         .select_for_update(of=('self', ))
+                         .select_related(*pointer_fields)
+                         .only('id', *pointer_fields)
+                         .get(pk=signal.pk))
+        for field_name in pointer_fields:
+            setattr(signal, field_name, getattr(locked_signal, field_name))
+
+    def refresh_current_state(self, signal):
+        """Update (or create) the denormalized `SignalCurrentState` for given `Signal` object.
+
+        :param signal: Signal object
+        :returns: SignalCurrentState object
+        """
+        from .models import SignalCurrentState
+
+        current_state, _ = SignalCurrentState.objects.update_or_create(
+            _signal=signal, defaults=SignalCurrentState.get_values(signal))
+        return current_state
+
     def create_note(self, data, signal):
         """Create a new `Note` object for a given `Signal` object.
 
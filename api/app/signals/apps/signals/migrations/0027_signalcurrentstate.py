@@ -0,0 +1,99 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_signal_current_state(apps, schema_editor):
+    """Populate `SignalCurrentState` for all existing `Signal` objects."""
+    Signal = apps.get_model('signals', 'Signal')
+    SignalCurrentState = apps.get_model('signals', 'SignalCurrentState')
+
+    signals = Signal.objects.select_related(
+        'status',
+        'location',
+        'category_assignment__sub_category__main_category',
+        'priority',
+    ).order_by('pk')
+
+    batch = []
+    for signal in signals.iterator(chunk_size=2000):
+        location = signal.location
+        sub_category = (signal.category_assignment.sub_category
+                        if signal.category_assignment else None)
+
+        batch.append(SignalCurrentState(
+            _signal_id=signal.pk,
+            state=signal.status.state if signal.status else '',
+            stadsdeel=location.stadsdeel if location else None,
+            buurt_code=location.buurt_code if location else None,
+            address_text=location.address_text if location else None,
+            sub_category=sub_category,
+            sub_slug=sub_category.slug if sub_category else '',
+            main_slug=sub_category.main_category.slug if sub_category else '',
+            priority=signal.priority.priority if signal.priority else None,
+            created_at=signal.created_at,
+        ))
+
+        if len(batch) == 2000:
+            SignalCurrentState.objects.bulk_create(batch)
+            batch = []
+
+    SignalCurrentState.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0026_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignalCurrentState',
+            fields=[
+                ('_signal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE,
+                                                 primary_key=True,
+                                                 related_name='current_state',
+                                                 serialize=False,
+                                                 to='signals.Signal')),
+                ('state', models.CharField(blank=True, choices=[
+                    ('m', 'Gemeld'),
+                    ('i', 'In afwachting van behandeling'),
+                    ('b', 'In behandeling'),
+                    ('h', 'On hold'),
+                    ('ready to send', 'Te verzenden naar extern systeem'),
+                    ('o', 'Afgehandeld'),
+                    ('a', 'Geannuleerd'),
+                    ('sent', 'Verzonden naar extern systeem'),
+                    ('send failed', 'Verzending naar extern systeem mislukt'),
+                    ('done external', 'Melding is afgehandeld in extern systeem')
+                ], max_length=20)),
+                ('stadsdeel', models.CharField(choices=[
+                    ('A', 'Centrum'),
+                    ('B', 'Westpoort'),
+                    ('E', 'West'),
+                    ('M', 'Oost'),
+                    ('N', 'Noord'),
+                    ('T', 'Zuidoost'),
+                    ('K', 'Zuid'),
+                    ('F', 'Nieuw-West')],
+                    max_length=1, null=True)),
+                ('buurt_code', models.CharField(max_length=4, null=True)),
+                ('address_text', models.CharField(max_length=256, null=True)),
+                ('sub_slug', models.SlugField(blank=True)),
+                ('main_slug', models.SlugField(blank=True)),
+                ('priority', models.CharField(choices=[('normal', 'Normal'), ('high', 'High')],
+                                              max_length=10,
+                                              null=True)),
+                ('created_at', models.DateTimeField(editable=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sub_category', models.ForeignKey(null=True,
+                                                   on_delete=django.db.models.deletion.SET_NULL,
+                                                   related_name='+',
+                                                   to='signals.SubCategory')),
+            ],
+            options={
+                'verbose_name_plural': 'Signal current states',
+            },
+        ),
+        migrations.RunPython(populate_signal_current_state, migrations.RunPython.noop),
+    ]
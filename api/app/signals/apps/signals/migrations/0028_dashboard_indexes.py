@@ -0,0 +1,73 @@
+from django.db import migrations, models
+
+# Django 2.1 doesn't support partial and expression indexes in `Meta.indexes`, so these are created
+# with raw SQL. The partial indexes only cover the open signals (the closed states are 'o'
+# (afgehandeld), 'done external' (afgehandeld extern) and 'a' (geannuleerd)), the dashboard mostly
+# shows those. The expression indexes match the SQL of the `created_at__date` lookups, which casts
+# to a date in the `TIME_ZONE` setting ('Europe/Amsterdam').
+CREATE_INDEXES_SQL = """
+CREATE INDEX signals_cs_open_created_at_idx
+    ON signals_signalcurrentstate (created_at DESC)
+    WHERE state NOT IN ('o', 'done external', 'a');
+CREATE INDEX signals_cs_open_state_idx
+    ON signals_signalcurrentstate (state, created_at DESC)
+    WHERE state NOT IN ('o', 'done external', 'a');
+CREATE INDEX signals_cs_created_at_date_idx
+    ON signals_signalcurrentstate (((created_at AT TIME ZONE 'Europe/Amsterdam')::date));
+CREATE INDEX signals_signal_created_at_date_idx
+    ON signals_signal (((created_at AT TIME ZONE 'Europe/Amsterdam')::date));
+"""
+
+DROP_INDEXES_SQL = """
+DROP INDEX signals_cs_open_created_at_idx;
+DROP INDEX signals_cs_open_state_idx;
+DROP INDEX signals_cs_created_at_date_idx;
+DROP INDEX signals_signal_created_at_date_idx;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0027_signalcurrentstate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='signal',
+            index=models.Index(fields=['created_at'], name='signals_signal_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcurrentstate',
+            index=models.Index(fields=['-created_at'], name='signals_cs_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcurrentstate',
+            index=models.Index(fields=['state', '-created_at'], name='signals_cs_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcurrentstate',
+            index=models.Index(fields=['stadsdeel', '-created_at'],
+                               name='signals_cs_stadsdeel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcurrentstate',
+            index=models.Index(fields=['buurt_code', '-created_at'],
+                               name='signals_cs_buurt_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcurrentstate',
+            index=models.Index(fields=['main_slug', '-created_at'],
+                               name='signals_cs_main_slug_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcurrentstate',
+            index=models.Index(fields=['sub_category', '-created_at'], name='signals_cs_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcurrentstate',
+            index=models.Index(fields=['priority', '-created_at'],
+                               name='signals_cs_priority_idx'),
+        ),
+        migrations.RunSQL(CREATE_INDEXES_SQL, DROP_INDEXES_SQL),
+    ]
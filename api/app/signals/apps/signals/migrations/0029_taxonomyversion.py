@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_taxonomy_version(apps, schema_editor):
+    """
+    Create the single row holding the version of the category taxonomy.
+    """
+    TaxonomyVersion = apps.get_model('signals', 'TaxonomyVersion')
+    TaxonomyVersion.objects.get_or_create(pk=1, defaults={'last_modified': timezone.now()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0028_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxonomyVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True,
+                                        primary_key=True,
+                                        serialize=False,
+                                        verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('last_modified', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(create_taxonomy_version, migrations.RunPython.noop),
+    ]
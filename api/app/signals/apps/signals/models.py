@@ -9,13 +9,16 @@ from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 from imagekit.models import ImageSpecField
-from imagekit.processors import ResizeToFit
+from imagekit.processors import ResizeToFit, Transpose
 from swift.storage import SwiftStorage
 
 from signals.apps.signals import workflow
+from signals.apps.signals.images import get_image_variant
 from signals.apps.signals.managers import SignalManager
 from signals.apps.signals.workflow import STATUS_CHOICES
 
+IMAGE_CACHEFILE_STRATEGY = 'signals.apps.signals.images.GenerateInBackground'
+
 
 class CreatedUpdatedModel(models.Model):
     created_at = models.DateTimeField(editable=False, auto_now_add=True)
@@ -80,7 +83,19 @@ class Signal(CreatedUpdatedModel):
     image_crop = ImageSpecField(source='image',
                                 processors=[ResizeToFit(800, 800), ],
                                 format='JPEG',
-                                options={'quality': 80})
+                                options={'quality': 80},
+                                cachefile_strategy=IMAGE_CACHEFILE_STRATEGY)
+    image_thumbnail = ImageSpecField(source='image',
+                                     processors=[Transpose(), ResizeToFit(200, 200), ],
+                                     format='JPEG',
+                                     options={'quality': 80},
+                                     cachefile_strategy=IMAGE_CACHEFILE_STRATEGY)
+    # Full size photo, rotated according to and stripped of its EXIF data (e.g. GPS location).
+    image_stripped = ImageSpecField(source='image',
+                                    processors=[Transpose(), ],
+                                    format='JPEG',
+                                    options={'quality': 90},
+                                    cachefile_strategy=IMAGE_CACHEFILE_STRATEGY)
 
     # file will be saved to MEDIA_ROOT/uploads/2015/01/30
     upload = ArrayField(models.FileField(upload_to='uploads/%Y/%m/%d/'), null=True)
@@ -92,6 +107,9 @@ class Signal(CreatedUpdatedModel):
 
     class Meta:
         ordering = ('created_at', )
+        indexes = [
+            models.Index(fields=['created_at'], name='signals_signal_created_at_idx'),
+        ]
 
     def __init__(self, *args, **kwargs):
         super(Signal, self).__init__(*args, **kwargs)
@@ -125,17 +143,25 @@ class Signal(CreatedUpdatedModel):
         """
         return 'SIA-{id}'.format(id=self.id)
 
+    def get_image_crop(self):
+        """Get the cropped photo, or the original photo while the crop is not generated yet.
+
+        :returns: ImageCacheFile or ImageFieldFile object
+        """
+        return get_image_variant(self, 'image_crop')
+
     def get_fqdn_image_crop_url(self):
         """Get FQDN image crop url.
 
         :returns: url (str) or None
         """
-        if not self.image_crop:
+        if not self.image:
             return None
 
-        is_swift = isinstance(self.image_crop.storage, SwiftStorage)
+        image_crop = self.get_image_crop()
+        is_swift = isinstance(image_crop.storage, SwiftStorage)
         if is_swift:
-            return self.image_crop.url  # Generated temp url from Swift Object Store.
+            return image_crop.url  # Generated temp url from Swift Object Store.
         else:
             # Generating a fully qualified url ourself.
             current_site = Site.objects.get_current()
@@ -143,7 +169,7 @@ class Signal(CreatedUpdatedModel):
             fqdn_url = '{scheme}://{domain}{path}'.format(
                 scheme='http' if is_local else 'https',
                 domain=current_site.domain,
-                path=self.image_crop.url)
+                path=image_crop.url)
             return fqdn_url
 
 
@@ -369,6 +395,74 @@ class Priority(CreatedUpdatedModel):
         return self.get_priority_display()
 
 
+class SignalCurrentState(models.Model):
+    """Denormalized current state of a `Signal`, used for listing, filtering and ordering.
+
+    Maintained by the `SignalManager` actions, do not update this model directly.
+    """
+    _signal = models.OneToOneField('signals.Signal',
+                                   primary_key=True,
+                                   related_name='current_state',
+                                   on_delete=models.CASCADE)
+
+    state = models.CharField(max_length=20, blank=True, choices=workflow.STATUS_CHOICES)
+    stadsdeel = models.CharField(null=True, max_length=1, choices=STADSDELEN)
+    buurt_code = models.CharField(null=True, max_length=4)
+    address_text = models.CharField(null=True, max_length=256)
+    sub_category = models.ForeignKey('signals.SubCategory',
+                                     null=True,
+                                     related_name='+',
+                                     on_delete=models.SET_NULL)
+    sub_slug = models.SlugField(blank=True)
+    main_slug = models.SlugField(blank=True)
+    priority = models.CharField(null=True, max_length=10, choices=Priority.PRIORITY_CHOICES)
+    created_at = models.DateTimeField(editable=False)
+    updated_at = models.DateTimeField(editable=False, auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Signal current states'
+        # Composite indexes matching the dashboard filters combined with the default ordering on
+        # `-created_at`. Partial and expression indexes are created in migration `0028`.
+        indexes = [
+            models.Index(fields=['-created_at'], name='signals_cs_created_at_idx'),
+            models.Index(fields=['state', '-created_at'], name='signals_cs_state_idx'),
+            models.Index(fields=['stadsdeel', '-created_at'], name='signals_cs_stadsdeel_idx'),
+            models.Index(fields=['buurt_code', '-created_at'], name='signals_cs_buurt_code_idx'),
+            models.Index(fields=['main_slug', '-created_at'], name='signals_cs_main_slug_idx'),
+            models.Index(fields=['sub_category', '-created_at'], name='signals_cs_sub_idx'),
+            models.Index(fields=['priority', '-created_at'], name='signals_cs_priority_idx'),
+        ]
+
+    def __str__(self):
+        """String representation."""
+        return '{} - {}'.format(self._signal_id, self.state)
+
+    @staticmethod
+    def get_values(signal):
+        """Get the denormalized values for given `Signal` object.
+
+        :param signal: Signal object
+        :returns: dict
+        """
+        status = signal.status
+        location = signal.location
+        category_assignment = signal.category_assignment
+        priority = signal.priority
+        sub_category = category_assignment.sub_category if category_assignment else None
+
+        return {
+            'state': status.state if status else '',
+            'stadsdeel': location.stadsdeel if location else None,
+            'buurt_code': location.buurt_code if location else None,
+            'address_text': location.address_text if location else None,
+            'sub_category': sub_category,
+            'sub_slug': sub_category.slug if sub_category else '',
+            'main_slug': sub_category.main_category.slug if sub_category else '',
+            'priority': priority.priority if priority else None,
+            'created_at': signal.created_at,
+        }
+
+
 #
 # Category terms
 #
@@ -456,6 +550,20 @@ class Department(models.Model):
         return '{code} ({name})'.format(code=self.code, name=self.name)
 
 
+class TaxonomyVersion(models.Model):
+    """Version of the category taxonomy, a single row (see `signals.apps.signals.taxonomy`).
+
+    Incremented in the same transaction as every change of the taxonomy models, so all processes
+    agree on the version of the committed taxonomy.
+    """
+    version = models.PositiveIntegerField(default=1)
+    last_modified = models.DateTimeField()
+
+    def __str__(self):
+        """String representation."""
+        return str(self.version)
+
+
 class Note(CreatedUpdatedModel):
     """Notes field for `Signal` instance."""
     _signal = models.ForeignKey('signals.Signal',
@@ -0,0 +1,234 @@
+import hashlib
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from datapunt_api.pagination import HALPagination
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework import pagination, response
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+COUNT_EXACT = 'exact'
+COUNT_APPROXIMATE = 'approximate'
+
+
+class HALCursorPagination(pagination.BasePagination):
+    """Keyset (cursor) based pagination in HAL-JSON style.
+
+    The queryset is ordered by the first ordering field of the view (see `OrderingFilter`) and the
+    primary key as tie-breaker. Instead of an `OFFSET` the next (or previous) page is selected with
+    a `WHERE` clause on the values of the last (or first) row of the current page, so all pages are
+    equally expensive to fetch.
+
+    The total count is left out by default, with the `count` query parameter it can be opted-in:
+
+    - `count=approximate`: the number of rows estimated by the PostgreSQL query planner.
+    - `count=exact`: the exact count, cached for `PAGINATION_COUNT_CACHE_TIMEOUT` seconds.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = None
+
+    # Used when the view has no `OrderingFilter` backend or ordering configured.
+    ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        if self.base_url.endswith('.api'):
+            self.base_url = self.base_url[:-4]
+
+        page_size = self.get_page_size(request)
+        field = self.get_ordering(request, queryset, view)
+        cursor = self.decode_cursor(request)
+
+        self.count = self.get_count(queryset, request)
+        queryset = queryset.annotate(keyset_value=F(field.lstrip('-')))
+
+        descending = field.startswith('-')
+        reverse = cursor is not None and cursor['reverse']
+        if reverse:
+            descending = not descending
+
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(cursor['value'], cursor['pk'], descending))
+
+        if descending:
+            queryset = queryset.order_by('-keyset_value', '-pk')
+        else:
+            queryset = queryset.order_by('keyset_value', 'pk')
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.next_position = results[-1] if results else None
+        self.previous_position = results[0] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        return response.Response(OrderedDict([
+            ('_links', OrderedDict([
+                ('self', dict(href=self.base_url)),
+                ('next', dict(href=self.get_next_link())),
+                ('previous', dict(href=self.get_previous_link())),
+            ])),
+            ('count', self.count),
+            ('results', data)
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        if self.max_page_size:
+            return min(page_size, self.max_page_size)
+        return page_size
+
+    def get_ordering(self, request, queryset, view):
+        """Get the (possibly mapped) database field name the queryset is ordered on.
+
+        Only the first ordering field is used, the primary key is always used as tie-breaker.
+
+        :param request: Request object
+        :param queryset: Queryset object
+        :param view: View object
+        :returns: field name, prefixed with `-` for descending order (str)
+        """
+        for filter_class in getattr(view, 'filter_backends', ()):
+            if issubclass(filter_class, OrderingFilter):
+                ordering = filter_class().get_ordering(request, queryset, view)
+                if ordering:
+                    return ordering[0]
+        return self.ordering
+
+    def get_keyset_filter(self, value, pk, descending):
+        """Get the filter selecting the rows after given position.
+
+        PostgreSQL sorts `NULL` values as larger than any other value, that's why `NULL` values are
+        handled separately.
+
+        :param value: value of the ordering field at the current position
+        :param pk: primary key at the current position
+        :param descending: boolean
+        :returns: Q object
+        """
+        if descending:
+            if value is None:
+                return Q(keyset_value__isnull=True, pk__lt=pk) | Q(keyset_value__isnull=False)
+            return Q(keyset_value__lt=value) | Q(keyset_value=value, pk__lt=pk)
+
+        if value is None:
+            return Q(keyset_value__isnull=True, pk__gt=pk)
+        return (Q(keyset_value__gt=value) |
+                Q(keyset_value=value, pk__gt=pk) |
+                Q(keyset_value__isnull=True))
+
+    def get_count(self, queryset, request):
+        """Get the opted-in total count of the (filtered) queryset.
+
+        :param queryset: Queryset object
+        :param request: Request object
+        :returns: count (int) or None
+        """
+        count_type = request.query_params.get(self.count_query_param)
+        queryset = queryset.order_by()
+
+        if count_type == COUNT_EXACT:
+            sql, params = queryset.query.sql_with_params()
+            key = 'pagination-count-{}'.format(
+                hashlib.md5('{}{}'.format(sql, params).encode()).hexdigest())
+            return cache.get_or_set(key, queryset.count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+
+        if count_type == COUNT_APPROXIMATE:
+            sql, params = queryset.query.sql_with_params()
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute('EXPLAIN (FORMAT JSON) {}'.format(sql), params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]['Plan']['Plan Rows']
+
+        return None
+
+    def get_next_link(self):
+        if not self.has_next or self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.previous_position is None:
+            return replace_query_param(self.base_url, self.cursor_query_param, '')
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        value = obj.keyset_value
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+
+        data = json.dumps({'v': value, 'pk': obj.pk, 'r': reverse})
+        encoded = b64encode(data.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """Decode the cursor from the query parameters.
+
+        An empty cursor (`?cursor=`) selects the first page.
+
+        :param request: Request object
+        :raises: NotFound
+        :returns: dict with the position or None
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            data = json.loads(b64decode(encoded.encode('ascii')).decode('ascii'))
+            return {'value': data['v'], 'pk': int(data['pk']), 'reverse': bool(data['r'])}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound('Invalid cursor')
+
+
+class HALPaginationWithCursor(HALPagination):
+    """HAL-JSON style page number pagination with an opt-in keyset (cursor) pagination mode.
+
+    Keyset pagination is used when the `cursor` query parameter is given, `?cursor=` selects the
+    first page. See `HALCursorPagination`.
+    """
+    cursor_pagination_class = HALCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            self.cursor_pagination = self.cursor_pagination_class()
+            return self.cursor_pagination.paginate_queryset(queryset, request, view=view)
+
+        self.cursor_pagination = None
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,149 @@
+"""
+Content addressed cache of rendered PDFs.
+
+Rendering a PDF with WeasyPrint takes hundreds of milliseconds (and possibly fetching the photo of
+the signal), while the same PDF is often needed more than once (repeated prints, retries of the
+Sigmax push). Rendered PDFs are stored in the default file storage, under a name derived from
+everything that determines their contents (see `get_signal_pdf_version`). Outdated PDFs are
+never requested again, so cached PDFs older than `PDF_CACHE_MAX_AGE` seconds are deleted
+periodically (see `delete_expired_pdfs`).
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from signals.utils.locks import PDF_RENDER_LOCK, try_advisory_lock
+
+logger = logging.getLogger(__name__)
+
+# Change to invalidate all cached PDFs, e.g. when a PDF template changes.
+PDF_CACHE_VERSION = 1
+
+PDF_CACHE_DIRECTORY = 'pdf'
+
+
+def get_signal_pdf_version(signal):
+    """Get the version of given signal as far as its PDFs are concerned.
+
+    All changes to a signal (status, location, category, ...) are made through `Signal.actions`,
+    which updates `Signal.updated_at`. Notes are only visible through the history, they don't
+    update the signal, so the last note is added separately.
+
+    :param signal: Signal object
+    :returns: tuple
+    """
+    last_note_id = signal.notes.order_by('-id').values_list('id', flat=True).first()
+    return signal.pk, signal.updated_at.isoformat(), last_note_id
+
+
+def get_pdf_cache_name(*parts):
+    """Get the name of the cached PDF for given parts.
+
+    :param parts: values determining the contents of the PDF
+    :returns: file name (str)
+    """
+    key = repr((PDF_CACHE_VERSION, ) + parts).encode('utf-8')
+    digest = hashlib.sha256(key).hexdigest()
+    return '{}/{}/{}.pdf'.format(PDF_CACHE_DIRECTORY, digest[:2], digest)
+
+
+def get_or_render_pdf(parts, render):
+    """Get the cached PDF for given parts, rendering (and caching) it when it's not cached yet.
+
+    Only one process (API or Celery worker) renders a PDF at the same time, others wait for the
+    result (up to `PDF_RENDER_TIMEOUT` seconds) instead of rendering the same PDF again.
+
+    :param parts: tuple of values determining the contents of the PDF
+    :param render: function rendering the PDF, returns bytes
+    :returns: PDF (bytes)
+    """
+    name = get_pdf_cache_name(*parts)
+    content = _read(name)
+    if content is not None:
+        return content
+
+    with try_advisory_lock(PDF_RENDER_LOCK, _get_lock_key(name)) as acquired:
+        if not acquired:
+            content = _wait_for(name, timeout=settings.PDF_RENDER_TIMEOUT)
+            if content is not None:
+                return content
+
+        content = render()
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(content))
+    return content
+
+
+def get_cached_pdf(parts):
+    """Get the cached PDF for given parts, without rendering it.
+
+    :param parts: tuple of values determining the contents of the PDF
+    :returns: PDF (bytes) or None
+    """
+    return _read(get_pdf_cache_name(*parts))
+
+
+def delete_expired_pdfs(max_age=None):
+    """Delete the cached PDFs that were rendered more than `max_age` seconds ago.
+
+    :param max_age: maximum age in seconds (Default: `PDF_CACHE_MAX_AGE`)
+    :returns: number of deleted PDFs
+    """
+    max_age = settings.PDF_CACHE_MAX_AGE if max_age is None else max_age
+    expired_before = time.time() - max_age
+
+    deleted = 0
+    directories, _ = _listdir(PDF_CACHE_DIRECTORY + '/')
+    for directory in directories:
+        path = '{}/{}/'.format(PDF_CACHE_DIRECTORY, directory)
+        _, file_names = _listdir(path)
+        for file_name in file_names:
+            name = path + file_name
+            if _get_modified_time(name).timestamp() < expired_before:
+                default_storage.delete(name)
+                deleted += 1
+
+    logger.info('Deleted %s expired PDFs', deleted)
+    return deleted
+
+
+def _get_lock_key(name):
+    # The advisory lock keys are 32-bit integers.
+    return int(hashlib.sha256(name.encode('utf-8')).hexdigest()[:7], 16)
+
+
+def _listdir(path):
+    try:
+        return default_storage.listdir(path)
+    except FileNotFoundError:
+        return [], []
+
+
+def _get_modified_time(name):
+    try:
+        return default_storage.get_modified_time(name)
+    except NotImplementedError:
+        # `SwiftStorage` only implements the pre Django 2.0 API, which returns a naive datetime in
+        # local time (as does `datetime.timestamp` for naive datetimes).
+        return default_storage.modified_time(name)
+
+
+def _read(name):
+    if not default_storage.exists(name):
+        return None
+    with default_storage.open(name) as pdf_file:
+        return pdf_file.read()
+
+
+def _wait_for(name, timeout, interval=0.25):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        content = _read(name)
+        if content is not None:
+            return content
+    return None
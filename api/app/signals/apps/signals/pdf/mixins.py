@@ -4,15 +4,28 @@ from django.template.loader import render_to_string
 from django.views.generic.base import TemplateResponseMixin
 
 
+def render_pdf(template_name, context):
+    """Render given template to PDF.
+
+    :param template_name: name of the HTML template (or list of names)
+    :param context: template context (dict)
+    :returns: PDF (bytes)
+    """
+    html = render_to_string(template_name, context=context)
+    return weasyprint.HTML(string=html).write_pdf()
+
+
 class PDFTemplateResponseMixin(TemplateResponseMixin):
     pdf_filename = None
 
     def get_pdf_filename(self):
         return self.pdf_filename
 
+    def get_pdf_content(self, context):
+        return render_pdf(self.get_template_names(), context)
+
     def get_pdf_response(self, context, **response_kwargs):
-        html = render_to_string(self.get_template_names(), context=context)
-        content = weasyprint.HTML(string=html).write_pdf()
+        content = self.get_pdf_content(context)
 
         response = HttpResponse(content, content_type='application/pdf')
         filename = self.get_pdf_filename()
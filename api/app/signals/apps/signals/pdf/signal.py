@@ -0,0 +1,69 @@
+"""
+The printable PDF of a signal (see `GeneratePdfView`).
+"""
+from django.utils import timezone
+
+from signals.apps.signals.pdf.cache import get_cached_pdf, get_or_render_pdf, get_signal_pdf_version
+from signals.apps.signals.pdf.mixins import render_pdf
+
+PRINT_TEMPLATE_NAME = 'signals/pdf/print_signal.html'
+
+
+def get_print_context(signal, printed_by=None, printed_at=None):
+    """Get the template context of the printable PDF of given signal.
+
+    :param signal: Signal object
+    :param printed_by: username of the user printing the signal
+    :param printed_at: date the signal is printed (Default: today)
+    :returns: dict
+    """
+    rd_coordinates = signal.location.get_rd_coordinates()
+    bbox = '{},{},{},{}'.format(
+        rd_coordinates.x - 340.00,
+        rd_coordinates.y - 125.00,
+        rd_coordinates.x + 340.00,
+        rd_coordinates.y + 125.00,
+    )
+    return {
+        'signal': signal,
+        'bbox': bbox,
+        'printed_by': printed_by,
+        'printed_at': printed_at or timezone.localdate(),
+    }
+
+
+def get_print_pdf_parts(signal, printed_by=None, printed_at=None):
+    """Get the values determining the contents of the printable PDF of given signal.
+
+    :param signal: Signal object
+    :param printed_by: username of the user printing the signal
+    :param printed_at: date the signal is printed (Default: today)
+    :returns: tuple
+    """
+    printed_at = printed_at or timezone.localdate()
+    return ('print', ) + get_signal_pdf_version(signal) + (printed_by, printed_at.isoformat())
+
+
+def get_print_pdf(signal, printed_by=None, printed_at=None):
+    """Get the printable PDF of given signal, from the PDF cache when possible.
+
+    :param signal: Signal object
+    :param printed_by: username of the user printing the signal
+    :param printed_at: date the signal is printed (Default: today)
+    :returns: PDF (bytes)
+    """
+    printed_at = printed_at or timezone.localdate()
+    parts = get_print_pdf_parts(signal, printed_by, printed_at)
+    return get_or_render_pdf(parts, lambda: render_pdf(
+        PRINT_TEMPLATE_NAME, get_print_context(signal, printed_by, printed_at)))
+
+
+def get_cached_print_pdf(signal, printed_by=None, printed_at=None):
+    """Get the printable PDF of given signal from the PDF cache, without rendering it.
+
+    :param signal: Signal object
+    :param printed_by: username of the user printing the signal
+    :param printed_at: date the signal is printed (Default: today)
+    :returns: PDF (bytes) or None
+    """
+    return get_cached_pdf(get_print_pdf_parts(signal, printed_by, printed_at))
@@ -1,6 +1,18 @@
 from rest_framework import permissions
 
 
+class SignalPermission(permissions.BasePermission):
+    """Permission check for `Signal`."""
+
+    def has_permission(self, request, view):
+        if request.user:
+            if request.method == 'POST' and not request.user.has_perm('signals.add_signal'):
+                return False
+            return True
+        else:
+            return False
+
+
 class StatusPermission(permissions.BasePermission):
     """Permission check for `Status`."""
 
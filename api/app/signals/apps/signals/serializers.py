@@ -1,9 +1,11 @@
 import logging
 
 from datapunt_api.rest import DisplayField, HALSerializer
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.settings import api_settings
 
 from signals.apps.signals import workflow
 from signals.apps.signals.fields import (
@@ -59,7 +61,7 @@ class SignalUpdateImageSerializer(serializers.ModelSerializer):
         # self.data.is_valid()
         image = self.initial_data.get('image', False)
         if image:
-            if image.size > 8388608:  # 8MB = 8*1024*1024
+            if image.size > settings.SIGNAL_IMAGE_MAX_SIZE:
                 raise ValidationError("Foto mag maximaal 8Mb groot zijn.")
         else:
             raise ValidationError("Foto is een verplicht veld.")
@@ -74,8 +76,9 @@ class SignalUpdateImageSerializer(serializers.ModelSerializer):
             raise PermissionDenied("Melding is reeds van foto voorzien.")
 
         if image:
+            # The image variants are generated in the background, see `images.py`.
             setattr(instance, 'image', image)
-            instance.save()
+            instance.save(update_fields=['image', 'updated_at'])
 
         return instance
 
@@ -147,7 +150,8 @@ class _NestedCategoryModelSerializer(serializers.ModelSerializer):
         )
 
     def get_department(self, obj):
-        return ', '.join(obj.sub_category.departments.values_list('code', flat=True))
+        # Using `all()` so departments prefetched by the viewset are used.
+        return ', '.join(department.code for department in obj.sub_category.departments.all())
 
     def to_internal_value(self, data):
         internal_data = super().to_internal_value(data)
@@ -192,6 +196,33 @@ class _NestedPriorityModelSerializer(serializers.ModelSerializer):
 #
 
 
+class SignalCreateListSerializer(serializers.ListSerializer):
+    """Create multiple `Signal` objects at once, used by the bulk create endpoint."""
+
+    def to_internal_value(self, data):
+        # Checked before the signals are validated one by one, to refuse oversized requests early.
+        if isinstance(data, list) and len(data) > settings.SIGNAL_BULK_CREATE_MAX_SIZE:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Maximum number of signals per request is {}.'.format(
+                        settings.SIGNAL_BULK_CREATE_MAX_SIZE)]
+            })
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        signals_data = []
+        for data in validated_data:
+            data = data.copy()
+            signals_data.append({
+                'status_data': data.pop('status'),
+                'location_data': data.pop('location'),
+                'reporter_data': data.pop('reporter'),
+                'category_assignment_data': data.pop('category_assignment'),
+                'signal_data': data,
+            })
+        return Signal.actions.create_initial_bulk(signals_data)
+
+
 class SignalCreateSerializer(serializers.ModelSerializer):
     location = _NestedLocationModelSerializer()
     reporter = _NestedReporterModelSerializer()
@@ -232,6 +263,7 @@ class SignalCreateSerializer(serializers.ModelSerializer):
             'id': {'label': 'ID'},
             'signal_id': {'label': 'SIGNAL_ID'},
         }
+        list_serializer_class = SignalCreateListSerializer
 
     def create(self, validated_data):
         status_data = validated_data.pop('status')
@@ -243,9 +275,9 @@ class SignalCreateSerializer(serializers.ModelSerializer):
         return signal
 
     def validate(self, data):
-        image = self.initial_data.get('image', False)
+        image = data.get('image', False)
         if image:
-            if image.size > 8388608:  # 8MB = 8*1024*1024
+            if image.size > settings.SIGNAL_IMAGE_MAX_SIZE:
                 raise ValidationError("Maximum photo size is 8Mb.")
 
         return data
@@ -305,12 +337,15 @@ class SignalAuthHALSerializer(HALSerializer):
     status = _NestedStatusModelSerializer(read_only=True)
     category = _NestedCategoryModelSerializer(source='category_assignment', read_only=True)
     priority = _NestedPriorityModelSerializer(read_only=True)
-    image = serializers.ImageField(source='image_crop', read_only=True)
+    image = serializers.ImageField(source='get_image_crop', read_only=True)
     notes_count = serializers.SerializerMethodField()
 
     serializer_url_field = SignalLinksField
 
     def get_notes_count(self, obj):
+        # Annotated in `SignalAuthViewSet.get_queryset`.
+        if hasattr(obj, 'notes_count'):
+            return obj.notes_count
         return obj.notes.count()
 
     class Meta(object):
@@ -457,7 +492,8 @@ class CategoryHALSerializer(AddExtrasMixin, HALSerializer):
         )
 
     def get_department(self, obj):
-        return ', '.join(obj.sub_category.departments.values_list('code', flat=True))
+        # Using `all()` so departments prefetched by the viewset are used.
+        return ', '.join(department.code for department in obj.sub_category.departments.all())
 
     def to_internal_value(self, data):
         internal_data = super().to_internal_value(data)
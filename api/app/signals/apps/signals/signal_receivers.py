@@ -0,0 +1,47 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from signals.apps.signals import tasks
+from signals.apps.signals.managers import update_status
+from signals.apps.signals.models import Department, MainCategory, SignalCurrentState, SubCategory
+from signals.apps.signals.taxonomy import invalidate_taxonomy
+
+
+@receiver(post_save, sender=MainCategory, dispatch_uid='taxonomy_main_category_post_save')
+@receiver(post_delete, sender=MainCategory, dispatch_uid='taxonomy_main_category_post_delete')
+@receiver(post_save, sender=SubCategory, dispatch_uid='taxonomy_sub_category_post_save')
+@receiver(post_delete, sender=SubCategory, dispatch_uid='taxonomy_sub_category_post_delete')
+@receiver(post_save, sender=Department, dispatch_uid='taxonomy_department_post_save')
+@receiver(post_delete, sender=Department, dispatch_uid='taxonomy_department_post_delete')
+@receiver(m2m_changed, sender=SubCategory.departments.through,
+          dispatch_uid='taxonomy_sub_category_departments_m2m_changed')
+def taxonomy_changed_handler(sender, **kwargs):
+    invalidate_taxonomy()
+
+
+@receiver(post_save, sender=MainCategory, dispatch_uid='current_state_main_category_post_save')
+def main_category_post_save_handler(sender, instance, **kwargs):
+    # The slug changes when a main category is renamed, the denormalized slugs must follow.
+    (SignalCurrentState.objects
+        .filter(sub_category__main_category=instance)
+        .exclude(main_slug=instance.slug)
+        .update(main_slug=instance.slug))
+
+
+@receiver(post_save, sender=SubCategory, dispatch_uid='current_state_sub_category_post_save')
+def sub_category_post_save_handler(sender, instance, **kwargs):
+    # The slug changes when a sub category is renamed, the main category may change as well.
+    main_slug = instance.main_category.slug
+    (SignalCurrentState.objects
+        .filter(sub_category=instance)
+        .exclude(sub_slug=instance.slug, main_slug=main_slug)
+        .update(sub_slug=instance.slug, main_slug=main_slug))
+
+
+@receiver(update_status, dispatch_uid='signals_update_status_render_print_pdf')
+def update_status_render_print_pdf_handler(sender, signal_obj, status, prev_status, **kwargs):
+    # The user changing the status is the most likely one to print the signal next.
+    if status.user:
+        # Only the rendered PDF (in the PDF cache) matters, there's no need to store the result.
+        tasks.render_print_pdf.apply_async(
+            kwargs={'pk': signal_obj.pk, 'printed_by': status.user}, ignore_result=True)
@@ -0,0 +1,49 @@
+import hashlib
+import time
+from urllib import parse
+
+from django.core.cache import cache
+from swift.storage import SwiftStorage
+from swiftclient.utils import generate_temp_url
+
+
+class CachedTempUrlSwiftStorage(SwiftStorage):
+    """Swift storage caching the signed temporary urls of the stored objects.
+
+    The temporary urls are signed for fixed time windows of half the `SWIFT_TEMP_URL_DURATION`.
+    All urls signed within the same window have the same expiry time (the start of the window
+    plus `SWIFT_TEMP_URL_DURATION`), so an url can be cached until the end of the window and is
+    still valid for at least half the `SWIFT_TEMP_URL_DURATION` when it is handed out. As a bonus
+    the url of an object stays the same within a window, which allows browsers to cache it.
+    """
+    url_cache_key_prefix = 'swift-temp-url'
+
+    def _path(self, name):
+        if not self.use_temp_urls:
+            return super()._path(name)
+
+        duration = int(self.temp_url_duration)
+        window_size = max(duration // 2, 1)
+        window = int(time.time()) // window_size
+        window_end = (window + 1) * window_size
+
+        name_hash = hashlib.md5(
+            '{}/{}'.format(self.container_name, name).encode('utf-8')).hexdigest()
+        key = '{}-{}-{}'.format(self.url_cache_key_prefix, window, name_hash)
+        url = cache.get(key)
+        if url is None:
+            url = self._temp_url(name, expires=window * window_size + duration)
+            cache.set(key, url, max(window_end - int(time.time()), 1))
+        return url
+
+    def _temp_url(self, name, expires):
+        """Sign a temporary url for given object.
+
+        :param name: name of the object (including the `name_prefix`)
+        :param expires: expiry time of the url (unix timestamp)
+        :returns: url (str)
+        """
+        url = parse.urljoin(self.base_url, parse.quote(name))
+        path = parse.unquote(parse.urlsplit(url).path)
+        temp_path = generate_temp_url(path, expires, self.temp_url_key, 'GET', absolute=True)
+        return parse.urljoin(self.base_url, temp_path)
@@ -1,5 +1,12 @@
 import logging
 
+from django.conf import settings
+from django.utils.dateparse import parse_date
+
+from signals.apps.signals import images
+from signals.apps.signals.models import Signal
+from signals.apps.signals.pdf.cache import delete_expired_pdfs
+from signals.apps.signals.pdf.signal import get_print_pdf
 from signals.celery import app
 from signals.utils.datawarehouse import save_csv_files_datawarehouse
 
@@ -7,11 +14,67 @@ logger = logging.getLogger(__name__)
 
 
 @app.task
-def task_save_csv_files_datawarehouse():
+def task_save_csv_files_datawarehouse(incremental=False):
     """Celery task to save CSV files for Datawarehouse.
 
-    This task is scheduled in Celery beat to run periodically.
+    This task is scheduled in Celery beat to run periodically, a weekly full export and a nightly
+    incremental export on the other days.
+
+    :param incremental: Only export rows changed since the previous export (Default: False)
+    :returns:
+    """
+    save_csv_files_datawarehouse(incremental=incremental)
+
+
+@app.task
+def generate_image_variants(pk, force=False):
+    """Celery task to generate the image variants (crop, thumbnail, ...) of the photo of a signal.
+
+    Scheduled when the photo of a signal is saved, see `signals.apps.signals.images`.
+
+    :param pk: Signal primary key
+    :param force: regenerate the variants that already exist (Default: False)
+    :returns:
+    """
+    try:
+        signal = Signal.objects.only('id', 'image').get(pk=pk)
+    except Signal.DoesNotExist:
+        logger.warning('Signal %s does not exist, no image variants generated', pk)
+        return
+
+    images.generate_image_variants(signal, force=force)
+
+
+@app.task(soft_time_limit=settings.PDF_RENDER_TIMEOUT, time_limit=settings.PDF_RENDER_TIMEOUT + 10)
+def render_print_pdf(pk, printed_by=None, printed_at=None):
+    """Celery task to render the printable PDF of a signal into the PDF cache.
+
+    Routed to the `pdf` queue (see `CELERY_TASK_ROUTES`), which is served by dedicated workers
+    with limited concurrency and memory, so PDF rendering can't starve the other tasks or the API.
+    Scheduled when the status of a signal changes (for the user that changed it) and by the
+    `GeneratePdfView` when the PDF isn't cached yet.
+
+    :param pk: Signal primary key
+    :param printed_by: username of the user printing the signal
+    :param printed_at: date the signal is printed (ISO 8601 str, Default: today)
+    :returns:
+    """
+    try:
+        signal = Signal.objects.get(pk=pk)
+    except Signal.DoesNotExist:
+        logger.warning('Signal %s does not exist, no PDF rendered', pk)
+        return
+
+    printed_at = parse_date(printed_at) if printed_at else None
+    get_print_pdf(signal, printed_by=printed_by, printed_at=printed_at)
+
+
+@app.task
+def task_delete_expired_pdfs():
+    """Celery task to delete the cached PDFs older than `PDF_CACHE_MAX_AGE` seconds.
+
+    This task is scheduled in Celery beat to run nightly.
 
     :returns:
     """
-    save_csv_files_datawarehouse()
+    delete_expired_pdfs()
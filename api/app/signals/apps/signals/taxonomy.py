@@ -0,0 +1,175 @@
+"""
+Process-local cache of the category taxonomy (`MainCategory`, `SubCategory` and `Department`).
+
+The taxonomy hardly ever changes, but is needed for almost every request. Every process keeps a
+snapshot of the whole taxonomy in memory, together with the version it was built for. The version
+is stored in the database (`TaxonomyVersion`, a single row) and incremented in the same
+transaction as every change of the taxonomy models (see `signal_receivers.py`). Every process
+compares the version of its snapshot with the database (a single primary key lookup, at most once
+every `TAXONOMY_VERSION_CHECK_INTERVAL` seconds) and rebuilds the snapshot once the change is
+committed.
+"""
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+# The version row is created by migration `0029_taxonomyversion`.
+TAXONOMY_VERSION_ID = 1
+
+# Version used when the version row doesn't exist (e.g. after flushing the database).
+INITIAL_VERSION = (0, datetime(2018, 1, 1, tzinfo=timezone.utc))
+
+_lock = threading.Lock()
+_taxonomy = None
+_checked_version = None
+
+
+class Taxonomy:
+    """Read-only snapshot of the category taxonomy.
+
+    The returned model instances are shared between threads and requests, don't modify them.
+    """
+
+    def __init__(self, version, last_modified, main_categories, sub_categories):
+        self.version = version
+        self.last_modified = last_modified
+
+        self.main_categories = list(main_categories)
+        self.sub_categories = list(sub_categories)
+
+        self._main_categories_by_id = {main.id: main for main in self.main_categories}
+        self._main_categories_by_slug = {main.slug: main for main in self.main_categories}
+        self._main_categories_by_name = {main.name: main for main in self.main_categories}
+
+        self._sub_categories_by_id = {sub.id: sub for sub in self.sub_categories}
+        self._sub_categories_by_slugs = {
+            (sub.main_category.slug, sub.slug): sub for sub in self.sub_categories}
+        self._sub_categories_by_name = defaultdict(list)
+        for sub in self.sub_categories:
+            self._sub_categories_by_name[sub.name].append(sub)
+
+    @classmethod
+    def load(cls, version, last_modified):
+        """Load the taxonomy from the database.
+
+        :param version: version of the taxonomy (int)
+        :param last_modified: datetime the taxonomy was last modified
+        :returns: Taxonomy object
+        """
+        from signals.apps.signals.models import MainCategory, SubCategory
+
+        main_categories = {main.id: main for main in MainCategory.objects.all()}
+        sub_categories = list(SubCategory.objects.prefetch_related('departments'))
+        for sub in sub_categories:
+            sub.main_category = main_categories[sub.main_category_id]
+
+        return cls(version, last_modified, main_categories.values(), sub_categories)
+
+    def get_main_category(self, id):
+        return self._main_categories_by_id.get(id)
+
+    def get_main_category_by_slug(self, slug):
+        return self._main_categories_by_slug.get(slug)
+
+    def get_main_category_by_name(self, name):
+        return self._main_categories_by_name.get(name)
+
+    def get_sub_category(self, id):
+        return self._sub_categories_by_id.get(id)
+
+    def get_sub_category_by_slugs(self, main_slug, sub_slug):
+        return self._sub_categories_by_slugs.get((main_slug, sub_slug))
+
+    def get_sub_categories_by_name(self, name):
+        return list(self._sub_categories_by_name.get(name, []))
+
+    def get_sub_categories_by_main_slug(self, main_slug):
+        return [sub for sub in self.sub_categories if sub.main_category.slug == main_slug]
+
+
+def get_taxonomy():
+    """Get the cached category taxonomy, (re)loading it when it's outdated.
+
+    :returns: Taxonomy object
+    """
+    global _taxonomy
+
+    version = _get_version()
+    taxonomy = _taxonomy
+    if not _is_current(taxonomy, version):
+        with _lock:
+            taxonomy = _taxonomy
+            if not _is_current(taxonomy, version):
+                taxonomy = _taxonomy = Taxonomy.load(version.version, version.last_modified)
+    return taxonomy
+
+
+def invalidate_taxonomy():
+    """Invalidate the cached category taxonomy in all processes.
+
+    Increments the version in the current transaction, other processes see the new version (and
+    rebuild their snapshot) as soon as the change of the taxonomy is committed.
+
+    :returns: None
+    """
+    from signals.apps.signals.models import TaxonomyVersion
+
+    global _checked_version
+
+    updated = TaxonomyVersion.objects.filter(pk=TAXONOMY_VERSION_ID).update(
+        version=F('version') + 1, last_modified=timezone.now())
+    if not updated:
+        TaxonomyVersion.objects.get_or_create(
+            pk=TAXONOMY_VERSION_ID, defaults={'last_modified': timezone.now()})
+
+    # The current process doesn't wait for the check interval to see its own change.
+    _checked_version = None
+
+
+def get_taxonomy_version():
+    """Get the current version of the category taxonomy, without loading the taxonomy.
+
+    :returns: tuple with the version (int) and the datetime it was last modified
+    """
+    version = _get_version()
+    return version.version, version.last_modified
+
+
+def _get_version():
+    global _checked_version
+
+    checked = _checked_version
+    if checked is not None and \
+            time.monotonic() - checked[1] < settings.TAXONOMY_VERSION_CHECK_INTERVAL:
+        return checked[0]
+
+    version = _read_version()
+    # A version read in a transaction may be rolled back, it's not reused.
+    if not connection.in_atomic_block:
+        _checked_version = (version, time.monotonic())
+    return version
+
+
+def _read_version():
+    from signals.apps.signals.models import TaxonomyVersion
+
+    try:
+        return TaxonomyVersion.objects.get(pk=TAXONOMY_VERSION_ID)
+    except TaxonomyVersion.DoesNotExist:
+        version, last_modified = INITIAL_VERSION
+        return TaxonomyVersion(
+            pk=TAXONOMY_VERSION_ID, version=version, last_modified=last_modified)
+
+
+def _is_current(taxonomy, version):
+    # The modification time is compared as well, a snapshot loaded in a transaction that was
+    # rolled back has the same version number as the next committed change.
+    return (taxonomy is not None and
+            taxonomy.version == version.version and
+            taxonomy.last_modified == version.last_modified)
@@ -0,0 +1,155 @@
+"""
+Upload handling for the photos attached to signals.
+
+Django's default upload handlers accept uploads of any size and only afterwards the serializers
+check the size and type of the photo. `ImageUploadHandler` checks both while the upload is being
+received and stops reading the request as soon as the photo is too large or not an image.
+
+Memory use per upload is bounded by `FILE_UPLOAD_MAX_MEMORY_SIZE`, larger photos are spooled to a
+temporary file (bounded by `SIGNAL_IMAGE_MAX_SIZE`) which is streamed to the storage backend (Swift)
+in chunks when the signal is saved.
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+# Signatures ("magic numbers") of the accepted image formats, as (offset, bytes) pairs that must
+# all match the start of the file.
+IMAGE_SIGNATURES = (
+    ((0, b'\xff\xd8\xff'), ),  # JPEG
+    ((0, b'\x89PNG\r\n\x1a\n'), ),  # PNG
+    ((0, b'GIF87a'), ),  # GIF
+    ((0, b'GIF89a'), ),  # GIF
+    ((0, b'BM'), ),  # BMP
+    ((0, b'II*\x00'), ),  # TIFF (little-endian)
+    ((0, b'MM\x00*'), ),  # TIFF (big-endian)
+    ((0, b'RIFF'), (8, b'WEBP')),  # WebP
+)
+IMAGE_HEADER_SIZE = 12
+
+
+def is_image_header(header):
+    """Check if given file header matches one of the accepted image formats.
+
+    :param header: first `IMAGE_HEADER_SIZE` bytes of the file
+    :returns: bool
+    """
+    for signature in IMAGE_SIGNATURES:
+        if all(header[offset:offset + len(magic)] == magic for offset, magic in signature):
+            return True
+    return False
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Upload handler enforcing the maximum size and type of uploaded photos while streaming.
+
+    Replaces Django's default `MemoryFileUploadHandler` and `TemporaryFileUploadHandler`, files
+    are kept in memory up to `FILE_UPLOAD_MAX_MEMORY_SIZE` bytes and then moved to a temporary
+    file. The size and type checks only apply to the `image_fields`.
+    """
+    image_fields = ('image', )
+    default_error_messages = {
+        'max_size': 'Maximum photo size is 8Mb.',
+        'invalid_image': 'Upload a valid image. The file you uploaded was either not an image or '
+                         'a corrupted image.',
+    }
+
+    def __init__(self, request=None, error_messages=None):
+        super().__init__(request)
+        self.max_size = settings.SIGNAL_IMAGE_MAX_SIZE
+        self.max_memory_size = settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        self.error_messages = dict(self.default_error_messages, **(error_messages or {}))
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Besides the photo, the request only contains form fields which are limited by
+        # `DATA_UPLOAD_MAX_MEMORY_SIZE`, so larger requests can be refused without reading them.
+        max_data_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if max_data_size is not None and content_length > self.max_size + max_data_size:
+            self.fail('max_size')
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.is_image = self.field_name in self.image_fields
+        self.header = b''
+        self.size = 0
+        self.file = BytesIO()
+        self.in_memory = True
+
+        if self.is_image and self.content_length and self.content_length > self.max_size:
+            self.fail('max_size')
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+
+        if self.is_image:
+            if self.size > self.max_size:
+                self.fail('max_size')
+
+            if len(self.header) < IMAGE_HEADER_SIZE:
+                self.header += raw_data[:IMAGE_HEADER_SIZE - len(self.header)]
+                if len(self.header) == IMAGE_HEADER_SIZE:
+                    self.check_header()
+
+        if self.in_memory and self.size > self.max_memory_size:
+            self.rollover()
+
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.is_image and 0 < len(self.header) < IMAGE_HEADER_SIZE:
+            self.check_header()
+
+        self.file.seek(0)
+        if not self.in_memory:
+            self.file.size = file_size
+            return self.file
+
+        return InMemoryUploadedFile(
+            file=self.file,
+            field_name=self.field_name,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra
+        )
+
+    def rollover(self):
+        """Move the file received so far from memory to a temporary file.
+
+        :returns: None
+        """
+        file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        file.write(self.file.getvalue())
+        self.file = file
+        self.in_memory = False
+
+    def check_header(self):
+        if not is_image_header(self.header):
+            self.fail('invalid_image')
+
+    def fail(self, key):
+        """Stop the upload with a validation error (HTTP 400).
+
+        :param key: key of the error message
+        :raises: ValidationError
+        """
+        file = getattr(self, 'file', None)
+        if file is not None:
+            file.close()
+        raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages[key]]})
+
+
+class ImageUploadMixin:
+    """Mixin for views accepting photo uploads, installs the `ImageUploadHandler`."""
+    upload_error_messages = None
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [
+            ImageUploadHandler(request, error_messages=self.upload_error_messages)]
+        return super().initialize_request(request, *args, **kwargs)
@@ -1,11 +1,19 @@
+import hashlib
 import logging
 import re
+import time
 
 from datapunt_api.pagination import HALPagination
 from datapunt_api.rest import DatapuntViewSet
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.utils import timezone
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
 from django.views.generic.detail import SingleObjectMixin
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, viewsets
@@ -13,9 +21,10 @@ from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
-from rest_framework.status import HTTP_202_ACCEPTED
+from rest_framework.status import HTTP_201_CREATED, HTTP_202_ACCEPTED
 from rest_framework_extensions.mixins import DetailSerializerMixin
 
+from signals.apps.signals import tasks
 from signals.apps.signals.filters import (
     FieldMappingOrderingFilter,
     LocationFilter,
@@ -33,12 +42,19 @@ from signals.apps.signals.models import (
     Status,
     SubCategory
 )
+from signals.apps.signals.pagination import HALPaginationWithCursor
+from signals.apps.signals.pdf.signal import (
+    PRINT_TEMPLATE_NAME,
+    get_cached_print_pdf,
+    get_print_context
+)
 from signals.apps.signals.pdf.views import PDFTemplateView
 from signals.apps.signals.permissions import (
     CategoryPermission,
     LocationPermission,
     NotePermission,
     PriorityPermission,
+    SignalPermission,
     StatusPermission
 )
 from signals.apps.signals.serializers import (
@@ -57,6 +73,8 @@ from signals.apps.signals.serializers import (
     StatusHALSerializer,
     SubCategoryHALSerializer
 )
+from signals.apps.signals.taxonomy import get_taxonomy_version
+from signals.apps.signals.upload_handlers import ImageUploadMixin
 from signals.auth.backend import JWTAuthBackend
 from signals.throttling import NoUserRateThrottle
 
@@ -64,10 +82,11 @@ logger = logging.getLogger()
 
 
 # TODO SIG-520 this should be a `action` on the SignalView (set).
-class SignalImageUpdateView(viewsets.GenericViewSet):
+class SignalImageUpdateView(ImageUploadMixin, viewsets.GenericViewSet):
     """
     Add or update image of newly submitted signals
     """
+    upload_error_messages = {'max_size': 'Foto mag maximaal 8Mb groot zijn.'}
     serializer_detail_class = SignalUpdateImageSerializer
     serializer_class = SignalUpdateImageSerializer
     pagination_class = None
@@ -96,7 +115,8 @@ class SignalImageUpdateView(viewsets.GenericViewSet):
             return {}
 
 
-class SignalViewSet(mixins.CreateModelMixin,
+class SignalViewSet(ImageUploadMixin,
+                    mixins.CreateModelMixin,
                     DetailSerializerMixin,
                     mixins.RetrieveModelMixin,
                     viewsets.GenericViewSet):
@@ -135,6 +155,7 @@ class SignalAuthViewSet(DatapuntViewSet):
     serializer_class = SignalAuthHALSerializer
     filter_backends = (DjangoFilterBackend, FieldMappingOrderingFilter, )
     filter_class = SignalFilter
+    pagination_class = HALPaginationWithCursor
     ordering_fields = (
         'id',
         'created_at',
@@ -148,25 +169,45 @@ class SignalAuthViewSet(DatapuntViewSet):
     )
     ordering_field_mappings = {
         'id': 'id',
-        'created_at': 'created_at',
+        'created_at': 'current_state__created_at',
         'updated_at': 'updated_at',
-        'stadsdeel': 'location__stadsdeel',
-        'sub_category': 'category_assignment__sub_category__slug',
-        'main_category': 'category_assignment__sub_category__main_category__slug',
-        'status': 'status__state',
-        'priority': 'priority__priority',
-        'address': 'location__address_text',
+        'stadsdeel': 'current_state__stadsdeel',
+        'sub_category': 'current_state__sub_slug',
+        'main_category': 'current_state__main_slug',
+        'status': 'current_state__state',
+        'priority': 'current_state__priority',
+        'address': 'current_state__address_text',
     }
     ordering = ('-created_at', )
 
+    @action(detail=False, methods=['post'], permission_classes=(SignalPermission, ),
+            serializer_class=SignalCreateSerializer)
+    def bulk(self, request):
+        """Create multiple signals at once (at most `SIGNAL_BULK_CREATE_MAX_SIZE`)."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=HTTP_201_CREATED)
+
     def get_queryset(self):
+        notes_count = (
+            Note.objects
+            .filter(_signal=OuterRef('pk'))
+            .order_by()
+            .values('_signal')
+            .annotate(count=Count('*'))
+            .values('count')
+        )
         queryset = (
             super().
             get_queryset()
             .select_related('status')
             .select_related('location')
-            .select_related('category_assignment')
+            .select_related('category_assignment__sub_category__main_category')
             .select_related('reporter')
+            .select_related('priority')
+            .prefetch_related('category_assignment__sub_category__departments')
+            .annotate(notes_count=Coalesce(Subquery(notes_count), 0))
         )
         return queryset
 
@@ -194,7 +235,12 @@ class StatusAuthViewSet(mixins.CreateModelMixin, DatapuntViewSet):
 class CategoryAuthViewSet(mixins.CreateModelMixin, DatapuntViewSet):
     authentication_classes = (JWTAuthBackend, )
     permission_classes = (CategoryPermission, )
-    queryset = CategoryAssignment.objects.all().order_by('id').prefetch_related('signal')
+    queryset = (
+        CategoryAssignment.objects.all()
+        .order_by('id')
+        .select_related('_signal__status', '_signal__location', 'sub_category__main_category')
+        .prefetch_related('signal', 'sub_category__departments')
+    )
     serializer_detail_class = CategoryHALSerializer
     serializer_class = CategoryHALSerializer
     filter_backends = (DjangoFilterBackend, )
@@ -223,15 +269,68 @@ class NoteAuthViewSet(mixins.CreateModelMixin, DatapuntViewSet):
 
 # -- Views that are used exclusively by the V1 API --
 
-class MainCategoryViewSet(DatapuntViewSet):
-    queryset = MainCategory.objects.all()
+def _get_taxonomy_version(request):
+    # Checked once per request, the ETag and Last-Modified must describe the same version.
+    if not hasattr(request, '_taxonomy_version'):
+        request._taxonomy_version = get_taxonomy_version()
+    return request._taxonomy_version
+
+
+def _taxonomy_etag(request, *args, **kwargs):
+    version, last_modified = _get_taxonomy_version(request)
+    key = '{}{}{}{}'.format(version,
+                            last_modified.isoformat(),
+                            request.build_absolute_uri(),
+                            getattr(request, 'accepted_media_type', ''))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _taxonomy_last_modified(request, *args, **kwargs):
+    _, last_modified = _get_taxonomy_version(request)
+    return last_modified
+
+
+class TaxonomyResponseCacheMixin:
+    """Cache the serialized category terms until the category taxonomy changes.
+
+    Responses get an `ETag` and `Last-Modified` header based on the taxonomy version (stored in the
+    database, so all processes agree on it), conditional requests are answered with `304 Not
+    Modified`.
+    """
+    taxonomy_response_condition = method_decorator(
+        condition(etag_func=_taxonomy_etag, last_modified_func=_taxonomy_last_modified))
+
+    @taxonomy_response_condition
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    @taxonomy_response_condition
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = 'taxonomy-response-{}'.format(_taxonomy_etag(request))
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.TAXONOMY_CACHE_MAX_AGE)
+        return response
+
+
+class MainCategoryViewSet(TaxonomyResponseCacheMixin, DatapuntViewSet):
+    queryset = MainCategory.objects.prefetch_related('sub_categories__departments')
     serializer_detail_class = MainCategoryHALSerializer
     serializer_class = MainCategoryHALSerializer
     lookup_field = 'slug'
 
 
-class SubCategoryViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
-    queryset = SubCategory.objects.all()
+class SubCategoryViewSet(TaxonomyResponseCacheMixin,
+                         mixins.RetrieveModelMixin,
+                         viewsets.GenericViewSet):
+    queryset = SubCategory.objects.select_related('main_category').prefetch_related('departments')
     serializer_class = SubCategoryHALSerializer
     pagination_class = HALPagination
 
@@ -249,10 +348,14 @@ class PrivateSignalViewSet(DatapuntViewSet):
     queryset = Signal.objects.all()
     serializer_class = PrivateSignalSerializerList
     serializer_detail_class = PrivateSignalSerializerDetail
-    pagination_class = HALPagination
+    pagination_class = HALPaginationWithCursor
     authentication_classes = (JWTAuthBackend, )
     filter_backends = (DjangoFilterBackend, )
 
+    def get_queryset(self):
+        # The `status` and `location` are used for the `_display` field.
+        return super().get_queryset().select_related('status', 'location')
+
     @action(detail=True)  # default GET gets routed here
     def history(self, request, pk=None):
         history_entries = History.objects.filter(_signal__id=pk)
@@ -261,22 +364,100 @@ class PrivateSignalViewSet(DatapuntViewSet):
         return Response(serializer.data)
 
 
+class PdfNotAvailable(Exception):
+    def __init__(self, task_id, scheduled_at=None):
+        super().__init__(task_id)
+        self.task_id = task_id
+        self.scheduled_at = scheduled_at
+
+
+class PdfRenderPending(PdfNotAvailable):
+    pass
+
+
+class PdfRenderFailed(PdfNotAvailable):
+    pass
+
+
 class GeneratePdfView(LoginRequiredMixin, SingleObjectMixin, PDFTemplateView):
     object = None
     pk_url_kwarg = 'signal_id'
     queryset = Signal.objects.all()
 
-    template_name = 'signals/pdf/print_signal.html'
-    extra_context = {'now': timezone.datetime.now(), }
+    template_name = PRINT_TEMPLATE_NAME
 
     def get_context_data(self, **kwargs):
         self.object = self.get_object()
         self.pdf_filename = 'SIA-{}.pdf'.format(self.object.pk)
-        rd_coordinates = self.object.location.get_rd_coordinates()
-        bbox = '{},{},{},{}'.format(
-            rd_coordinates.x - 340.00,
-            rd_coordinates.y - 125.00,
-            rd_coordinates.x + 340.00,
-            rd_coordinates.y + 125.00,
-        )
-        return super(GeneratePdfView, self).get_context_data(bbox=bbox)
+        return super(GeneratePdfView, self).get_context_data(
+            **get_print_context(self.object, printed_by=self.get_printed_by()))
+
+    def get_printed_by(self):
+        user = self.request.user
+        return None if user.is_anonymous else user.username
+
+    def get_pdf_content(self, context):
+        """Get the PDF from the PDF cache, it's never rendered by the request itself.
+
+        When the PDF isn't cached yet it's rendered by the dedicated PDF workers, the client polls
+        the url given in the `Location` header of the 202 response until the PDF is available. A
+        render that isn't done within `PDF_RENDER_TIMEOUT` seconds is answered with a 503.
+        """
+        printed_by, printed_at = context['printed_by'], context['printed_at']
+        content = get_cached_print_pdf(self.object, printed_by=printed_by, printed_at=printed_at)
+        if content is not None:
+            return content
+
+        task_id, scheduled_at = self.get_render_task()
+        if task_id:
+            result = tasks.render_print_pdf.AsyncResult(task_id)
+            if result.failed():
+                raise PdfRenderFailed(task_id)
+            if not result.ready():
+                if time.time() - scheduled_at <= settings.PDF_RENDER_TIMEOUT:
+                    raise PdfRenderPending(task_id, scheduled_at)
+                # Not done in time, or unknown to Celery (lost, not consumed by any worker or its
+                # result is purged). Polling again without a task schedules a new render.
+                raise PdfRenderFailed(task_id)
+
+        scheduled_at = int(time.time())
+        result = tasks.render_print_pdf.delay(
+            pk=self.object.pk, printed_by=printed_by, printed_at=printed_at.isoformat())
+
+        # Rendered right away when the worker is fast enough (or the task is executed eagerly).
+        content = get_cached_print_pdf(self.object, printed_by=printed_by, printed_at=printed_at)
+        if content is None:
+            raise PdfRenderPending(result.id, scheduled_at)
+        return content
+
+    def get_render_task(self):
+        """Get the id and schedule time (unix timestamp) of the render task that is polled.
+
+        :returns: tuple of task id and schedule time, or (None, None) when not polling
+        """
+        task_id = self.request.GET.get('task')
+        try:
+            scheduled_at = int(self.request.GET.get('scheduled', ''))
+        except ValueError:
+            return None, None
+        if not task_id or scheduled_at > time.time():
+            return None, None
+        return task_id, scheduled_at
+
+    def render_to_response(self, context, **response_kwargs):
+        try:
+            return super(GeneratePdfView, self).render_to_response(context, **response_kwargs)
+        except PdfRenderPending as e:
+            response = HttpResponse('PDF wordt gegenereerd, probeer het later opnieuw.',
+                                    status=202, content_type='text/plain')
+            query = urlencode({'task': e.task_id, 'scheduled': e.scheduled_at})
+            response['Location'] = '{}?{}'.format(
+                self.request.build_absolute_uri(self.request.path), query)
+            response['Retry-After'] = 2
+            return response
+        except PdfRenderFailed as e:
+            logger.warning('Rendering PDF of signal %s failed (task %s)', self.object.pk, e.task_id)
+            response = HttpResponse('PDF kan niet worden gegenereerd, probeer het later opnieuw.',
+                                    status=503, content_type='text/plain')
+            response['Retry-After'] = 10
+            return response
@@ -1,6 +1,7 @@
 import os
 
 from celery.schedules import crontab
+from kombu import Queue
 
 from signals import API_VERSIONS
 from signals.settings.settings_databases import (
@@ -154,7 +155,7 @@ MEDIA_ROOT = os.path.join(os.path.dirname(os.path.dirname(BASE_DIR)), 'media')
 
 # Object store / Swift
 if os.getenv('SWIFT_ENABLED', 'false') == 'true':
-    DEFAULT_FILE_STORAGE = 'swift.storage.SwiftStorage'
+    DEFAULT_FILE_STORAGE = 'signals.apps.signals.storage.CachedTempUrlSwiftStorage'
     SWIFT_USERNAME = os.getenv('SWIFT_USERNAME')
     SWIFT_PASSWORD = os.getenv('SWIFT_PASSWORD')
     SWIFT_AUTH_URL = os.getenv('SWIFT_AUTH_URL')
@@ -173,6 +174,13 @@ DWH_SWIFT_TENANT_NAME = os.getenv('DWH_SWIFT_TENANT_NAME')
 DWH_SWIFT_TENANT_ID = os.getenv('DWH_SWIFT_TENANT_ID')
 DWH_SWIFT_REGION_NAME = os.getenv('SWIFT_REGION_NAME')
 DWH_SWIFT_CONTAINER_NAME = os.getenv('DWH_SWIFT_CONTAINER_NAME')
+DWH_EXPORT_CHUNK_SIZE = int(os.getenv('DWH_EXPORT_CHUNK_SIZE', 2000))  # rows fetched per round trip
+DWH_EXPORT_WORKERS = int(os.getenv('DWH_EXPORT_WORKERS', 5))  # tables exported concurrently
+DWH_EXPORT_COMPRESSION = os.getenv('DWH_EXPORT_COMPRESSION', '')  # empty (plain CSV) or 'gzip'
+DWH_EXPORT_COMPRESSION_LEVEL = int(os.getenv('DWH_EXPORT_COMPRESSION_LEVEL', 6))
+DWH_SWIFT_SEGMENT_SIZE = int(os.getenv('DWH_SWIFT_SEGMENT_SIZE', 1024 * 1024 * 1024))  # 1GB
+# Seconds the incremental export high-water mark lags behind, longer than any transaction takes
+DWH_EXPORT_WATERMARK_LAG = int(os.getenv('DWH_EXPORT_WATERMARK_LAG', 600))
 
 # Using `HEALTH_MODEL` for health check endpoint.
 HEALTH_MODEL = 'signals.Signal'
@@ -220,6 +228,17 @@ CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL',
 CELERY_EMAIL_CHUNK_SIZE = 1
 CELERY_RESULT_BACKEND = 'django-db'
 CELERY_TASK_RESULT_EXPIRES = 604800  # 7 days in seconds (7*24*60*60)
+# A worker started without `-Q` consumes all queues, PDF rendering and pushes to Sigmax can be
+# split off to their own workers with `-Q`, see `docker-compose.yml`.
+CELERY_TASK_QUEUES = (
+    Queue('celery'),
+    Queue('pdf'),
+    Queue('sigmax'),
+)
+CELERY_TASK_ROUTES = {
+    'signals.apps.signals.tasks.render_print_pdf': {'queue': 'pdf'},
+    'signals.apps.sigmax.tasks.push_to_sigmax': {'queue': 'sigmax'},
+}
 
 # Celery Beat settings
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
@@ -227,7 +246,17 @@ CELERY_BEAT_SCHEDULE = {
     'save-csv-files-datawarehouse': {
         'task': 'signals.apps.signals.tasks'
                 '.task_save_csv_files_datawarehouse',
-        'schedule': crontab(hour=4),
+        'schedule': crontab(minute=0, hour=4, day_of_week='sunday'),
+    },
+    'save-csv-files-datawarehouse-incremental': {
+        'task': 'signals.apps.signals.tasks'
+                '.task_save_csv_files_datawarehouse',
+        'schedule': crontab(minute=0, hour=4, day_of_week='mon-sat'),
+        'kwargs': {'incremental': True},
+    },
+    'delete-expired-pdfs': {
+        'task': 'signals.apps.signals.tasks.task_delete_expired_pdfs',
+        'schedule': crontab(minute=0, hour=3),
     },
 }
 
@@ -262,6 +291,28 @@ CACHES = {
     }
 }
 
+# Number of seconds the opted-in exact count of the keyset (cursor) pagination is cached
+PAGINATION_COUNT_CACHE_TIMEOUT = int(os.getenv('PAGINATION_COUNT_CACHE_TIMEOUT', 60))
+
+# Number of seconds a process uses the version of the category taxonomy before checking it again
+TAXONOMY_VERSION_CHECK_INTERVAL = int(os.getenv('TAXONOMY_VERSION_CHECK_INTERVAL', 5))
+
+# Maximum number of seconds a process caches the serialized category terms of a taxonomy version
+TAXONOMY_CACHE_MAX_AGE = int(os.getenv('TAXONOMY_CACHE_MAX_AGE', 300))
+
+# Maximum number of signals that can be created with a single bulk create request
+SIGNAL_BULK_CREATE_MAX_SIZE = int(os.getenv('SIGNAL_BULK_CREATE_MAX_SIZE', 1000))
+
+# Maximum size (in bytes) of the photo attached to a signal
+SIGNAL_IMAGE_MAX_SIZE = 8388608  # 8MB = 8*1024*1024
+
+# Maximum number of seconds rendering a PDF takes, processes needing a PDF that is being rendered
+# by another process wait this long for the result
+PDF_RENDER_TIMEOUT = int(os.getenv('PDF_RENDER_TIMEOUT', 60))
+
+# Number of seconds rendered PDFs are kept in the PDF cache (on the default file storage)
+PDF_CACHE_MAX_AGE = int(os.getenv('PDF_CACHE_MAX_AGE', 604800))  # 7 days (7*24*60*60)
+
 # Sentry logging
 RAVEN_CONFIG = {
     'dsn': os.getenv('SENTRY_RAVEN_DSN'),
@@ -443,3 +494,20 @@ SWAGGER_SETTINGS = {
 # Sigmax settings
 SIGMAX_AUTH_TOKEN = os.getenv('SIGMAX_AUTH_TOKEN', None)
 SIGMAX_SERVER = os.getenv('SIGMAX_SERVER', None)
+# Connect and read timeouts (in seconds) of requests to Sigmax
+SIGMAX_CONNECT_TIMEOUT = float(os.getenv('SIGMAX_CONNECT_TIMEOUT', 5))
+SIGMAX_READ_TIMEOUT = float(os.getenv('SIGMAX_READ_TIMEOUT', 60))
+# Maximum number of retries of requests that didn't reach Sigmax, with exponential backoff
+SIGMAX_MAX_RETRIES = int(os.getenv('SIGMAX_MAX_RETRIES', 3))
+SIGMAX_RETRY_BACKOFF_FACTOR = float(os.getenv('SIGMAX_RETRY_BACKOFF_FACTOR', 0.5))
+# Maximum number of (keep-alive) connections to Sigmax per process
+SIGMAX_POOL_MAXSIZE = int(os.getenv('SIGMAX_POOL_MAXSIZE', 4))
+# Pushes of a signal to Sigmax wait (retrying every SIGMAX_PUSH_RETRY_DELAY seconds) until
+# another push of the same signal is done
+SIGMAX_PUSH_RETRY_DELAY = int(os.getenv('SIGMAX_PUSH_RETRY_DELAY', 10))
+# Maximum size (in bytes) of StUF messages received from Sigmax, messages larger than
+# SIGMAX_STUF_ITERPARSE_THRESHOLD are parsed incrementally. Django rejects request bodies larger
+# than DATA_UPLOAD_MAX_MEMORY_SIZE (Default: 2.5MB) before they are parsed, raise both to accept
+# larger messages.
+SIGMAX_STUF_MAX_SIZE = int(os.getenv('SIGMAX_STUF_MAX_SIZE', 2621440))  # 2.5MB = 2.5*1024*1024
+SIGMAX_STUF_ITERPARSE_THRESHOLD = int(os.getenv('SIGMAX_STUF_ITERPARSE_THRESHOLD', 262144))
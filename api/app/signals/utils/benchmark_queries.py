@@ -0,0 +1,158 @@
+"""
+Benchmark the queries used by the dashboard (the `SignalAuthViewSet` signal listing).
+
+Usage, on a (non production!) database:
+
+    python manage.py benchmark_signal_queries --seed 1000000
+    python manage.py migrate signals 0027  # without the dashboard indexes
+    python manage.py benchmark_signal_queries
+    python manage.py migrate signals
+
+The seeded signals only have the denormalized `SignalCurrentState`, which is all the dashboard
+filters and ordering use.
+"""
+import logging
+import random
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from signals.apps.signals.models import (
+    STADSDELEN,
+    Priority,
+    Signal,
+    SignalCurrentState,
+    SubCategory
+)
+from signals.apps.signals.workflow import (
+    AFGEHANDELD,
+    AFGEHANDELD_EXTERN,
+    GEANNULEERD,
+    GEMELD,
+    STATUS_CHOICES
+)
+
+log = logging.getLogger(__name__)
+
+# Number of signals on a single dashboard page.
+PAGE_SIZE = 100
+
+# Spread of the `created_at` timestamps of the seeded signals.
+SEED_PERIOD = timedelta(days=3 * 365)
+
+OPEN_STATES = [state for state, _ in STATUS_CHOICES
+               if state not in (AFGEHANDELD, AFGEHANDELD_EXTERN, GEANNULEERD)]
+
+
+def seed_signals(count, batch_size=10000):
+    """
+    Seed the database with given number of signals (with their current state) for benchmarking.
+
+    :param count: number of signals to create
+    :param batch_size: number of signals per `bulk_create` batch
+    :returns: None
+    """
+    sub_categories = list(SubCategory.objects.select_related('main_category'))
+    states = [state for state, _ in STATUS_CHOICES]
+    stadsdelen = [stadsdeel for stadsdeel, _ in STADSDELEN]
+    priorities = [priority for priority, _ in Priority.PRIORITY_CHOICES]
+    now = timezone.now()
+
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        with transaction.atomic():
+            signals = Signal.objects.bulk_create([
+                Signal(text='Benchmark', incident_date_start=now) for _ in range(size)
+            ])
+
+            current_states = []
+            for signal in signals:
+                sub_category = random.choice(sub_categories) if sub_categories else None
+                current_states.append(SignalCurrentState(
+                    _signal=signal,
+                    state=random.choice(states),
+                    stadsdeel=random.choice(stadsdelen),
+                    buurt_code='A{:02d}a'.format(random.randint(0, 99)),
+                    address_text='Benchmarkstraat {} 1000AA Amsterdam'.format(
+                        random.randint(1, 1000)),
+                    sub_category=sub_category,
+                    sub_slug=sub_category.slug if sub_category else '',
+                    main_slug=sub_category.main_category.slug if sub_category else '',
+                    priority=random.choice(priorities),
+                    created_at=now - SEED_PERIOD * random.random()))
+            SignalCurrentState.objects.bulk_create(current_states)
+
+        created += size
+        log.info('Seeded %d of %d signals', created, count)
+
+
+def get_dashboard_querysets():
+    """
+    Get the querysets for the most used dashboard filters, as generated by the `SignalFilter` and
+    `FieldMappingOrderingFilter` of the `SignalAuthViewSet`.
+
+    :returns: list of (name, queryset) tuples
+    """
+    signals = Signal.objects.order_by('-current_state__created_at')
+    today = timezone.localdate()
+    last_week = today - timedelta(days=7)
+
+    main_slug = (SignalCurrentState.objects.exclude(main_slug='')
+                 .values_list('main_slug', flat=True).first())
+    sub_category_id = (SignalCurrentState.objects.exclude(sub_category=None)
+                       .values_list('sub_category_id', flat=True).first())
+
+    querysets = [
+        ('all', signals),
+        ('status gemeld', signals.filter(current_state__state__in=[GEMELD])),
+        ('status open', signals.filter(current_state__state__in=OPEN_STATES)),
+        ('stadsdeel', signals.filter(current_state__stadsdeel__in=[STADSDELEN[0][0]])),
+        ('priority high',
+         signals.filter(current_state__priority__in=[Priority.PRIORITY_HIGH])),
+        ('created today', signals.filter(current_state__created_at__date=today)),
+        ('created last week',
+         signals.filter(current_state__created_at__date__gte=last_week,
+                        current_state__created_at__date__lte=today)),
+        ('open in stadsdeel last week',
+         signals.filter(current_state__state__in=OPEN_STATES,
+                        current_state__stadsdeel__in=[STADSDELEN[0][0]],
+                        current_state__created_at__date__gte=last_week)),
+    ]
+    if main_slug:
+        querysets.append(
+            ('main category', signals.filter(current_state__main_slug__in=[main_slug])))
+    if sub_category_id:
+        querysets.append(
+            ('sub category', signals.filter(current_state__sub_category__in=[sub_category_id])))
+    return querysets
+
+
+def benchmark_queries(repeat=3):
+    """
+    Benchmark the dashboard queries, both fetching a page and counting the results.
+
+    :param repeat: number of times each query is executed, the best time is reported
+    :returns: list of dicts with the name, timings (in milliseconds) and query plan per query
+    """
+    results = []
+    for name, queryset in get_dashboard_querysets():
+        page = queryset[:PAGE_SIZE]
+        results.append({
+            'name': name,
+            'page_ms': _best_of(repeat, lambda: list(page.values_list('id', flat=True))),
+            'count_ms': _best_of(repeat, queryset.count),
+            'plan': page.explain(analyze=True),
+        })
+    return results
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
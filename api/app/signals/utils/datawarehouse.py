@@ -1,34 +1,228 @@
 import csv
+import gzip
 import json
+import logging
 import os
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from swift.storage import SwiftStorage
 
-from signals.apps.signals.models import CategoryAssignment, Location, Reporter, Signal, Status
+from signals.apps.signals.models import (
+    STADSDELEN,
+    CategoryAssignment,
+    Department,
+    Location,
+    Reporter,
+    Signal,
+    Status,
+    SubCategory
+)
+from signals.apps.signals.workflow import STATUS_CHOICES
 
+logger = logging.getLogger(__name__)
 
-def save_csv_files_datawarehouse():
+
+WATERMARKS_FILE_NAME = 'watermarks.json'
+
+
+def save_csv_files_datawarehouse(incremental=False):
     """Create CSV files for Datawarehouse and save them on the storage backend.
 
+    Every export stores a high-water mark per table on the storage backend. A full export writes
+    all rows to `<table>.csv`. An incremental export only writes the rows that were created or
+    changed since the previous export, to `delta/<timestamp>/<table>.csv`.
+
+    `updated_at` is set when a row is saved, not when its transaction commits, so a row can become
+    visible with an `updated_at` before the start of the export. The high-water mark therefore
+    lags `DWH_EXPORT_WATERMARK_LAG` seconds behind the start of the export, and rows changed in
+    that period are exported again by the next incremental export. Consumers must deduplicate
+    the rows on `id` (keeping the latest `updated_at`).
+
+    :param incremental: Only export rows changed since the previous export (Default: False)
     :returns:
     """
-    # Creating all CSV files.
-    csv_files = list()
+    exports = (
+        (Signal, _create_signals_csv),
+        (Location, _create_locations_csv),
+        (Reporter, _create_reporters_csv),
+        (CategoryAssignment, _create_category_assignments_csv),
+        (Status, _create_statuses_csv),
+    )
+
+    storage = _get_storage_backend()
+    watermarks = _get_watermarks(storage) if incremental else {}
+
+    # Taken before any table is exported, rows committed later get a later `updated_at` unless
+    # their transaction takes longer than `DWH_EXPORT_WATERMARK_LAG`.
+    watermark = timezone.now() - timedelta(seconds=settings.DWH_EXPORT_WATERMARK_LAG)
+
+    prefix = ''
+    if incremental:
+        prefix = 'delta/{}/'.format(timezone.now().strftime('%Y%m%d%H%M%S'))
+
+    # Every table is exported and saved on the storage backend by its own worker, so the upload of a
+    # CSV file starts as soon as it is created.
     with tempfile.TemporaryDirectory() as tmp_dir:
-        csv_files.append(_create_signals_csv(tmp_dir))
-        csv_files.append(_create_locations_csv(tmp_dir))
-        csv_files.append(_create_reporters_csv(tmp_dir))
-        csv_files.append(_create_category_assignments_csv(tmp_dir))
-        csv_files.append(_create_statuses_csv(tmp_dir))
+        jobs = [(model, create_csv, tmp_dir, watermarks.get(model._meta.model_name), prefix)
+                for model, create_csv in exports]
+
+        if settings.DWH_EXPORT_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=settings.DWH_EXPORT_WORKERS) as executor:
+                futures = [executor.submit(_export_table_in_thread, *job) for job in jobs]
+                for future in futures:
+                    future.result()
+        else:
+            for job in jobs:
+                _export_table(*job)
+
+    # Only move the high-water marks forward once all CSV files are saved.
+    new_watermarks = {}
+    for model, _ in exports:
+        since = watermarks.get(model._meta.model_name)
+        new_watermarks[model._meta.model_name] = max(since, watermark) if since else watermark
+    _save_watermarks(storage, new_watermarks)
+
+
+def _export_table(model, create_csv, location, since, prefix):
+    """Create the CSV file for given model and save it on the storage backend.
+
+    :param model: Model class
+    :param create_csv: Function creating the CSV file
+    :param location: Directory for saving the CSV file
+    :param since: Only rows updated after this datetime
+    :param prefix: Prefix for the file name on the storage backend
+    :returns:
+    """
+    csv_file_path = create_csv(location, since=since)
+
+    # Swift connections can't be shared between threads, every job gets its own storage backend.
+    storage = _get_storage_backend()
+    _save_csv_file(storage, csv_file_path, prefix + os.path.basename(csv_file_path))
+
+
+def _export_table_in_thread(*args):
+    """Run `_export_table` in a worker thread and close its database connection afterwards.
+
+    :returns:
+    """
+    try:
+        _export_table(*args)
+    finally:
+        # Django opens a database connection per thread, make sure it doesn't linger around.
+        connection.close()
+
+
+def _save_csv_file(storage, csv_file_path, name):
+    """Save given CSV file on the storage backend.
+
+    Files larger than `DWH_SWIFT_SEGMENT_SIZE` are uploaded to Swift in segments, with a manifest
+    object (Dynamic Large Object) under the given name.
+
+    :param storage: Storage backend
+    :param csv_file_path: Path to CSV file
+    :param name: Name of the file on the storage backend
+    :returns:
+    """
+    start_time = time.monotonic()
+    size = os.path.getsize(csv_file_path)
+
+    with open(csv_file_path, 'rb') as opened_csv_file:
+        if isinstance(storage, SwiftStorage) and size > settings.DWH_SWIFT_SEGMENT_SIZE:
+            _save_swift_segmented(storage, opened_csv_file, name, size)
+        else:
+            storage.save(name=name, content=opened_csv_file)
+
+    logger.info('Saved %s (%d bytes) in %.2f seconds', name, size, time.monotonic() - start_time)
+
 
-        # Getting the storage backend and save all CSV files.
-        storage = _get_storage_backend()
-        for csv_file_path in csv_files:
-            with open(csv_file_path, 'rb') as opened_csv_file:
-                file_name = os.path.basename(opened_csv_file.name)
-                storage.save(name=file_name, content=opened_csv_file)
+def _save_swift_segmented(storage, opened_file, name, size):
+    """Upload given file in segments to Swift as a Dynamic Large Object.
+
+    Every upload gets its own segments prefix, so the previous file stays complete until the
+    manifest points to the new segments. The segments of previous uploads are deleted afterwards.
+
+    :param storage: SwiftStorage instance
+    :param opened_file: File object opened in binary mode
+    :param name: Name of the manifest object
+    :param size: Size of the file in bytes
+    :returns:
+    """
+    segment_size = settings.DWH_SWIFT_SEGMENT_SIZE
+    segments_prefix = '{name}.segments/{timestamp}/'.format(
+        name=name, timestamp=timezone.now().strftime('%Y%m%d%H%M%S'))
+
+    for index, offset in enumerate(range(0, size, segment_size)):
+        opened_file.seek(offset)
+        storage.swift_conn.put_object(storage.container_name,
+                                      '{}{:08d}'.format(segments_prefix, index),
+                                      opened_file,
+                                      content_length=min(segment_size, size - offset))
+
+    storage.swift_conn.put_object(storage.container_name,
+                                  name,
+                                  b'',
+                                  content_length=0,
+                                  headers={'X-Object-Manifest': '{container}/{prefix}'.format(
+                                      container=storage.container_name, prefix=segments_prefix)})
+
+    _delete_old_swift_segments(storage, name, segments_prefix)
+
+
+def _delete_old_swift_segments(storage, name, segments_prefix):
+    """Delete the segments of given Dynamic Large Object, except those under `segments_prefix`.
+
+    :param storage: SwiftStorage instance
+    :param name: Name of the manifest object
+    :param segments_prefix: Prefix of the segments the manifest points to
+    :returns:
+    """
+    _, objects = storage.swift_conn.get_container(
+        storage.container_name, prefix='{}.segments/'.format(name), full_listing=True)
+
+    for obj in objects:
+        if not obj['name'].startswith(segments_prefix):
+            storage.swift_conn.delete_object(storage.container_name, obj['name'])
+
+
+def _get_watermarks(storage):
+    """Get the high-water marks of the previous export from the storage backend.
+
+    :param storage: Storage backend
+    :returns: dict mapping table name to datetime
+    """
+    if not storage.exists(WATERMARKS_FILE_NAME):
+        return {}
+
+    with storage.open(WATERMARKS_FILE_NAME) as watermarks_file:
+        watermarks = json.loads(watermarks_file.read())
+
+    return {table: parse_datetime(value) for table, value in watermarks.items() if value}
+
+
+def _save_watermarks(storage, watermarks):
+    """Save the high-water marks of the current export on the storage backend.
+
+    :param storage: Storage backend
+    :param watermarks: dict mapping table name to datetime
+    :returns:
+    """
+    content = json.dumps({
+        table: value.isoformat() if value else None for table, value in watermarks.items()
+    })
+
+    if storage.exists(WATERMARKS_FILE_NAME):
+        storage.delete(WATERMARKS_FILE_NAME)
+    storage.save(name=WATERMARKS_FILE_NAME, content=ContentFile(content.encode('utf-8')))
 
 
 def _get_storage_backend():
@@ -47,219 +241,353 @@ def _get_storage_backend():
         auto_overwrite=True)
 
 
-def _create_signals_csv(location):
-    """Create CSV file with all `Signal` objects.
+def _iterate_queryset(queryset):
+    """Iterate over given queryset in chunks without caching the results.
+
+    On PostgreSQL `.iterator()` uses a server-side cursor, so at most `DWH_EXPORT_CHUNK_SIZE` rows
+    are held in memory at any time.
+
+    :param queryset: Queryset object
+    :returns: generator
+    """
+    return queryset.iterator(chunk_size=settings.DWH_EXPORT_CHUNK_SIZE)
+
+
+def _filter_updated_at(queryset, since=None, until=None):
+    """Filter given queryset on the `updated_at` range (since, until].
+
+    :param queryset: Queryset object
+    :param since: Only rows updated after this datetime (Default: None)
+    :param until: Only rows updated at or before this datetime (Default: None)
+    :returns: Queryset object
+    """
+    if since is not None:
+        queryset = queryset.filter(updated_at__gt=since)
+    if until is not None:
+        queryset = queryset.filter(updated_at__lte=until)
+    return queryset
+
+
+def _open_csv_file(location, file_name):
+    """Open a CSV file for writing, compressed on the fly if configured.
+
+    With `DWH_EXPORT_COMPRESSION` set to `gzip` the rows are compressed while they are written and
+    `.gz` is appended to the file name.
 
     :param location: Directory for saving the CSV file
+    :param file_name: Name of the CSV file
+    :raises: ImproperlyConfigured
+    :returns: tuple (path, file object)
+    """
+    compression = settings.DWH_EXPORT_COMPRESSION
+    if not compression:
+        path = os.path.join(location, file_name)
+        return path, open(path, 'w')
+
+    if compression == 'gzip':
+        path = os.path.join(location, '{}.gz'.format(file_name))
+        return path, gzip.open(path, 'wt', compresslevel=settings.DWH_EXPORT_COMPRESSION_LEVEL)
+
+    raise ImproperlyConfigured(
+        'Unsupported `DWH_EXPORT_COMPRESSION` {}, use `gzip` or leave empty.'.format(compression))
+
+
+def _write_csv(location, file_name, header, rows):
+    """Stream given rows to a CSV file and log the row count and elapsed time.
+
+    :param location: Directory for saving the CSV file
+    :param file_name: Name of the CSV file
+    :param header: Column names (list)
+    :param rows: Iterable of rows (lists)
     :returns: Path to CSV file
     """
-    with open(os.path.join(location, 'signals.csv'), 'w') as csv_file:
+    start_time = time.monotonic()
+    row_count = 0
+
+    path, opened_csv_file = _open_csv_file(location, file_name)
+    with opened_csv_file as csv_file:
         writer = csv.writer(csv_file)
 
         # Writing the header to the CSV file.
-        writer.writerow([
-            'id',
-            'signal_uuid',
-            'source',
-            'text',
-            'text_extra',
-            'incident_date_start',
-            'incident_date_end',
-            'created_at',
-            'updated_at',
-            'operational_date',
-            'expire_date',
-            'image',
-            'upload',
-            'extra_properties',
-            'category_assignment_id',
-            'location_id',
-            'reporter_id',
-            'status_id',
-        ])
-
-        # Writing all `Signal` objects to the CSV file.
-        for signal in Signal.objects.all():
-            writer.writerow([
-                signal.pk,
-                signal.signal_id,
-                signal.source,
-                signal.text,
-                signal.text_extra,
-                signal.incident_date_start,
-                signal.incident_date_end,
-                signal.created_at,
-                signal.updated_at,
-                signal.operational_date,
-                signal.expire_date,
-                signal.image,
-                signal.upload,
-                json.dumps(signal.extra_properties),
-                signal.category_assignment_id,
-                signal.location_id,
-                signal.reporter_id,
-                signal.status_id,
-            ])
-
-    return csv_file.name
-
-
-def _create_locations_csv(location):
-    """Create CSV file with all `Location` objects.
+        writer.writerow(header)
+
+        for row in rows:
+            writer.writerow(row)
+            row_count += 1
+
+    logger.info('Created %s with %d rows in %.2f seconds',
+                os.path.basename(path), row_count, time.monotonic() - start_time)
+
+    return path
+
+
+def _create_signals_csv(location, since=None, until=None):
+    """Create CSV file with all `Signal` objects.
 
     :param location: Directory for saving the CSV file
+    :param since: Only rows updated after this datetime (Default: None)
+    :param until: Only rows updated at or before this datetime (Default: None)
     :returns: Path to CSV file
     """
-    with open(os.path.join(location, 'locations.csv'), 'w') as csv_file:
-        writer = csv.writer(csv_file)
+    header = [
+        'id',
+        'signal_uuid',
+        'source',
+        'text',
+        'text_extra',
+        'incident_date_start',
+        'incident_date_end',
+        'created_at',
+        'updated_at',
+        'operational_date',
+        'expire_date',
+        'image',
+        'upload',
+        'extra_properties',
+        'category_assignment_id',
+        'location_id',
+        'reporter_id',
+        'status_id',
+    ]
+    queryset = _filter_updated_at(Signal.objects.order_by(), since, until).values_list(
+        'pk',
+        'signal_id',
+        'source',
+        'text',
+        'text_extra',
+        'incident_date_start',
+        'incident_date_end',
+        'created_at',
+        'updated_at',
+        'operational_date',
+        'expire_date',
+        'image',
+        'upload',
+        'extra_properties',
+        'category_assignment_id',
+        'location_id',
+        'reporter_id',
+        'status_id',
+    )
+
+    def rows():
+        for row in _iterate_queryset(queryset):
+            row = list(row)
+            row[13] = json.dumps(row[13])  # extra_properties
+            yield row
+
+    return _write_csv(location, 'signals.csv', header, rows())
+
+
+def _create_locations_csv(location, since=None, until=None):
+    """Create CSV file with all `Location` objects.
 
-        # Writing the header to the CSV file.
-        writer.writerow([
-            'id',
-            'lat',
-            'lng',
-            'stadsdeel',
-            'buurt_code',
-            'address',
-            'address_text',
-            'created_at',
-            'updated_at',
-            'extra_properties',
-            '_signal_id',
-        ])
-
-        # Writing all `Location` objects to the CSV file.
-        for location_obj in Location.objects.all():
-            writer.writerow([
-                location_obj.pk,
-                location_obj.geometrie.x,
-                location_obj.geometrie.y,
-                location_obj.get_stadsdeel_display(),
-                location_obj.buurt_code,
-                json.dumps(location_obj.address),
-                location_obj.address_text,
-                location_obj.created_at,
-                location_obj.updated_at,
-                json.dumps(location_obj.extra_properties),
-                location_obj._signal_id,
-            ])
-
-    return csv_file.name
-
-
-def _create_reporters_csv(location):
+    :param location: Directory for saving the CSV file
+    :param since: Only rows updated after this datetime (Default: None)
+    :param until: Only rows updated at or before this datetime (Default: None)
+    :returns: Path to CSV file
+    """
+    header = [
+        'id',
+        'lat',
+        'lng',
+        'stadsdeel',
+        'buurt_code',
+        'address',
+        'address_text',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+    ]
+    queryset = _filter_updated_at(Location.objects.order_by(), since, until).values_list(
+        'pk',
+        'geometrie',
+        'stadsdeel',
+        'buurt_code',
+        'address',
+        'address_text',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+    )
+    stadsdelen = dict(STADSDELEN)
+
+    def rows():
+        for (pk, geometrie, stadsdeel, buurt_code, address, address_text, created_at, updated_at,
+             extra_properties, _signal_id) in _iterate_queryset(queryset):
+            yield [
+                pk,
+                geometrie.x,
+                geometrie.y,
+                stadsdelen.get(stadsdeel, stadsdeel),
+                buurt_code,
+                json.dumps(address),
+                address_text,
+                created_at,
+                updated_at,
+                json.dumps(extra_properties),
+                _signal_id,
+            ]
+
+    return _write_csv(location, 'locations.csv', header, rows())
+
+
+def _create_reporters_csv(location, since=None, until=None):
     """Create CSV file with all `Reporter` objects.
 
     :param location: Directory for saving the CSV file
+    :param since: Only rows updated after this datetime (Default: None)
+    :param until: Only rows updated at or before this datetime (Default: None)
     :returns: Path to CSV file
     """
-    with open(os.path.join(location, 'reporters.csv'), 'w') as csv_file:
-        writer = csv.writer(csv_file)
+    header = [
+        'id',
+        'email',
+        'phone',
+        'remove_at',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+    ]
+    queryset = _filter_updated_at(Reporter.objects.order_by(), since, until).values_list(
+        'pk',
+        'email',
+        'phone',
+        'remove_at',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+    )
+
+    def rows():
+        for row in _iterate_queryset(queryset):
+            row = list(row)
+            row[6] = json.dumps(row[6])  # extra_properties
+            yield row
+
+    return _write_csv(location, 'reporters.csv', header, rows())
+
+
+def _get_sub_categories_lookup():
+    """Get the main category name, name and departments of all `SubCategory` objects.
+
+    The category taxonomy is small, so we resolve it up front with a fixed number of queries
+    instead of following the relations for every `CategoryAssignment` row.
+
+    :returns: dict mapping `SubCategory` id to (main name, sub name, departments) tuple
+    """
+    sub_categories = SubCategory.objects.select_related('main_category').prefetch_related(
+        Prefetch('departments', queryset=Department.objects.order_by('name')))
 
-        # Writing the header to the CSV file.
-        writer.writerow([
-            'id',
-            'email',
-            'phone',
-            'remove_at',
-            'created_at',
-            'updated_at',
-            'extra_properties',
-            '_signal_id',
-        ])
-
-        # Writing all `Reporter` objects to the CSV file.
-        for reporter in Reporter.objects.all():
-            writer.writerow([
-                reporter.pk,
-                reporter.email,
-                reporter.phone,
-                reporter.remove_at,
-                reporter.created_at,
-                reporter.updated_at,
-                json.dumps(reporter.extra_properties),
-                reporter._signal_id,
-            ])
-
-    return csv_file.name
-
-
-def _create_category_assignments_csv(location):
+    return {
+        sub_category.pk: (
+            sub_category.main_category.name,
+            sub_category.name,
+            ', '.join(department.name for department in sub_category.departments.all()),
+        ) for sub_category in sub_categories
+    }
+
+
+def _create_category_assignments_csv(location, since=None, until=None):
     """Create CSV file with all `CategoryAssignment` objects.
 
     :param location: Directory for saving the CSV file
+    :param since: Only rows updated after this datetime (Default: None)
+    :param until: Only rows updated at or before this datetime (Default: None)
     :returns: Path to CSV file
     """
-    with open(os.path.join(location, 'categories.csv'), 'w') as csv_file:
-        writer = csv.writer(csv_file)
-
-        # Writing the header to the CSV file.
-        writer.writerow([
-            'id',
-            'main',
-            'sub',
-            'departments',
-            'created_at',
-            'updated_at',
-            'extra_properties',
-            '_signal_id',
-        ])
-
-        # Writing all `CategoryAssignment` objects to the CSV file.
-        for category_assignment in CategoryAssignment.objects.all():
-            writer.writerow([
-                category_assignment.pk,
-                category_assignment.sub_category.main_category.name,
-                category_assignment.sub_category.name,
-                ', '.join(category_assignment.sub_category.departments.values_list(
-                    'name', flat=True)),
-                category_assignment.created_at,
-                category_assignment.updated_at,
-                json.dumps(category_assignment.extra_properties),
-                category_assignment._signal_id,
-            ])
-
-    return csv_file.name
-
-
-def _create_statuses_csv(location):
+    header = [
+        'id',
+        'main',
+        'sub',
+        'departments',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+    ]
+    queryset = _filter_updated_at(CategoryAssignment.objects.order_by(), since, until).values_list(
+        'pk',
+        'sub_category_id',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+    )
+    sub_categories = _get_sub_categories_lookup()
+
+    def rows():
+        for (pk, sub_category_id, created_at, updated_at, extra_properties,
+             _signal_id) in _iterate_queryset(queryset):
+            main, sub, departments = sub_categories[sub_category_id]
+            yield [
+                pk,
+                main,
+                sub,
+                departments,
+                created_at,
+                updated_at,
+                json.dumps(extra_properties),
+                _signal_id,
+            ]
+
+    return _write_csv(location, 'categories.csv', header, rows())
+
+
+def _create_statuses_csv(location, since=None, until=None):
     """Create CSV file with all `Status` objects.
 
     :param location: Directory for saving the CSV file
+    :param since: Only rows updated after this datetime (Default: None)
+    :param until: Only rows updated at or before this datetime (Default: None)
     :returns: Path to CSV file
     """
-    with open(os.path.join(location, 'statuses.csv'), 'w') as csv_file:
-        writer = csv.writer(csv_file)
-
-        # Writing the header to the CSV file.
-        writer.writerow([
-            'id',
-            'text',
-            'user',
-            'target_api',
-            'state_display',
-            'extern',
-            'created_at',
-            'updated_at',
-            'extra_properties',
-            '_signal_id',
-            'state',
-        ])
-
-        # Writing all `Status` objects to the CSV file.
-        for status in Status.objects.all():
-            writer.writerow([
-                status.pk,
-                status.text,
-                status.user,
-                status.target_api,
-                status.get_state_display(),
-                status.extern,
-                status.created_at,
-                status.updated_at,
-                json.dumps(status.extra_properties),
-                status._signal_id,
-                status.state,
-            ])
-
-    return csv_file.name
+    header = [
+        'id',
+        'text',
+        'user',
+        'target_api',
+        'state_display',
+        'extern',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+        'state',
+    ]
+    queryset = _filter_updated_at(Status.objects.order_by(), since, until).values_list(
+        'pk',
+        'text',
+        'user',
+        'target_api',
+        'state',
+        'extern',
+        'created_at',
+        'updated_at',
+        'extra_properties',
+        '_signal_id',
+    )
+    states = dict(STATUS_CHOICES)
+
+    def rows():
+        for (pk, text, user, target_api, state, extern, created_at, updated_at, extra_properties,
+             _signal_id) in _iterate_queryset(queryset):
+            yield [
+                pk,
+                text,
+                user,
+                target_api,
+                states.get(state, state),
+                extern,
+                created_at,
+                updated_at,
+                json.dumps(extra_properties),
+                _signal_id,
+                state,
+            ]
+
+    return _write_csv(location, 'statuses.csv', header, rows())
@@ -0,0 +1,39 @@
+"""
+Locks shared by all processes (API and Celery workers), backed by PostgreSQL advisory locks.
+
+The Django cache is local to a process (`LocMemCache`), so it can't be used to make sure only
+one process at a time does something.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+
+# Namespaces of the advisory locks (first key), the second key identifies the locked object.
+PDF_RENDER_LOCK = 1
+SIGMAX_PUSH_LOCK = 2
+
+
+@contextmanager
+def try_advisory_lock(namespace, key):
+    """Try to acquire a (session level) advisory lock, without waiting for it.
+
+    Usage:
+
+        with try_advisory_lock(PDF_RENDER_LOCK, key) as acquired:
+            if not acquired:
+                ...  # Locked by another process.
+
+    :param namespace: namespace of the lock (int)
+    :param key: key of the lock within the namespace (32-bit int)
+    :returns: context manager yielding whether the lock was acquired (bool)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s, %s)', [namespace, key])
+        acquired = cursor.fetchone()[0]
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s, %s)', [namespace, key])
@@ -0,0 +1,25 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from signals.apps.sigmax.benchmark import benchmark_stuf
+
+
+class TestBenchmarkStuf(SimpleTestCase):
+
+    def test_benchmark_stuf(self):
+        results = benchmark_stuf(size=10000, repeat=1)
+
+        names = [result['name'] for result in results]
+        self.assertIn('Lk01 in large, iterparse', names)
+        self.assertIn('Lk01 out, stream', names)
+        for result in results:
+            self.assertGreaterEqual(result['ms'], 0)
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command('benchmark_stuf', size=10000, repeat=1, stdout=out)
+
+        self.assertIn('Bv03 berichtcode', out.getvalue())
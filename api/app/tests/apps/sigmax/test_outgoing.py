@@ -68,7 +68,7 @@ class TestOutgoing(TestCase, XmlTestMixin):
 
     def test_generate_voegZaakdocumentToe_Lk01(self):
         signal = SignalFactoryValidLocation.create()
-        xml_message = _generate_voegZaakdocumentToe_Lk01(signal)
+        xml_message = str(_generate_voegZaakdocumentToe_Lk01(signal))
         self.assertXmlDocument(xml_message)
 
         self.assertIn(
@@ -79,7 +79,7 @@ class TestOutgoing(TestCase, XmlTestMixin):
     def test_generate_voegZaakdocumentToe_Lk01_escaping(self):
         poison = SignalFactoryValidLocation.create()
         poison.text = '<poison>tastes nice</poison>'
-        xml_message = _generate_voegZaakdocumentToe_Lk01(poison)
+        xml_message = str(_generate_voegZaakdocumentToe_Lk01(poison))
         self.assertTrue('<poison>' not in xml_message)
 
 
@@ -26,6 +26,7 @@ class TestPDF(TestCase):
                                                 text='Consider it done')
         signal.status = status
         signal.save()
+        signal.image_crop.generate()
 
         html = _render_html(signal)
 
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from signals.apps.sigmax import session
+
+
+class TestSession(SimpleTestCase):
+
+    def setUp(self):
+        session._session = None
+        session._session_pid = None
+
+    @override_settings(SIGMAX_MAX_RETRIES=2, SIGMAX_POOL_MAXSIZE=3,
+                       SIGMAX_RETRY_BACKOFF_FACTOR=0.1)
+    def test_create_session(self):
+        adapter = session.create_session().get_adapter('https://sigmax.example.com/')
+
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(adapter.max_retries.connect, 2)
+        self.assertEqual(adapter.max_retries.read, 0)
+        self.assertEqual(adapter.max_retries.status_forcelist, (503, ))
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.1)
+        self.assertTrue(adapter.max_retries.is_retry('POST', 503))
+        self.assertFalse(adapter.max_retries.is_retry('POST', 500))
+
+    def test_get_session_reused(self):
+        self.assertIs(session.get_session(), session.get_session())
+
+    def test_get_session_after_fork(self):
+        first = session.get_session()
+        with mock.patch('signals.apps.sigmax.session.os.getpid', return_value=-1):
+            self.assertIsNot(session.get_session(), first)
+
+    @override_settings(SIGMAX_CONNECT_TIMEOUT=1, SIGMAX_READ_TIMEOUT=2)
+    @mock.patch('signals.apps.sigmax.session.get_session')
+    def test_post(self, mocked_get_session):
+        mocked_get_session.return_value.post.return_value.status_code = 200
+
+        with self.assertLogs('signals.apps.sigmax.session', level='INFO') as logs:
+            response = session.post('https://sigmax.example.com/', 'action', data=b'')
+
+        self.assertEqual(response.status_code, 200)
+        mocked_get_session.return_value.post.assert_called_once_with(
+            'https://sigmax.example.com/', data=b'', timeout=(1, 2))
+        self.assertEqual(logs.records[0].soap_action, 'action')
+        self.assertEqual(logs.records[0].status_code, 200)
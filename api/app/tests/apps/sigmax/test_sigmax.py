@@ -132,7 +132,7 @@ class TestVoegZaakDocumentToeLk01Message(TestCase):
 
     def test_is_xml(self):
         signal = self.signal
-        xml = outgoing._generate_voegZaakdocumentToe_Lk01(signal)
+        xml = str(outgoing._generate_voegZaakdocumentToe_Lk01(signal))
         try:
             etree.fromstring(xml)
         except Exception:
@@ -141,7 +141,7 @@ class TestVoegZaakDocumentToeLk01Message(TestCase):
     def test_escaping(self):
         poison: Signal = self.signal
         poison.text = '<poison>tastes nice</poison>'
-        xml = outgoing._generate_voegZaakdocumentToe_Lk01(poison)
+        xml = str(outgoing._generate_voegZaakdocumentToe_Lk01(poison))
         self.assertTrue('<poison>' not in xml)
 
 
@@ -165,7 +165,7 @@ class TestSendStufMessage(TestCase):
         SIGMAX_SERVER=REQUIRED_ENV['SIGMAX_SERVER'],
     )
     @mock.patch('signals.apps.sigmax.outgoing._stuf_response_ok', autospec=True)
-    @mock.patch('requests.post', autospec=True)
+    @mock.patch('signals.apps.sigmax.outgoing.session.post', autospec=True)
     def test_send_message(self, mocked_request_post, mocked_stuf_response_ok):
         mocked_request_post.return_value.status_code = 200
         mocked_request_post.return_value.text = 'Message from Sigmax'
@@ -196,6 +196,7 @@ class TestSendStufMessage(TestCase):
             b'%d' % len(message),
             kwargs['headers']['Content-Length']
         )
+        self.assertEquals(kwargs['soap_action'], action)
 
 
 class TestStufResponseOk(TestCase):
@@ -218,3 +219,33 @@ class TestStufResponseOk(TestCase):
         fake_response.text = test_xml
 
         self.assertEqual(outgoing._stuf_response_ok(fake_response), False)
+
+
+class TestHandle(TestCase):
+
+    def setUp(self):
+        self.signal = SignalFactoryValidLocation.create()
+
+    @mock.patch('signals.apps.sigmax.outgoing._generate_voegZaakdocumentToe_Lk01', autospec=True)
+    @mock.patch('signals.apps.sigmax.outgoing._send_stuf_message', autospec=True)
+    def test_handle(self, mocked_send_stuf_message, mocked_generate_voegZaakdocumentToe_Lk01):
+        mocked_generate_voegZaakdocumentToe_Lk01.return_value = 'voegZaakdocumentToe'
+
+        outgoing.handle(self.signal)
+
+        # CreeerZaak is sent first, VoegZaakdocumentToe after the case was created.
+        actions = [args[1] for args, _ in mocked_send_stuf_message.call_args_list]
+        self.assertEqual(actions, [outgoing.CREEER_ZAAK_SOAPACTION,
+                                   outgoing.VOEG_ZAAKDOCUMENT_TOE_SOAPACTION])
+        self.assertEqual(mocked_send_stuf_message.call_args_list[1][0][0], 'voegZaakdocumentToe')
+
+    @mock.patch('signals.apps.sigmax.outgoing._generate_voegZaakdocumentToe_Lk01', autospec=True)
+    @mock.patch('signals.apps.sigmax.outgoing._send_stuf_message', autospec=True)
+    def test_handle_creeerZaak_fails(self, mocked_send_stuf_message,
+                                     mocked_generate_voegZaakdocumentToe_Lk01):
+        mocked_send_stuf_message.side_effect = outgoing.SigmaxException()
+
+        with self.assertRaises(outgoing.SigmaxException):
+            outgoing.handle(self.signal)
+
+        mocked_send_stuf_message.assert_called_once()
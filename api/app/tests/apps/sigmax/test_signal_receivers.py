@@ -1,27 +1,54 @@
 from unittest import mock
 
+from django.core.cache import cache
 from django.test import TestCase
 
+from signals.apps.signals import workflow
 from signals.apps.signals.managers import update_status
+from signals.apps.signals.models import Status
 from tests.apps.signals.factories import SignalFactory, StatusFactory
 
 
 class TestSignalReceivers(TestCase):
 
-    @mock.patch('signals.apps.sigmax.signal_receivers.tasks', autospec=True)
-    def test_status_update_handler(self, mocked_tasks):
-        signal = SignalFactory.create()
-        prev_status = signal.status
+    def setUp(self):
+        cache.clear()
+        self.signal = SignalFactory.create()
 
-        new_status = StatusFactory.create(_signal=signal)
-        signal.status = new_status
-        signal.save()
+    def _send_update_status(self, **status_kwargs):
+        prev_status = self.signal.status
+
+        new_status = StatusFactory.create(_signal=self.signal, **status_kwargs)
+        self.signal.status = new_status
+        self.signal.save()
 
         update_status.send(
             sender=self.__class__,
-            signal_obj=signal,
+            signal_obj=self.signal,
             status=new_status,
             prev_status=prev_status,
         )
 
-        mocked_tasks.push_to_sigmax.delay.assert_called_once_with(pk=signal.id)
+    @mock.patch('signals.apps.sigmax.signal_receivers.tasks.push_to_sigmax', autospec=True)
+    def test_status_update_handler(self, mocked_push_to_sigmax):
+        self._send_update_status(state=workflow.TE_VERZENDEN,
+                                 target_api=Status.TARGET_API_SIGMAX)
+
+        mocked_push_to_sigmax.delay.assert_called_once_with(pk=self.signal.id)
+
+    @mock.patch('signals.apps.sigmax.signal_receivers.tasks.push_to_sigmax', autospec=True)
+    def test_status_update_handler_not_applicable(self, mocked_push_to_sigmax):
+        # Status updates not meant for Sigmax don't schedule a (no-op) task.
+        self._send_update_status()
+
+        mocked_push_to_sigmax.delay.assert_not_called()
+
+    @mock.patch('signals.apps.sigmax.signal_receivers.tasks.push_to_sigmax', autospec=True)
+    def test_status_update_handler_every_update(self, mocked_push_to_sigmax):
+        # Every status update meant for Sigmax schedules a push, also from the same process.
+        for _ in range(2):
+            self._send_update_status(state=workflow.TE_VERZENDEN,
+                                     target_api=Status.TARGET_API_SIGMAX)
+
+        self.assertEqual(mocked_push_to_sigmax.delay.call_count, 2)
+        mocked_push_to_sigmax.delay.assert_called_with(pk=self.signal.id)
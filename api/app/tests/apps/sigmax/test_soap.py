@@ -3,7 +3,7 @@ from unittest import mock
 import lxml
 from django.http import HttpResponse
 from django.template.loader import render_to_string
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from lxml import etree
 from rest_framework.test import APITestCase
 
@@ -110,6 +110,40 @@ class TestSoapEndpoint(APITestCase):
         self.assertEqual(len(found), 1)
         self.assertEqual(found[0].text, 'Fo03')
 
+    def _post_actualiseerZaakstatus_Lk01(self, data):
+        superuser = SuperUserFactory.create()
+        self.client.force_authenticate(user=superuser)
+
+        return self.client.post(SOAP_ENDPOINT, data=data, content_type='text/xml',
+                                HTTP_SOAPACTION=ACTUALISEER_ZAAK_STATUS_SOAPACTION)
+
+    def _assert_fo03(self, response):
+        self.assertEqual(response.status_code, 500)
+        tree = etree.fromstring(response.content)
+
+        namespaces = {'stuf': 'http://www.egem.nl/StUF/StUF0301'}
+        found = tree.xpath('//stuf:stuurgegevens/stuf:berichtcode', namespaces=namespaces)
+        self.assertEqual(found[0].text, 'Fo03')
+
+    def test_not_xml_results_in_fo03(self):
+        response = self._post_actualiseerZaakstatus_Lk01('THIS IS NOT XML')
+
+        self._assert_fo03(response)
+        self.assertIn('Bericht kan niet worden verwerkt', response.content.decode('utf-8'))
+
+    @override_settings(SIGMAX_STUF_MAX_SIZE=100)
+    def test_too_large_results_in_fo03(self):
+        response = self._post_actualiseerZaakstatus_Lk01('<a>{}</a>'.format('x' * 100))
+
+        self._assert_fo03(response)
+        self.assertIn('Bericht kan niet worden verwerkt', response.content.decode('utf-8'))
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_request_too_large_results_in_fo03(self):
+        response = self._post_actualiseerZaakstatus_Lk01('<a>{}</a>'.format('x' * 100))
+
+        self._assert_fo03(response)
+
     def test_no_signal_for_message(self):
         """Test that we generate a Fo03 if no signal can be found to go with it."""
         self.assertEqual(Signal.objects.count(), 0)
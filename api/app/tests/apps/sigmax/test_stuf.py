@@ -0,0 +1,101 @@
+import base64
+import os
+from io import BytesIO
+
+import requests
+from django.test import SimpleTestCase, override_settings
+from lxml import etree
+
+from signals.apps.sigmax import stuf
+from signals.apps.sigmax.benchmark import get_actualiseerZaakstatus_Lk01, get_bv03
+from signals.apps.sigmax.stuf import StreamingStufMessage, StufMessageTooLarge
+
+
+class TestStreamingStufMessage(SimpleTestCase):
+
+    def setUp(self):
+        self.attachment = os.urandom(1000)
+        self.message = StreamingStufMessage(
+            '<inhoud>', self.attachment, '</inhoud>', chunk_size=3 * 100)
+
+    def test_iter(self):
+        chunks = list(self.message)
+
+        # Prefix, 4 chunks of the attachment and suffix.
+        self.assertEqual(len(chunks), 6)
+        self.assertTrue(all(len(chunk) <= 400 for chunk in chunks))
+        self.assertEqual(
+            b''.join(chunks),
+            b'<inhoud>' + base64.b64encode(self.attachment) + b'</inhoud>')
+
+        # Can be iterated again, e.g. when the request is retried.
+        self.assertEqual(list(self.message), chunks)
+
+    def test_len(self):
+        for size in range(0, 7):
+            message = StreamingStufMessage('<inhoud>', os.urandom(size), '</inhoud>')
+            self.assertEqual(len(message), len(b''.join(message)))
+
+    def test_str(self):
+        self.assertEqual(
+            str(self.message),
+            '<inhoud>{}</inhoud>'.format(base64.b64encode(self.attachment).decode('utf-8')))
+
+    def test_request_body(self):
+        request = requests.Request('POST', 'https://sigmax.example.com/', data=self.message)
+        prepared = request.prepare()
+
+        self.assertIs(prepared.body, self.message)
+        self.assertEqual(prepared.headers['Content-Length'], str(len(self.message)))
+        self.assertNotIn('Transfer-Encoding', prepared.headers)
+
+
+class TestParse(SimpleTestCase):
+    expected = {
+        'sia_id': 'SIA-1234567890',
+        'resultaat_omschrijving': 'Er is gehandhaafd',
+        'datum_status_gezet': '2018101111485276',
+        'einddatum': '20180926',
+        'reden': 'Benchmark',
+    }
+
+    def test_extract(self):
+        self.assertEqual(
+            stuf.extract_actualiseerZaakstatus_Lk01(get_actualiseerZaakstatus_Lk01()),
+            self.expected)
+
+    @override_settings(SIGMAX_STUF_ITERPARSE_THRESHOLD=1000)
+    def test_extract_iterparse(self):
+        xml = get_actualiseerZaakstatus_Lk01(size=5000)
+
+        with self.settings(SIGMAX_STUF_ITERPARSE_THRESHOLD=len(xml)):
+            tree_result = stuf.extract_actualiseerZaakstatus_Lk01(xml)
+        self.assertEqual(stuf.extract_actualiseerZaakstatus_Lk01(xml), tree_result)
+        self.assertEqual(tree_result, self.expected)
+
+    def test_iterextract_missing(self):
+        xml = b'<object xmlns="http://www.egem.nl/StUF/sector/zkn/0310"><identificatie>' \
+              b'SIA-1</identificatie></object>'
+
+        result = stuf.iterextract(BytesIO(xml), stuf.ACTUALISEER_ZAAK_STATUS_FIELDS)
+
+        self.assertEqual(result['sia_id'], 'SIA-1')
+        self.assertEqual(result['reden'], '')
+
+    @override_settings(SIGMAX_STUF_MAX_SIZE=100)
+    def test_too_large(self):
+        with self.assertRaises(StufMessageTooLarge):
+            stuf.extract_actualiseerZaakstatus_Lk01(get_actualiseerZaakstatus_Lk01())
+
+    def test_no_entities(self):
+        xml = b'''<?xml version="1.0"?>
+<!DOCTYPE berichtcode [<!ENTITY secret SYSTEM "file:///etc/passwd">]>
+<stuurgegevens xmlns="http://www.egem.nl/StUF/StUF0301"><berichtcode>&secret;</berichtcode>
+</stuurgegevens>'''
+
+        self.assertFalse(stuf.get_berichtcode(xml))
+
+    def test_get_berichtcode(self):
+        self.assertEqual(stuf.get_berichtcode(get_bv03()), 'Bv03')
+        with self.assertRaises(etree.XMLSyntaxError):
+            stuf.get_berichtcode(b'THIS IS NOT XML')
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+
+from signals.apps.sigmax import tasks
+from signals.apps.sigmax.outgoing import SigmaxException
+from signals.apps.signals import workflow
+from signals.apps.signals.models import Signal, Status
+from signals.utils.locks import SIGMAX_PUSH_LOCK
+from tests.apps.signals.factories import SignalFactoryValidLocation, StatusFactory
+
+
+class TestPushToSigmax(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.signal = SignalFactoryValidLocation.create()
+        status = StatusFactory.create(_signal=self.signal,
+                                      state=workflow.TE_VERZENDEN,
+                                      target_api=Status.TARGET_API_SIGMAX)
+        self.signal.status = status
+        self.signal.save()
+
+    def _is_locked(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM pg_locks WHERE locktype = 'advisory' "
+                "AND classid = %s AND objid = %s AND objsubid = 2",
+                [SIGMAX_PUSH_LOCK, self.signal.pk])
+            return cursor.fetchone()[0] > 0
+
+    @mock.patch('signals.apps.sigmax.tasks.outgoing.handle', autospec=True)
+    def test_push_to_sigmax(self, mocked_handle):
+        tasks.push_to_sigmax(pk=self.signal.pk)
+
+        mocked_handle.assert_called_once_with(self.signal)
+        self.signal.refresh_from_db()
+        self.assertEqual(self.signal.status.state, workflow.VERZONDEN)
+        self.assertFalse(self._is_locked())
+
+    @mock.patch('signals.apps.sigmax.tasks.outgoing.handle', autospec=True)
+    def test_push_to_sigmax_failed(self, mocked_handle):
+        mocked_handle.side_effect = SigmaxException()
+
+        with self.assertRaises(SigmaxException):
+            tasks.push_to_sigmax(pk=self.signal.pk)
+
+        self.signal.refresh_from_db()
+        self.assertEqual(self.signal.status.state, workflow.VERZENDEN_MISLUKT)
+        self.assertFalse(self._is_locked())
+
+    @mock.patch('signals.apps.sigmax.tasks.outgoing.handle', autospec=True)
+    def test_push_to_sigmax_not_applicable(self, mocked_handle):
+        Signal.actions.update_status({'state': workflow.VERZONDEN, 'text': 'x'}, self.signal)
+
+        tasks.push_to_sigmax(pk=self.signal.pk)
+
+        mocked_handle.assert_not_called()
+
+    @mock.patch('signals.apps.sigmax.tasks.outgoing.handle', autospec=True)
+    def test_push_to_sigmax_in_progress(self, mocked_handle):
+        # Another push of the same signal is in progress, retried later.
+        with mock.patch('signals.apps.sigmax.tasks.try_advisory_lock') as mocked_lock, \
+                mock.patch.object(tasks.push_to_sigmax, 'retry', side_effect=Retry()):
+            mocked_lock.return_value.__enter__.return_value = False
+            with self.assertRaises(Retry):
+                tasks.push_to_sigmax(pk=self.signal.pk)
+            mocked_lock.assert_called_once_with(SIGMAX_PUSH_LOCK, self.signal.pk)
+
+        mocked_handle.assert_not_called()
@@ -73,6 +73,9 @@ class SignalFactory(factory.DjangoModelFactory):
         self.reporter = self.reporters.last()
         self.priority = self.priorities.last()
 
+        if create:
+            Signal.actions.refresh_current_state(self)
+
 
 class SignalFactoryWithImage(SignalFactory):
     image = factory.django.ImageField()
@@ -1,10 +1,14 @@
 import json
 import os
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
 from signals import API_VERSIONS
@@ -101,6 +105,20 @@ class TestAuthAPIEndpoints(APITestCase):
 
             self.assertEqual(response.status_code, 200, 'Wrong response code for {}'.format(url))
 
+    def test_category_list_num_queries(self):
+        # The number of queries should not depend on the number of category assignments.
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/signals/auth/category/')
+        self.assertEqual(response.status_code, 200)
+        num_queries = len(context.captured_queries)
+
+        factories.SignalFactory.create_batch(5)
+
+        with self.assertNumQueries(num_queries):
+            response = self.client.get('/signals/auth/category/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 6)
+
     def test_delete_not_allowed(self):
         for endpoint in self.endpoints:
             url = f'{endpoint}1/'
@@ -296,6 +314,31 @@ class TestPublicSignalEndpoint(TestAPIEnpointsBase):
 
         self.assertEqual(response.status_code, 403)
 
+    @override_settings(SIGNAL_IMAGE_MAX_SIZE=1024)
+    def test_post_signal_image_too_large(self):
+        url = f'{self.endpoint}image/'
+        image = SimpleUploadedFile(
+            'image.gif', self.small_gif + b'\x00' * 1024, content_type='image/gif')
+        response = self.client.post(
+            url, {'signal_id': self.signal.signal_id, 'image': image})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(),
+                         {'non_field_errors': ['Foto mag maximaal 8Mb groot zijn.']})
+        self.signal.refresh_from_db()
+        self.assertFalse(self.signal.image)
+
+    def test_post_signal_image_not_an_image(self):
+        url = f'{self.endpoint}image/'
+        image = SimpleUploadedFile(
+            'image.gif', b'%PDF-1.4 not an image', content_type='image/gif')
+        response = self.client.post(
+            url, {'signal_id': self.signal.signal_id, 'image': image})
+
+        self.assertEqual(response.status_code, 400)
+        self.signal.refresh_from_db()
+        self.assertFalse(self.signal.image)
+
 
 class TestAuthSignalEndpoint(APITestCase):
 
@@ -358,6 +401,89 @@ class TestAuthSignalEndpoint(APITestCase):
         data = response.json()
         self.assertEqual(data['results'][0]['signal_id'], str(self.centrum.signal_id))
 
+    def test_notes_count(self):
+        factories.NoteFactory.create_batch(3, _signal=self.first)
+
+        response = self.client.get('/signals/auth/signal/?ordering=created_at')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data['results'][0]['notes_count'], 3)
+        self.assertEqual(data['results'][1]['notes_count'], 0)
+
+    def test_list_num_queries(self):
+        # The number of queries for a page should not depend on the number of signals on that page.
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/signals/auth/signal/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 4)
+        num_queries = len(context.captured_queries)
+
+        factories.SignalFactory.create_batch(6)
+        for signal in Signal.objects.all():
+            factories.NoteFactory.create_batch(2, _signal=signal)
+
+        with self.assertNumQueries(num_queries):
+            response = self.client.get('/signals/auth/signal/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def _walk_cursor_pages(self, url, link='next'):
+        signal_ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+            data = response.json()
+            self.assertEqual(len(data['results']), 1)
+            signal_ids.append(data['results'][0]['signal_id'])
+            url = data['_links'][link]['href']
+        return signal_ids
+
+    def test_cursor_pagination(self):
+        signal_ids = self._walk_cursor_pages('/signals/auth/signal/?cursor=&page_size=1')
+
+        self.assertEqual(signal_ids, [str(self.last.signal_id),
+                                      str(self.centrum.signal_id),
+                                      str(self.high_priority.signal_id),
+                                      str(self.first.signal_id)])
+
+    def test_cursor_pagination_previous(self):
+        url = '/signals/auth/signal/?cursor=&page_size=1&ordering=created_at'
+        for _ in range(3):
+            url = self.client.get(url).json()['_links']['next']['href']
+
+        signal_ids = self._walk_cursor_pages(url, link='previous')
+
+        self.assertEqual(signal_ids, [str(self.last.signal_id),
+                                      str(self.centrum.signal_id),
+                                      str(self.high_priority.signal_id),
+                                      str(self.first.signal_id)])
+
+    def test_cursor_pagination_non_unique_ordering(self):
+        signal_ids = self._walk_cursor_pages(
+            '/signals/auth/signal/?cursor=&page_size=1&ordering=-stadsdeel')
+
+        self.assertEqual(len(signal_ids), 4)
+        self.assertEqual(set(signal_ids), set(str(signal.signal_id) for signal in
+                                              [self.first, self.high_priority, self.centrum,
+                                               self.last]))
+        self.assertEqual(signal_ids[-1], str(self.centrum.signal_id))
+
+    def test_cursor_pagination_count(self):
+        response = self.client.get('/signals/auth/signal/?cursor=')
+        self.assertIsNone(response.json()['count'])
+
+        response = self.client.get('/signals/auth/signal/?cursor=&count=exact')
+        self.assertEqual(response.json()['count'], 4)
+
+        response = self.client.get('/signals/auth/signal/?cursor=&count=approximate')
+        self.assertIsInstance(response.json()['count'], int)
+
+    def test_cursor_pagination_invalid_cursor(self):
+        response = self.client.get('/signals/auth/signal/?cursor=invalid')
+        self.assertEqual(response.status_code, 404)
+
 
 class TestAuthAPIEndpointsPOST(TestAPIEnpointsBase):
 
@@ -375,6 +501,45 @@ class TestAuthAPIEndpointsPOST(TestAPIEnpointsBase):
 
         self.assertEqual(response.status_code, 405)
 
+    def test_signal_bulk_post(self):
+        endpoint = '/signals/auth/signal/bulk/'
+        signal_count = Signal.objects.count()
+        postjson = self._get_fixture('post_signal')
+        postjson.pop('image', None)
+
+        response = self.client.post(endpoint, [postjson, postjson, postjson], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(Signal.objects.count(), signal_count + 3)
+        for result in response.json():
+            signal = Signal.objects.get(id=result['id'])
+            self.assertEqual(signal.status.state, workflow.GEMELD)
+            self.assertEqual(signal.location._signal_id, signal.id)
+
+    def test_signal_bulk_post_max_size(self):
+        endpoint = '/signals/auth/signal/bulk/'
+        postjson = self._get_fixture('post_signal')
+        postjson.pop('image', None)
+
+        with override_settings(SIGNAL_BULK_CREATE_MAX_SIZE=1):
+            # Refused before the signals are validated one by one.
+            with mock.patch('signals.apps.signals.serializers.SignalCreateSerializer.'
+                            'to_internal_value') as mocked_to_internal_value:
+                response = self.client.post(endpoint, [postjson, postjson], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.json())
+        mocked_to_internal_value.assert_not_called()
+
+    def test_signal_bulk_post_forbidden(self):
+        user = UserFactory.create()  # Normal user without any extra permissions.
+        self.client.force_authenticate(user=user)
+
+        response = self.client.post('/signals/auth/signal/bulk/', [], format='json')
+
+        self.assertEqual(response.status_code, 403)
+
     def test_endpoints_forbidden(self):
         user = UserFactory.create()  # Normal user without any extra permissions.
         self.client.force_authenticate(user=user)
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from rest_framework.test import APITestCase
 
 from signals import API_VERSIONS
@@ -24,6 +25,9 @@ class TestAPIRoot(APITestCase):
 class TestCategoryTermsEndpoints(APITestCase):
     fixtures = ['categories.json', ]
 
+    def setUp(self):
+        cache.clear()
+
     def test_category_list(self):
         # Asserting that we've 9 `MainCategory` objects loaded from the json fixture.
         self.assertEqual(MainCategory.objects.count(), 9)
@@ -35,6 +39,51 @@ class TestCategoryTermsEndpoints(APITestCase):
         data = response.json()
         self.assertEqual(len(data['results']), 9)
 
+    def test_category_list_num_queries(self):
+        # Main categories, sub categories and departments are fetched in one query each, the
+        # taxonomy version is checked once.
+        with self.assertNumQueries(5):
+            response = self.client.get('/signals/v1/public/terms/categories/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_category_list_cached(self):
+        url = '/signals/v1/public/terms/categories/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        # Only the taxonomy version is checked.
+        with self.assertNumQueries(1):
+            cached_response = self.client.get(url)
+        self.assertEqual(cached_response.status_code, 200)
+        self.assertEqual(cached_response.json(), response.json())
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_category_list_etag_shared(self):
+        url = '/signals/v1/public/terms/categories/'
+        response = self.client.get(url)
+
+        # Another process (with its own cache) gives the same ETag for the same taxonomy.
+        cache.clear()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_category_list_cache_invalidated(self):
+        url = '/signals/v1/public/terms/categories/'
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        MainCategoryFactory.create(name='Nieuwe hoofdcategorie')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['results']), 10)
+
     def test_category_detail(self):
         # Asserting that we've 13 sub categories for our main category "Afval".
         main_category = MainCategoryFactory.create(name='Afval')
@@ -9,10 +9,10 @@ from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.test import APITestCase
 from rest_framework.viewsets import GenericViewSet
 
-from signals.apps.signals.filters import FieldMappingOrderingFilter
+from signals.apps.signals.filters import FieldMappingOrderingFilter, SignalFilter
 from signals.apps.signals.models import Priority, Signal
 from signals.apps.signals.serializers import SignalAuthHALSerializer
-from tests.apps.signals.factories import SignalFactory
+from tests.apps.signals.factories import SignalFactory, SubCategoryFactory
 from tests.apps.users.factories import SuperUserFactory
 
 IN_AMSTERDAM = (4.898466, 52.361585)
@@ -207,6 +207,41 @@ class TestPriorityFilter(APITestCase):
         self.assertEqual(json_response['results'][0]['id'], 5)
 
 
+class TestCategoryFilter(APITestCase):
+
+    def setUp(self):
+        # Forcing authentication
+        superuser = SuperUserFactory.create()
+        self.client.force_authenticate(user=superuser)
+
+        self.sub_category = SubCategoryFactory.create()
+        self.signal = SignalFactory.create(category_assignment__sub_category=self.sub_category)
+        SignalFactory.create()
+
+    def test_category_main_filter(self):
+        querystring = {'category__main': self.sub_category.main_category.name}
+        response = self.client.get(f'{SIGNAL_ENDPOINT}?{urlencode(querystring)}')
+        json_response = response.json()
+
+        self.assertEqual(json_response['count'], 1)
+        self.assertEqual(json_response['results'][0]['id'], self.signal.id)
+
+    def test_category_main_filter_unknown(self):
+        # The main category can be renamed between validating the choices and filtering.
+        queryset = SignalFilter().category_main_filter(
+            Signal.objects.all(), 'category__main', ['Does not exist'])
+
+        self.assertEqual(queryset.count(), 0)
+
+    def test_category_sub_filter(self):
+        querystring = {'category__sub': self.sub_category.name}
+        response = self.client.get(f'{SIGNAL_ENDPOINT}?{urlencode(querystring)}')
+        json_response = response.json()
+
+        self.assertEqual(json_response['count'], 1)
+        self.assertEqual(json_response['results'][0]['id'], self.signal.id)
+
+
 class TestFieldMappingOrderingFilter(TestCase):
 
     def setUp(self):
@@ -1,10 +1,13 @@
+import threading
 from unittest import mock
 
 from django.conf import settings
 from django.contrib.gis.geos import Point
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from signals.apps.signals import workflow
@@ -16,6 +19,7 @@ from signals.apps.signals.models import (
     Priority,
     Reporter,
     Signal,
+    SignalCurrentState,
     Status,
     get_address_text
 )
@@ -80,6 +84,107 @@ class TestSignalManager(TransactionTestCase):
         patched_create_initial.send.assert_called_once_with(sender=Signal.actions.__class__,
                                                             signal_obj=signal)
 
+    @mock.patch('signals.apps.signals.managers.create_initial', autospec=True)
+    def test_create_initial_bulk(self, patched_create_initial):
+        signals_data = [{
+            'signal_data': self.signal_data,
+            'location_data': self.location_data,
+            'status_data': self.status_data,
+            'category_assignment_data': self.category_assignment_data,
+            'reporter_data': self.reporter_data,
+            'priority_data': self.priority_data if i % 2 else None,
+        } for i in range(3)]
+
+        signals = Signal.actions.create_initial_bulk(signals_data)
+
+        self.assertEqual(len(signals), 3)
+        self.assertEqual(Signal.objects.count(), 3)
+        self.assertEqual(SignalCurrentState.objects.count(), 3)
+        for model in (Location, Status, CategoryAssignment, Reporter, Priority):
+            self.assertEqual(model.objects.count(), 3)
+
+        for signal in Signal.objects.all():
+            self.assertEqual(signal.location._signal_id, signal.id)
+            self.assertEqual(signal.status._signal_id, signal.id)
+            self.assertEqual(signal.category_assignment._signal_id, signal.id)
+            self.assertEqual(signal.reporter._signal_id, signal.id)
+            self.assertEqual(signal.priority._signal_id, signal.id)
+        self.assertEqual(signals[1].priority.priority, Priority.PRIORITY_HIGH)
+
+        self.assertEqual(patched_create_initial.send.call_count, 3)
+        patched_create_initial.send.assert_any_call(sender=Signal.actions.__class__,
+                                                    signal_obj=signals[0])
+
+    @mock.patch('signals.apps.signals.managers.create_initial', autospec=True)
+    def test_create_initial_bulk_address_text(self, patched_create_initial):
+        location_data = dict(self.location_data, address=valid_locations.STADHUIS)
+        signals_data = [{
+            'signal_data': self.signal_data,
+            'location_data': location_data,
+            'status_data': self.status_data,
+            'category_assignment_data': self.category_assignment_data,
+            'reporter_data': self.reporter_data,
+        }]
+
+        signal, = Signal.actions.create_initial_bulk(signals_data)
+
+        # Same address text as `create_initial` (`Location.save()`) sets.
+        self.assertEqual(Location.objects.get(_signal=signal).address_text,
+                         'Amstel 1 1011PN Amsterdam')
+        self.assertEqual(SignalCurrentState.objects.get(_signal=signal).address_text,
+                         'Amstel 1 1011PN Amsterdam')
+
+    @mock.patch('signals.apps.signals.managers.create_initial', autospec=True)
+    def test_create_initial_bulk_num_queries(self, patched_create_initial):
+        signals_data = [{
+            'signal_data': self.signal_data,
+            'location_data': self.location_data,
+            'status_data': self.status_data,
+            'category_assignment_data': self.category_assignment_data,
+            'reporter_data': self.reporter_data,
+        } for _ in range(10)]
+
+        # Allocating the ids and inserting the 5 related tables, the signals and the current state.
+        with self.assertNumQueries(8):
+            Signal.actions.create_initial_bulk(signals_data)
+
+    @mock.patch('signals.apps.signals.managers.create_initial', autospec=True)
+    def test_create_initial_writes_signal_once(self, patched_create_initial):
+        with CaptureQueriesContext(connection) as context:
+            signal = Signal.actions.create_initial(
+                self.signal_data,
+                self.location_data,
+                self.status_data,
+                self.category_assignment_data,
+                self.reporter_data)
+
+        signal_queries = [query['sql'] for query in context.captured_queries
+                          if query['sql'].startswith(('INSERT INTO "signals_signal"',
+                                                      'UPDATE "signals_signal"'))]
+        self.assertEqual(len(signal_queries), 1)
+        self.assertTrue(signal_queries[0].startswith('INSERT'))
+
+        signal.refresh_from_db()
+        self.assertEqual(signal.location._signal_id, signal.id)
+        self.assertEqual(signal.status._signal_id, signal.id)
+        self.assertEqual(signal.category_assignment._signal_id, signal.id)
+        self.assertEqual(signal.reporter._signal_id, signal.id)
+        self.assertEqual(signal.priority._signal_id, signal.id)
+
+    @mock.patch('signals.apps.signals.managers.update_location', autospec=True)
+    def test_update_location_update_fields(self, patched_update_location):
+        signal = factories.SignalFactory.create()
+
+        with CaptureQueriesContext(connection) as context:
+            Signal.actions.update_location(self.location_data, signal)
+
+        signal_updates = [query['sql'] for query in context.captured_queries
+                          if query['sql'].startswith('UPDATE "signals_signal"')]
+        self.assertEqual(len(signal_updates), 1)
+        self.assertIn('"location_id"', signal_updates[0])
+        self.assertIn('"updated_at"', signal_updates[0])
+        self.assertNotIn('"text"', signal_updates[0])
+
     def test_create_initial_with_priority_data(self):
         signal = Signal.actions.create_initial(
             self.signal_data,
@@ -91,6 +196,43 @@ class TestSignalManager(TransactionTestCase):
 
         self.assertEqual(signal.priority.priority, Priority.PRIORITY_HIGH)
 
+    def test_create_initial_current_state(self):
+        signal = Signal.actions.create_initial(
+            self.signal_data,
+            self.location_data,
+            self.status_data,
+            self.category_assignment_data,
+            self.reporter_data,
+            self.priority_data)
+
+        current_state = SignalCurrentState.objects.get(_signal=signal)
+        sub_category = self.category_assignment_data['sub_category']
+        self.assertEqual(current_state.state, workflow.GEMELD)
+        self.assertEqual(current_state.stadsdeel, STADSDEEL_CENTRUM)
+        self.assertEqual(current_state.buurt_code, 'aaa1')
+        self.assertEqual(current_state.sub_category, sub_category)
+        self.assertEqual(current_state.sub_slug, sub_category.slug)
+        self.assertEqual(current_state.main_slug, sub_category.main_category.slug)
+        self.assertEqual(current_state.priority, Priority.PRIORITY_HIGH)
+        self.assertEqual(current_state.created_at, signal.created_at)
+
+    def test_update_status_current_state(self):
+        signal = factories.SignalFactory.create()
+
+        Signal.actions.update_status({'state': workflow.BEHANDELING, 'text': 'test'}, signal)
+
+        signal.current_state.refresh_from_db()
+        self.assertEqual(signal.current_state.state, workflow.BEHANDELING)
+
+    def test_update_location_current_state(self):
+        signal = factories.SignalFactory.create()
+
+        Signal.actions.update_location(self.location_data, signal)
+
+        signal.current_state.refresh_from_db()
+        self.assertEqual(signal.current_state.stadsdeel, STADSDEEL_CENTRUM)
+        self.assertEqual(signal.current_state.buurt_code, 'aaa1')
+
     @mock.patch('signals.apps.signals.managers.update_location', autospec=True)
     def test_update_location(self, patched_update_location):
         signal = factories.SignalFactory.create()
@@ -211,6 +353,66 @@ class TestSignalManager(TransactionTestCase):
             note=note)
 
 
+class TestSignalManagerConcurrency(TransactionTestCase):
+    num_threads = 4
+    num_updates = 10
+
+    def setUp(self):
+        self.signal = factories.SignalFactory.create()
+        self.sub_categories = factories.SubCategoryFactory.create_batch(self.num_updates)
+        self.states = [state for state, _ in workflow.STATUS_CHOICES]
+        self.errors = []
+
+    def _update_status(self, thread_index):
+        for i in range(self.num_updates):
+            Signal.actions.update_status(
+                {'state': self.states[(thread_index + i) % len(self.states)], 'text': str(i)},
+                Signal.objects.get(pk=self.signal.pk))
+
+    def _update_category_assignment(self, thread_index):
+        for i in range(self.num_updates):
+            Signal.actions.update_category_assignment(
+                {'sub_category': self.sub_categories[(thread_index + i) % self.num_updates]},
+                Signal.objects.get(pk=self.signal.pk))
+
+    def _run_in_thread(self, func, thread_index):
+        try:
+            func(thread_index)
+        except Exception as e:
+            self.errors.append(e)
+        finally:
+            connection.close()
+
+    @mock.patch('signals.apps.signals.managers.update_status', autospec=True)
+    @mock.patch('signals.apps.signals.managers.update_category_assignment', autospec=True)
+    @mock.patch.object(Status, 'clean')
+    def test_concurrent_status_and_category_updates(self, *mocks):
+        threads = [threading.Thread(target=self._run_in_thread, args=(func, i))
+                   for i in range(self.num_threads)
+                   for func in (self._update_status, self._update_category_assignment)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.errors, [])
+
+        signal = Signal.objects.get(pk=self.signal.pk)
+        expected_updates = self.num_threads * self.num_updates
+        self.assertEqual(signal.statuses.count(), expected_updates + 1)
+        self.assertEqual(signal.category_assignments.count(), expected_updates + 1)
+
+        # No pointer updates are lost, the pointers refer to the latest created objects.
+        self.assertEqual(signal.status, signal.statuses.order_by('-id').first())
+        self.assertEqual(signal.category_assignment,
+                         signal.category_assignments.order_by('-id').first())
+
+        # The denormalized current state matches the pointers.
+        current_state = SignalCurrentState.objects.get(_signal=signal)
+        self.assertEqual(current_state.state, signal.status.state)
+        self.assertEqual(current_state.sub_category, signal.category_assignment.sub_category)
+
+
 class TestSignalModel(TestCase):
 
     def test_sia_id(self):
@@ -225,11 +427,22 @@ class TestSignalModel(TestCase):
 
         self.assertEqual(image_url, None)
 
+    def test_get_fqdn_image_crop_url_not_generated(self):
+        Site.objects.update_or_create(
+            id=settings.SITE_ID,
+            defaults={'domain': settings.SITE_DOMAIN, 'name': settings.SITE_NAME})
+        signal = factories.SignalFactoryWithImage.create()
+
+        image_url = signal.get_fqdn_image_crop_url()
+
+        self.assertEqual('http://localhost:8000{}'.format(signal.image.url), image_url)
+
     def test_get_fqdn_image_crop_url_with_local_image(self):
         Site.objects.update_or_create(
             id=settings.SITE_ID,
             defaults={'domain': settings.SITE_DOMAIN, 'name': settings.SITE_NAME})
         signal = factories.SignalFactoryWithImage.create()
+        signal.image_crop.generate()
 
         image_url = signal.get_fqdn_image_crop_url()
 
@@ -240,6 +453,7 @@ class TestSignalModel(TestCase):
     def test_get_fqdn_image_crop_url_with_swift_image(self, mocked_isinstance, mocked_url):
         mocked_url.return_value = 'https://objectstore.com/url/coming/from/swift/image.jpg'
         signal = factories.SignalFactoryWithImage.create()
+        signal.image_crop.generate()
 
         image_url = signal.get_fqdn_image_crop_url()
 
@@ -326,6 +540,37 @@ class TestCategoryDeclarations(TestCase):
         self.assertEqual(str(department), 'ABC (Department A)')
 
 
+class TestSignalCurrentStateCategorySlugs(TestCase):
+
+    def setUp(self):
+        self.signal = factories.SignalFactory.create()
+        self.sub_category = self.signal.category_assignment.sub_category
+
+    def test_rename_main_category(self):
+        main_category = self.sub_category.main_category
+        main_category.name = 'Renamed main category'
+        main_category.save()
+
+        current_state = SignalCurrentState.objects.get(_signal=self.signal)
+        self.assertEqual(current_state.main_slug, 'renamed-main-category')
+
+    def test_rename_sub_category(self):
+        self.sub_category.name = 'Renamed sub category'
+        self.sub_category.save()
+
+        current_state = SignalCurrentState.objects.get(_signal=self.signal)
+        self.assertEqual(current_state.sub_slug, 'renamed-sub-category')
+        self.assertEqual(current_state.main_slug, self.sub_category.main_category.slug)
+
+    def test_move_sub_category(self):
+        other_main_category = factories.MainCategoryFactory.create()
+        self.sub_category.main_category = other_main_category
+        self.sub_category.save()
+
+        current_state = SignalCurrentState.objects.get(_signal=self.signal)
+        self.assertEqual(current_state.main_slug, other_main_category.slug)
+
+
 class GetAddressTextTest(TestCase):
     def setUp(self):
         self.signal = factories.SignalFactoryValidLocation.create()
@@ -1,12 +1,29 @@
-from django.test import Client, TestCase
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from tests.apps.signals.factories import SignalFactoryValidLocation
+from signals.apps.signals import tasks, workflow
+from signals.apps.signals.managers import update_status
+from signals.apps.signals.models import Signal
+from signals.apps.signals.pdf.cache import (
+    delete_expired_pdfs,
+    get_or_render_pdf,
+    get_pdf_cache_name
+)
+from tests.apps.signals.factories import NoteFactory, SignalFactoryValidLocation, StatusFactory
 from tests.apps.users.factories import UserFactory
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class TestPDFView(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = UserFactory.create()  # Normal user without any extra permissions.
         self.user.set_password('test1234')
         self.user.save()
@@ -45,3 +62,168 @@ class TestPDFView(TestCase):
         )
 
         self.assertEqual(response.status_code, 302)
+
+    @mock.patch('signals.apps.signals.pdf.mixins.weasyprint')
+    def test_get_pdf_cached(self, mocked_weasyprint):
+        mocked_weasyprint.HTML.return_value.write_pdf.return_value = b'%PDF-1'
+        url = reverse('v1:signal-pdf-download', kwargs={'signal_id': self.signal.id})
+
+        for _ in range(2):
+            response = self.client.get(path=url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, b'%PDF-1')
+        self.assertEqual(mocked_weasyprint.HTML.call_count, 1)
+
+        # Changing the signal (or adding a note) renders a new PDF.
+        Signal.actions.update_status({'state': workflow.AFWACHTING, 'text': 'x'}, self.signal)
+        self.client.get(path=url)
+        self.assertEqual(mocked_weasyprint.HTML.call_count, 2)
+
+        NoteFactory.create(_signal=self.signal)
+        self.client.get(path=url)
+        self.assertEqual(mocked_weasyprint.HTML.call_count, 3)
+
+    @mock.patch('signals.apps.signals.pdf.mixins.weasyprint')
+    def test_render_print_pdf_task(self, mocked_weasyprint):
+        mocked_weasyprint.HTML.return_value.write_pdf.return_value = b'%PDF-1'
+
+        tasks.render_print_pdf(pk=self.signal.pk, printed_by=self.user.username)
+        self.assertEqual(mocked_weasyprint.HTML.call_count, 1)
+
+        # Pre-rendered for the user, not rendered again when printed.
+        response = self.client.get(path=reverse(
+            'v1:signal-pdf-download', kwargs={'signal_id': self.signal.id}))
+        self.assertEqual(response.content, b'%PDF-1')
+        self.assertEqual(mocked_weasyprint.HTML.call_count, 1)
+
+    @mock.patch('signals.apps.signals.views.time')
+    @mock.patch('signals.apps.signals.views.tasks.render_print_pdf.delay')
+    def test_get_pdf_pending(self, mocked_delay, mocked_time):
+        mocked_delay.return_value.id = 'abc'
+        mocked_time.time.return_value = 1000
+        url = reverse('v1:signal-pdf-download', kwargs={'signal_id': self.signal.id})
+
+        response = self.client.get(path=url)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Location'],
+                         'http://testserver{}?task=abc&scheduled=1000'.format(url))
+        self.assertEqual(response['Retry-After'], '2')
+        mocked_delay.assert_called_once_with(
+            pk=self.signal.pk,
+            printed_by=self.user.username,
+            printed_at=timezone.localdate().isoformat())
+
+    @mock.patch('signals.apps.signals.views.time')
+    @mock.patch('signals.apps.signals.views.tasks.render_print_pdf.AsyncResult')
+    @mock.patch('signals.apps.signals.views.tasks.render_print_pdf.delay')
+    def test_get_pdf_poll(self, mocked_delay, mocked_async_result, mocked_time):
+        mocked_delay.return_value.id = 'def'
+        mocked_time.time.return_value = 1010
+        url = reverse('v1:signal-pdf-download', kwargs={'signal_id': self.signal.id})
+
+        # Still rendering, not scheduled again.
+        mocked_async_result.return_value.failed.return_value = False
+        mocked_async_result.return_value.ready.return_value = False
+        response = self.client.get(path=url, data={'task': 'abc', 'scheduled': 1000})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Location'],
+                         'http://testserver{}?task=abc&scheduled=1000'.format(url))
+        mocked_async_result.assert_called_once_with('abc')
+        mocked_delay.assert_not_called()
+
+        # Rendered, but not the current version of the PDF (e.g. the signal changed meanwhile).
+        mocked_async_result.return_value.ready.return_value = True
+        response = self.client.get(path=url, data={'task': 'abc', 'scheduled': 1000})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Location'],
+                         'http://testserver{}?task=def&scheduled=1010'.format(url))
+        mocked_delay.assert_called_once()
+
+    @override_settings(PDF_RENDER_TIMEOUT=60)
+    @mock.patch('signals.apps.signals.views.tasks.render_print_pdf.delay')
+    def test_get_pdf_poll_unknown_task(self, mocked_delay):
+        mocked_delay.return_value.id = 'def'
+        url = reverse('v1:signal-pdf-download', kwargs={'signal_id': self.signal.id})
+        now = int(time.time())
+
+        # Unknown tasks are pending (as far as Celery knows), until the render timeout.
+        response = self.client.get(path=url, data={'task': 'unknown', 'scheduled': now - 10})
+        self.assertEqual(response.status_code, 202)
+        mocked_delay.assert_not_called()
+
+        response = self.client.get(path=url, data={'task': 'unknown', 'scheduled': now - 61})
+        self.assertEqual(response.status_code, 503)
+        mocked_delay.assert_not_called()
+
+        # Without (a valid) schedule time a new render is scheduled.
+        for data in ({'task': 'unknown'}, {'task': 'unknown', 'scheduled': 'x'},
+                     {'task': 'unknown', 'scheduled': now + 3600}):
+            response = self.client.get(path=url, data=data)
+            self.assertEqual(response.status_code, 202)
+            self.assertIn('task=def', response['Location'])
+        self.assertEqual(mocked_delay.call_count, 3)
+
+    @mock.patch('signals.apps.signals.views.tasks.render_print_pdf.AsyncResult')
+    @mock.patch('signals.apps.signals.views.tasks.render_print_pdf.delay')
+    def test_get_pdf_failed(self, mocked_delay, mocked_async_result):
+        mocked_async_result.return_value.failed.return_value = True
+
+        response = self.client.get(
+            path=reverse('v1:signal-pdf-download', kwargs={'signal_id': self.signal.id}),
+            data={'task': 'abc', 'scheduled': int(time.time())})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '10')
+        mocked_delay.assert_not_called()
+
+    @mock.patch('signals.apps.signals.signal_receivers.tasks.render_print_pdf', autospec=True)
+    def test_update_status_render_print_pdf(self, mocked_render_print_pdf):
+        status = StatusFactory.create(_signal=self.signal, user=self.user.username)
+
+        update_status.send(sender=self.__class__, signal_obj=self.signal, status=status,
+                           prev_status=self.signal.status)
+
+        mocked_render_print_pdf.apply_async.assert_called_once_with(
+            kwargs={'pk': self.signal.pk, 'printed_by': self.user.username}, ignore_result=True)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestPDFCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_or_render_pdf(self):
+        render = mock.Mock(return_value=b'%PDF-1')
+
+        self.assertEqual(get_or_render_pdf(('test', 1), render), b'%PDF-1')
+        self.assertEqual(get_or_render_pdf(('test', 1), render), b'%PDF-1')
+        render.assert_called_once_with()
+
+        get_or_render_pdf(('test', 2), render)
+        self.assertEqual(render.call_count, 2)
+
+    @override_settings(PDF_RENDER_TIMEOUT=0)
+    def test_get_or_render_pdf_locked(self):
+        render = mock.Mock(return_value=b'%PDF-1')
+
+        # Rendering by another process that doesn't finish in time, rendered anyway.
+        with mock.patch('signals.apps.signals.pdf.cache.try_advisory_lock') as mocked_lock:
+            mocked_lock.return_value.__enter__.return_value = False
+            self.assertEqual(get_or_render_pdf(('test', 1), render), b'%PDF-1')
+        render.assert_called_once_with()
+
+    def test_delete_expired_pdfs(self):
+        render = mock.Mock(return_value=b'%PDF-1')
+        get_or_render_pdf(('test', 1), render)
+        get_or_render_pdf(('test', 2), render)
+
+        self.assertEqual(delete_expired_pdfs(max_age=3600), 0)
+        self.assertEqual(delete_expired_pdfs(max_age=-1), 2)
+        self.assertFalse(default_storage.exists(get_pdf_cache_name('test', 1)))
+
+        get_or_render_pdf(('test', 1), render)
+        self.assertEqual(render.call_count, 3)
+
+    def test_delete_expired_pdfs_empty(self):
+        self.assertEqual(delete_expired_pdfs(), 0)
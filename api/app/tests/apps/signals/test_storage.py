@@ -0,0 +1,69 @@
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from signals.apps.signals.storage import CachedTempUrlSwiftStorage
+
+
+class TestCachedTempUrlSwiftStorage(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.storage = CachedTempUrlSwiftStorage(
+            api_auth_url='https://auth.example.com/',
+            api_username='username',
+            api_key='password',
+            auth_version='1',
+            container_name='container',
+            lazy_connect=True,
+            auto_base_url=False,
+            override_base_url='https://swift.example.com/v1/AUTH_test/container/',
+            use_temp_urls=True,
+            temp_url_key='secret',
+            temp_url_duration=1800)
+
+    def get_expires(self, url):
+        return int(parse_qs(urlsplit(url).query)['temp_url_expires'][0])
+
+    @mock.patch('signals.apps.signals.storage.time.time', return_value=1000000)
+    def test_url(self, mocked_time):
+        url = self.storage.url('images/image.jpg')
+
+        self.assertTrue(url.startswith(
+            'https://swift.example.com/v1/AUTH_test/container/images/image.jpg?'))
+        # Signed for the window starting at 999900 (windows of 900 seconds).
+        self.assertEqual(self.get_expires(url), 999900 + 1800)
+
+    @mock.patch('signals.apps.signals.storage.generate_temp_url', return_value='/signed')
+    @mock.patch('signals.apps.signals.storage.time.time', return_value=1000000)
+    def test_url_cached_within_window(self, mocked_time, mocked_generate_temp_url):
+        self.storage.url('images/image.jpg')
+        mocked_time.return_value = 1000799
+        self.storage.url('images/image.jpg')
+        self.assertEqual(mocked_generate_temp_url.call_count, 1)
+
+        # Next window, signed again.
+        mocked_time.return_value = 1000800
+        self.storage.url('images/image.jpg')
+        self.assertEqual(mocked_generate_temp_url.call_count, 2)
+
+        # Other object, signed separately.
+        self.storage.url('images/other.jpg')
+        self.assertEqual(mocked_generate_temp_url.call_count, 3)
+
+    @mock.patch('signals.apps.signals.storage.time.time')
+    def test_url_remaining_validity(self, mocked_time):
+        # Even at the end of a window the url is valid for at least half the duration.
+        mocked_time.return_value = 1000000
+        url = self.storage.url('images/image.jpg')
+        mocked_time.return_value = 1000799
+        self.assertEqual(self.storage.url('images/image.jpg'), url)
+        self.assertGreaterEqual(self.get_expires(url) - 1000799, 900)
+
+    def test_url_without_temp_urls(self):
+        self.storage.use_temp_urls = False
+
+        self.assertEqual(self.storage.url('images/image.jpg'),
+                         'https://swift.example.com/v1/AUTH_test/container/images/image.jpg')
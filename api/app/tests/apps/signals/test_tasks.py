@@ -1,8 +1,11 @@
 from unittest import mock
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from signals.apps.signals import tasks
+from signals.apps.signals.images import IMAGE_VARIANTS, generate_image_variants, get_image_variant
+from tests.apps.signals.factories import SignalFactory, SignalFactoryWithImage
 
 
 class TestTaskSaveCSVFilesDatawarehouse(TestCase):
@@ -12,4 +15,67 @@ class TestTaskSaveCSVFilesDatawarehouse(TestCase):
             self, mocked_save_csv_files_datawarehouse):
         tasks.task_save_csv_files_datawarehouse()
 
-        mocked_save_csv_files_datawarehouse.assert_called_once()
+        mocked_save_csv_files_datawarehouse.assert_called_once_with(incremental=False)
+
+    @mock.patch('signals.apps.signals.tasks.save_csv_files_datawarehouse')
+    def test_task_save_csv_files_datawarehouse_incremental(
+            self, mocked_save_csv_files_datawarehouse):
+        tasks.task_save_csv_files_datawarehouse(incremental=True)
+
+        mocked_save_csv_files_datawarehouse.assert_called_once_with(incremental=True)
+
+
+class TestTaskGenerateImageVariants(TestCase):
+
+    def test_generate_image_variants(self):
+        signal = SignalFactoryWithImage.create()
+
+        tasks.generate_image_variants(pk=signal.pk)
+
+        for name in IMAGE_VARIANTS:
+            image_variant = getattr(signal, name)
+            self.assertTrue(image_variant.storage.exists(image_variant.name), name)
+
+    def test_generate_image_variants_without_image(self):
+        signal = SignalFactory.create()
+
+        self.assertEqual(generate_image_variants(signal), [])
+
+    @mock.patch('signals.apps.signals.images.transaction.on_commit')
+    @mock.patch('signals.apps.signals.tasks.generate_image_variants.delay')
+    def test_image_saved_schedules_task(self, mocked_delay, mocked_on_commit):
+        signal = SignalFactory.create()
+        signal.image = SignalFactoryWithImage.build().image
+        signal.save()
+
+        # Scheduled once for all image variants, after the transaction is committed.
+        mocked_on_commit.assert_called_once()
+        mocked_delay.assert_not_called()
+
+        mocked_on_commit.call_args[0][0]()
+        mocked_delay.assert_called_once_with(pk=signal.pk)
+
+        # A later change of the photo of the same instance is scheduled again.
+        signal.image = SignalFactoryWithImage.build().image
+        signal.save()
+
+        self.assertEqual(mocked_on_commit.call_count, 2)
+        mocked_on_commit.call_args[0][0]()
+        self.assertEqual(mocked_delay.call_count, 2)
+
+    def test_get_image_variant(self):
+        cache.clear()
+        signal = SignalFactoryWithImage.create()
+
+        # The original photo is used until the variant is generated.
+        self.assertEqual(get_image_variant(signal, 'image_crop'), signal.image)
+        self.assertEqual(signal.get_image_crop(), signal.image)
+
+        signal.image_crop.generate()
+
+        self.assertEqual(get_image_variant(signal, 'image_crop').name, signal.image_crop.name)
+
+    def test_get_image_variant_without_image(self):
+        signal = SignalFactory.create()
+
+        self.assertFalse(get_image_variant(signal, 'image_crop'))
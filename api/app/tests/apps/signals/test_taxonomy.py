@@ -0,0 +1,137 @@
+from unittest import mock
+
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from signals.apps.signals import taxonomy as taxonomy_module
+from signals.apps.signals.models import TaxonomyVersion
+from signals.apps.signals.taxonomy import INITIAL_VERSION, get_taxonomy, get_taxonomy_version
+from tests.apps.signals.factories import DepartmentFactory, SubCategoryFactory
+
+
+class TestTaxonomy(TestCase):
+
+    def setUp(self):
+        self.sub_category = SubCategoryFactory.create(name='Grofvuil', main_category__name='Afval')
+
+    def tearDown(self):
+        taxonomy_module._checked_version = None
+
+    def test_lookups(self):
+        taxonomy = get_taxonomy()
+        main_category = self.sub_category.main_category
+
+        self.assertEqual(taxonomy.get_main_category(main_category.id), main_category)
+        self.assertEqual(taxonomy.get_main_category_by_slug('afval'), main_category)
+        self.assertEqual(taxonomy.get_main_category_by_name('Afval'), main_category)
+        self.assertEqual(taxonomy.get_sub_category(self.sub_category.id), self.sub_category)
+        self.assertEqual(taxonomy.get_sub_category_by_slugs('afval', 'grofvuil'),
+                         self.sub_category)
+        self.assertIn(self.sub_category, taxonomy.get_sub_categories_by_name('Grofvuil'))
+        self.assertIn(self.sub_category, taxonomy.get_sub_categories_by_main_slug('afval'))
+        self.assertIsNone(taxonomy.get_sub_category_by_slugs('afval', 'does-not-exist'))
+
+    def test_cached(self):
+        taxonomy = get_taxonomy()
+
+        # Only the version is checked.
+        with self.assertNumQueries(1):
+            self.assertIs(get_taxonomy(), taxonomy)
+
+        with self.assertNumQueries(0):
+            sub_category = taxonomy.get_sub_category(self.sub_category.id)
+            sub_category.main_category.slug
+            list(sub_category.departments.all())
+
+    def test_invalidated_on_save(self):
+        taxonomy = get_taxonomy()
+        version, _ = get_taxonomy_version()
+
+        self.sub_category.name = 'Grof vuil'
+        self.sub_category.save()
+
+        self.assertEqual(get_taxonomy_version()[0], version + 1)
+        self.assertIsNot(get_taxonomy(), taxonomy)
+        self.assertEqual(get_taxonomy().get_sub_category(self.sub_category.id).name, 'Grof vuil')
+
+    def test_invalidated_on_departments_changed(self):
+        get_taxonomy()
+        department = DepartmentFactory.create(code='ABC')
+        get_taxonomy()
+
+        self.sub_category.departments.add(department)
+
+        sub_category = get_taxonomy().get_sub_category(self.sub_category.id)
+        self.assertEqual([d.code for d in sub_category.departments.all()], ['ABC'])
+
+    def test_invalidated_by_other_process(self):
+        taxonomy = get_taxonomy()
+
+        # Another process changed the taxonomy.
+        TaxonomyVersion.objects.update(version=F('version') + 1, last_modified=timezone.now())
+
+        self.assertIsNot(get_taxonomy(), taxonomy)
+        self.assertEqual(get_taxonomy().version, taxonomy.version + 1)
+
+    def test_rolled_back_change(self):
+        taxonomy = get_taxonomy()
+
+        # The snapshot was loaded in a transaction that was rolled back, the next committed
+        # change gets the same version number.
+        taxonomy.last_modified = timezone.now()
+        TaxonomyVersion.objects.update(version=taxonomy.version, last_modified=timezone.now())
+
+        self.assertIsNot(get_taxonomy(), taxonomy)
+
+    def test_get_taxonomy_version(self):
+        version, last_modified = get_taxonomy_version()
+
+        self.assertEqual(get_taxonomy().version, version)
+
+        self.sub_category.save()
+
+        new_version, new_last_modified = get_taxonomy_version()
+        self.assertEqual(new_version, version + 1)
+        self.assertGreaterEqual(new_last_modified, last_modified)
+
+    @override_settings(TAXONOMY_VERSION_CHECK_INTERVAL=5)
+    @mock.patch('signals.apps.signals.taxonomy.time')
+    @mock.patch('signals.apps.signals.taxonomy.connection')
+    def test_version_checked_periodically(self, mocked_connection, mocked_time):
+        # Outside of a transaction the version is checked at most once every interval.
+        mocked_connection.in_atomic_block = False
+        mocked_time.monotonic.return_value = 100
+        taxonomy = get_taxonomy()
+
+        TaxonomyVersion.objects.update(version=F('version') + 1, last_modified=timezone.now())
+
+        mocked_time.monotonic.return_value = 104
+        with self.assertNumQueries(0):
+            self.assertIs(get_taxonomy(), taxonomy)
+            get_taxonomy_version()
+
+        mocked_time.monotonic.return_value = 105
+        self.assertEqual(get_taxonomy().version, taxonomy.version + 1)
+
+    @mock.patch('signals.apps.signals.taxonomy.connection')
+    def test_version_checked_after_own_change(self, mocked_connection):
+        mocked_connection.in_atomic_block = False
+        get_taxonomy()
+
+        self.sub_category.name = 'Grof vuil'
+        self.sub_category.save()
+
+        self.assertEqual(get_taxonomy().get_sub_category(self.sub_category.id).name, 'Grof vuil')
+
+    def test_version_missing(self):
+        TaxonomyVersion.objects.all().delete()
+
+        # Reading the version never creates it.
+        self.assertEqual(get_taxonomy_version(), INITIAL_VERSION)
+        self.assertEqual(get_taxonomy().version, INITIAL_VERSION[0])
+        self.assertFalse(TaxonomyVersion.objects.exists())
+
+        # Changing the taxonomy does.
+        self.sub_category.save()
+        self.assertTrue(TaxonomyVersion.objects.exists())
@@ -0,0 +1,80 @@
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import ValidationError
+
+from signals.apps.signals.upload_handlers import ImageUploadHandler, is_image_header
+
+JPEG_HEADER = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01'
+
+
+@override_settings(SIGNAL_IMAGE_MAX_SIZE=1024, FILE_UPLOAD_MAX_MEMORY_SIZE=256)
+class TestImageUploadHandler(SimpleTestCase):
+
+    def upload(self, chunks, field_name='image'):
+        handler = ImageUploadHandler()
+        handler.new_file(field_name, 'image.jpg', 'image/jpeg', None)
+        start = 0
+        for chunk in chunks:
+            handler.receive_data_chunk(chunk, start)
+            start += len(chunk)
+        return handler.file_complete(start)
+
+    def test_is_image_header(self):
+        self.assertTrue(is_image_header(JPEG_HEADER))
+        self.assertTrue(is_image_header(b'GIF89a\x01\x00\x01\x00\x00\x00'))
+        self.assertTrue(is_image_header(b'RIFF\x00\x00\x00\x00WEBP'))
+        self.assertFalse(is_image_header(b'RIFF\x00\x00\x00\x00WAVE'))
+        self.assertFalse(is_image_header(b'%PDF-1.4\n%\xe2\xe3'))
+
+    def test_small_image_in_memory(self):
+        uploaded = self.upload([JPEG_HEADER, b'\x00' * 100])
+
+        self.assertIsInstance(uploaded, InMemoryUploadedFile)
+        self.assertEqual(uploaded.size, 112)
+        self.assertEqual(uploaded.read(), JPEG_HEADER + b'\x00' * 100)
+
+    def test_large_image_temporary_file(self):
+        uploaded = self.upload([JPEG_HEADER, b'\x00' * 500])
+
+        self.assertIsInstance(uploaded, TemporaryUploadedFile)
+        self.assertEqual(uploaded.size, 512)
+        self.assertEqual(uploaded.read(), JPEG_HEADER + b'\x00' * 500)
+        uploaded.close()
+
+    def test_image_too_large(self):
+        chunks = iter([JPEG_HEADER, b'\x00' * 600, b'\x00' * 600, b'\x00' * 600])
+        with self.assertRaises(ValidationError):
+            self.upload(chunks)
+
+        # The upload is aborted before reading the last chunk.
+        self.assertEqual(list(chunks), [b'\x00' * 600])
+
+    def test_image_too_large_content_length(self):
+        handler = ImageUploadHandler()
+        with self.assertRaises(ValidationError):
+            handler.new_file('image', 'image.jpg', 'image/jpeg', 2048)
+
+    def test_not_an_image(self):
+        chunks = iter([b'%PDF-1.4\n%\xe2\xe3\xcf\xd3', b'\x00' * 100])
+        with self.assertRaises(ValidationError):
+            self.upload(chunks)
+        self.assertEqual(list(chunks), [b'\x00' * 100])
+
+    def test_header_split_over_chunks(self):
+        uploaded = self.upload([JPEG_HEADER[:2], JPEG_HEADER[2:], b'\x00'])
+        self.assertEqual(uploaded.size, 13)
+
+    def test_short_file_not_an_image(self):
+        with self.assertRaises(ValidationError):
+            self.upload([b'ab'])
+
+    def test_other_fields_not_checked(self):
+        uploaded = self.upload([b'%PDF-1.4' + b'\x00' * 2000], field_name='upload')
+        self.assertEqual(uploaded.size, 2008)
+        uploaded.close()
+
+    def test_error_messages(self):
+        handler = ImageUploadHandler(error_messages={'max_size': 'Te groot'})
+        with self.assertRaises(ValidationError) as cm:
+            handler.new_file('image', 'image.jpg', 'image/jpeg', 2048)
+        self.assertEqual(cm.exception.detail, {'non_field_errors': ['Te groot']})
@@ -0,0 +1,43 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from signals.apps.signals.models import Signal, SignalCurrentState
+from signals.utils.benchmark_queries import benchmark_queries, seed_signals
+from tests.apps.signals.factories import SubCategoryFactory
+
+
+class TestBenchmarkQueries(TestCase):
+
+    def test_seed_signals(self):
+        SubCategoryFactory.create()
+
+        seed_signals(25, batch_size=10)
+
+        self.assertEqual(Signal.objects.count(), 25)
+        self.assertEqual(SignalCurrentState.objects.count(), 25)
+        self.assertEqual(SignalCurrentState.objects.filter(main_slug='').count(), 0)
+
+    def test_benchmark_queries(self):
+        SubCategoryFactory.create()
+        seed_signals(10)
+
+        results = benchmark_queries(repeat=1)
+
+        names = [result['name'] for result in results]
+        self.assertIn('all', names)
+        self.assertIn('main category', names)
+        self.assertIn('sub category', names)
+        for result in results:
+            self.assertGreaterEqual(result['page_ms'], 0)
+            self.assertGreaterEqual(result['count_ms'], 0)
+            self.assertTrue(result['plan'])
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command('benchmark_signal_queries', seed=5, repeat=1, explain=True, stdout=out)
+
+        self.assertEqual(Signal.objects.count(), 5)
+        self.assertIn('status open', out.getvalue())
@@ -1,15 +1,21 @@
 import csv
+import gzip
 import json
+import os
 import shutil
 import tempfile
 from os import path
 from unittest import mock
 
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files.storage import FileSystemStorage
+from django.db import connection
 from django.test import override_settings, testcases
+from django.test.utils import CaptureQueriesContext
+from swift.storage import SwiftStorage
 
 from signals.utils import datawarehouse
-from tests.apps.signals.factories import SignalFactory
+from tests.apps.signals.factories import DepartmentFactory, SignalFactory, SubCategoryFactory
 
 
 class TestDatawarehouse(testcases.TestCase):
@@ -22,6 +28,7 @@ class TestDatawarehouse(testcases.TestCase):
         shutil.rmtree(self.csv_tmp_dir)
         shutil.rmtree(self.file_backend_tmp_dir)
 
+    @override_settings(DWH_EXPORT_WORKERS=1)
     @mock.patch('signals.utils.datawarehouse._get_storage_backend')
     def test_save_csv_files_datawarehouse(self, mocked_get_storage_backend):
         # Mocking the storage backend to local file system with tmp directory.
@@ -54,6 +61,45 @@ class TestDatawarehouse(testcases.TestCase):
         self.assertTrue(path.exists(statuses_csv))
         self.assertTrue(path.getsize(statuses_csv))
 
+    @override_settings(DWH_EXPORT_WORKERS=1, DWH_EXPORT_WATERMARK_LAG=0)
+    @mock.patch('signals.utils.datawarehouse._get_storage_backend')
+    def test_save_csv_files_datawarehouse_incremental(self, mocked_get_storage_backend):
+        mocked_get_storage_backend.return_value = FileSystemStorage(
+            location=self.file_backend_tmp_dir)
+
+        SignalFactory.create_batch(2)
+        datawarehouse.save_csv_files_datawarehouse()
+        self.assertTrue(path.exists(path.join(self.file_backend_tmp_dir, 'watermarks.json')))
+
+        new_signal = SignalFactory.create()
+        datawarehouse.save_csv_files_datawarehouse(incremental=True)
+
+        # Only the new `Signal` is written to the delta file.
+        delta_dirs = os.listdir(path.join(self.file_backend_tmp_dir, 'delta'))
+        self.assertEqual(len(delta_dirs), 1)
+        signals_csv = path.join(self.file_backend_tmp_dir, 'delta', delta_dirs[0], 'signals.csv')
+        with open(signals_csv) as opened_csv_file:
+            reader = csv.DictReader(opened_csv_file)
+            self.assertEqual([row['id'] for row in reader], [str(new_signal.id)])
+
+    @override_settings(DWH_EXPORT_WORKERS=1, DWH_EXPORT_WATERMARK_LAG=600)
+    @mock.patch('signals.utils.datawarehouse._get_storage_backend')
+    def test_save_csv_files_datawarehouse_incremental_overlap(self, mocked_get_storage_backend):
+        mocked_get_storage_backend.return_value = FileSystemStorage(
+            location=self.file_backend_tmp_dir)
+
+        signal = SignalFactory.create()
+        datawarehouse.save_csv_files_datawarehouse()
+        datawarehouse.save_csv_files_datawarehouse(incremental=True)
+
+        # Rows updated within `DWH_EXPORT_WATERMARK_LAG` of the previous export are exported
+        # again, their transaction may not have been committed yet during that export.
+        delta_dirs = os.listdir(path.join(self.file_backend_tmp_dir, 'delta'))
+        signals_csv = path.join(self.file_backend_tmp_dir, 'delta', delta_dirs[0], 'signals.csv')
+        with open(signals_csv) as opened_csv_file:
+            reader = csv.DictReader(opened_csv_file)
+            self.assertEqual([row['id'] for row in reader], [str(signal.id)])
+
     @override_settings(
         DWH_SWIFT_AUTH_URL='dwh_auth_url',
         DWH_SWIFT_USERNAME='dwh_username',
@@ -185,6 +231,35 @@ class TestDatawarehouse(testcases.TestCase):
                 self.assertEqual(row['updated_at'], str(category_assignment.updated_at))
                 self.assertEqual(json.loads(row['extra_properties']), None)
 
+    def test_create_category_assignments_csv_departments(self):
+        departments = [
+            DepartmentFactory.create(name='Beta'),
+            DepartmentFactory.create(name='Alpha'),
+        ]
+        sub_category = SubCategoryFactory.create(departments=departments)
+        SignalFactory.create(category_assignment__sub_category=sub_category)
+
+        csv_file = datawarehouse._create_category_assignments_csv(self.csv_tmp_dir)
+
+        with open(csv_file) as opened_csv_file:
+            reader = csv.DictReader(opened_csv_file)
+            row = next(reader)
+            self.assertEqual(row['main'], sub_category.main_category.name)
+            self.assertEqual(row['sub'], sub_category.name)
+            self.assertEqual(row['departments'], 'Alpha, Beta')
+
+    def test_create_category_assignments_csv_num_queries(self):
+        SignalFactory.create()
+        with CaptureQueriesContext(connection) as single_signal_context:
+            datawarehouse._create_category_assignments_csv(self.csv_tmp_dir)
+
+        SignalFactory.create_batch(5)
+        with CaptureQueriesContext(connection) as multiple_signals_context:
+            datawarehouse._create_category_assignments_csv(self.csv_tmp_dir)
+
+        self.assertEqual(len(single_signal_context.captured_queries),
+                         len(multiple_signals_context.captured_queries))
+
     def test_create_statuses_csv(self):
         signal = SignalFactory.create()
         status = signal.status
@@ -208,3 +283,121 @@ class TestDatawarehouse(testcases.TestCase):
                 self.assertEqual(row['updated_at'], str(status.updated_at))
                 self.assertEqual(json.loads(row['extra_properties']), None)
                 self.assertEqual(row['state'], status.state)
+
+    @override_settings(DWH_SWIFT_SEGMENT_SIZE=10)
+    def test_save_csv_file_swift_segmented(self):
+        csv_file_path = path.join(self.csv_tmp_dir, 'test.csv')
+        with open(csv_file_path, 'wb') as opened_csv_file:
+            opened_csv_file.write(b'x' * 25)
+        storage = mock.Mock(spec=SwiftStorage, container_name='dwh_container_name')
+        storage.swift_conn.get_container.return_value = ({}, [
+            {'name': 'test.csv.segments/20180101000000/00000000'},
+            {'name': 'test.csv.segments/20180101000000/00000001'},
+        ])
+
+        datawarehouse._save_csv_file(storage, csv_file_path, 'test.csv')
+
+        storage.save.assert_not_called()
+        put_object_calls = storage.swift_conn.put_object.call_args_list
+        self.assertEqual(len(put_object_calls), 4)  # 3 segments and the manifest
+        self.assertEqual([c[1]['content_length'] for c in put_object_calls], [10, 10, 5, 0])
+        self.assertTrue(
+            put_object_calls[3][1]['headers']['X-Object-Manifest'].startswith(
+                'dwh_container_name/test.csv.segments/'))
+
+        # The segments of the previous upload are deleted.
+        self.assertEqual(storage.swift_conn.delete_object.call_args_list, [
+            mock.call('dwh_container_name', 'test.csv.segments/20180101000000/00000000'),
+            mock.call('dwh_container_name', 'test.csv.segments/20180101000000/00000001'),
+        ])
+
+    @override_settings(DWH_SWIFT_SEGMENT_SIZE=10)
+    def test_save_csv_file_swift_segmented_keeps_new_segments(self):
+        csv_file_path = path.join(self.csv_tmp_dir, 'test.csv')
+        with open(csv_file_path, 'wb') as opened_csv_file:
+            opened_csv_file.write(b'x' * 15)
+        storage = mock.Mock(spec=SwiftStorage, container_name='dwh_container_name')
+
+        def get_container(container, prefix, full_listing):
+            # Listing includes the segments that were just uploaded.
+            return {}, [{'name': c[0][1]} for c in storage.swift_conn.put_object.call_args_list
+                        if c[0][1].startswith(prefix)]
+        storage.swift_conn.get_container.side_effect = get_container
+
+        datawarehouse._save_csv_file(storage, csv_file_path, 'test.csv')
+
+        storage.swift_conn.delete_object.assert_not_called()
+
+    def test_save_csv_file_not_segmented(self):
+        csv_file_path = path.join(self.csv_tmp_dir, 'test.csv')
+        with open(csv_file_path, 'wb') as opened_csv_file:
+            opened_csv_file.write(b'x' * 25)
+        storage = FileSystemStorage(location=self.file_backend_tmp_dir)
+
+        datawarehouse._save_csv_file(storage, csv_file_path, 'test.csv')
+
+        self.assertEqual(path.getsize(path.join(self.file_backend_tmp_dir, 'test.csv')), 25)
+
+    def test_write_csv(self):
+        rows = ([i, 'row {}'.format(i)] for i in range(3))
+
+        with self.assertLogs('signals.utils.datawarehouse', level='INFO') as logs:
+            csv_file = datawarehouse._write_csv(self.csv_tmp_dir, 'test.csv', ['id', 'text'], rows)
+
+        self.assertEqual(path.join(self.csv_tmp_dir, 'test.csv'), csv_file)
+        with open(csv_file) as opened_csv_file:
+            reader = csv.DictReader(opened_csv_file)
+            self.assertEqual([row['text'] for row in reader], ['row 0', 'row 1', 'row 2'])
+        self.assertIn('Created test.csv with 3 rows', logs.output[0])
+
+    @override_settings(DWH_EXPORT_COMPRESSION='gzip')
+    def test_write_csv_gzip(self):
+        rows = ([i, 'row {}'.format(i)] for i in range(3))
+
+        csv_file = datawarehouse._write_csv(self.csv_tmp_dir, 'test.csv', ['id', 'text'], rows)
+
+        self.assertEqual(path.join(self.csv_tmp_dir, 'test.csv.gz'), csv_file)
+        with gzip.open(csv_file, 'rt') as opened_csv_file:
+            reader = csv.DictReader(opened_csv_file)
+            self.assertEqual([row['text'] for row in reader], ['row 0', 'row 1', 'row 2'])
+
+    @override_settings(DWH_EXPORT_COMPRESSION='rar')
+    def test_write_csv_unsupported_compression(self):
+        with self.assertRaises(ImproperlyConfigured):
+            datawarehouse._write_csv(self.csv_tmp_dir, 'test.csv', ['id'], [])
+
+    @override_settings(DWH_EXPORT_CHUNK_SIZE=1)
+    def test_create_signals_csv_multiple_chunks(self):
+        signals = SignalFactory.create_batch(3)
+
+        csv_file = datawarehouse._create_signals_csv(self.csv_tmp_dir)
+
+        with open(csv_file) as opened_csv_file:
+            reader = csv.DictReader(opened_csv_file)
+            self.assertEqual(sorted(int(row['id']) for row in reader),
+                             sorted(signal.id for signal in signals))
+
+
+class TestDatawarehouseParallel(testcases.TransactionTestCase):
+    """Worker threads use their own database connection, so the data must be committed."""
+
+    def setUp(self):
+        self.file_backend_tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.file_backend_tmp_dir)
+
+    @override_settings(DWH_EXPORT_WORKERS=5)
+    @mock.patch('signals.utils.datawarehouse._get_storage_backend')
+    def test_save_csv_files_datawarehouse_parallel(self, mocked_get_storage_backend):
+        mocked_get_storage_backend.return_value = FileSystemStorage(
+            location=self.file_backend_tmp_dir)
+        signals = SignalFactory.create_batch(3)
+
+        datawarehouse.save_csv_files_datawarehouse()
+
+        for file_name in ('signals.csv', 'locations.csv', 'reporters.csv', 'categories.csv',
+                          'statuses.csv'):
+            with open(path.join(self.file_backend_tmp_dir, file_name)) as opened_csv_file:
+                reader = csv.DictReader(opened_csv_file)
+                self.assertEqual(len(list(reader)), len(signals))